@@ -1,5 +1,9 @@
 ﻿from __future__ import annotations
 
+# EXE(PyInstaller)에서 작업자 프로세스(이력카드 ZIP 등)로 실행된 경우 여기서 처리
+import multiprocessing
+multiprocessing.freeze_support()
+
 # (선택) 크래시 감시자 — 없으면 조용히 패스
 try:
     from crash_guard import arm_crash_watchdog
@@ -1,13 +1,19 @@
 from __future__ import annotations
 import os
+import sys
+import time
+import hashlib
+import logging
 import sqlite3
 import importlib
+import threading
 from contextlib import contextmanager
 from typing import Generator, Tuple
 
 from sqlalchemy import create_engine, event, text
 from sqlalchemy.orm import sessionmaker, DeclarativeBase
 
+log = logging.getLogger(__name__)
 
 # ─────────────────────────────────────────────────────────────
 # settings 로드 (함수형/속성형 둘 다 지원)
@@ -164,10 +170,200 @@ def _set_sqlite_pragmas(dbapi_conn, _record):
             pass
 
 
+# 스레드 전용 연결: 쓰기 전용 스레드(services.db_writer)가 자기 영구 연결을 등록하면
+# 그 스레드에서 여는 session_scope()는 풀 대신 그 연결을 사용(서비스 함수 수정 없이 재사용)
+_thread_conn = threading.local()
+
+
+def bind_thread_connection(conn) -> None:
+    """현재 스레드의 session_scope()가 conn(Connection)을 쓰도록 등록. None이면 해제."""
+    _thread_conn.conn = conn
+
+
+# 서버 모드(settings db_backend="server")에서 공유 DB 파일을 직접 여는 호출은 경고(호출 위치별 1회)
+# - 조회/저장은 services/remote.py의 remote_op로 DB 서비스를 거쳐야 함
+# - 아직 직접 여는 곳: 엑셀 가져오기/내보내기, 이력카드 내보내기, 백업/복구(파일 단위 작업)
+_direct_access_warned: set = set()
+
+
+def _warn_if_remote() -> None:
+    try:
+        from services.remote import is_remote
+        if not is_remote():
+            return
+    except Exception:
+        return
+    f = sys._getframe(1)
+    while f is not None and (f.f_code.co_filename == __file__ or f.f_code.co_filename.endswith("contextlib.py")):
+        f = f.f_back
+    where = f"{f.f_code.co_filename}:{f.f_lineno}" if f is not None else "?"
+    if where in _direct_access_warned:
+        return
+    _direct_access_warned.add(where)
+    log.warning("서버 모드인데 DB 파일에 직접 접근합니다(DB 서비스를 거치지 않음): %s", where)
+
+
 @contextmanager
 def session_scope() -> Generator:
     """with session_scope() as s: ...  패턴용 세션 컨텍스트"""
-    s = SessionLocal()
+    _warn_if_remote()
+    conn = getattr(_thread_conn, "conn", None)
+    s = SessionLocal(bind=conn) if conn is not None else SessionLocal()
+    try:
+        yield s
+        s.commit()
+    except Exception:
+        s.rollback()
+        raise
+    finally:
+        s.close()
+
+
+# ─────────────────────────────────────────────────────────────
+# 로컬 읽기 복제본(선택: settings "read_replica")
+# - 서버 DB를 이 PC 로컬 파일로 SQLite 온라인 백업 API로 복사 → 목록 조회(list_*)는 로컬에서
+# - 원본의 PRAGMA data_version이 바뀐 경우에만 다시 복사
+#   확인은 _REPLICA_CHECK_SEC 간격, 복사(전체 백업 — 그동안 원본 쓰기를 막음)는 _REPLICA_MIN_COPY_SEC에 최대 1번
+#   → 다른 PC의 변경은 그 사이 조금 늦게 보임
+# - 이 PC의 커밋/변경 피드 감지(mark_stale)는 복사를 앞당기지 않고, 다음 복사 전까지 조회를 원본으로
+#   (내 저장·방금 감지된 변경은 바로 보이고, 저장할 때마다 복사하지 않음)
+# - 쓰기는 항상 원본(session_scope). 복사 실패(네트워크 끊김 등) 시 원본에서 조회
+_REPLICA_CHECK_SEC = 2.0
+_REPLICA_MIN_COPY_SEC = 30.0
+
+
+class ReadReplica:
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._src = None                # 원본 DBAPI 연결(data_version 확인 + 백업 원본)
+        self._version = None
+        self._checked = 0.0
+        self._copied = 0.0
+        self._gen = 0                   # mark_stale()마다 +1
+        self._clean_gen = 0             # 복제본이 반영한 마지막 _gen
+        self._synced = False
+        self.engine = create_engine(
+            _sqlite_url_from_path(path), future=True,
+            connect_args={"check_same_thread": False},
+        )
+        self.Session = sessionmaker(bind=self.engine, autoflush=False, future=True, expire_on_commit=False)
+
+    def mark_stale(self) -> None:
+        """원본에 복제본에 없는 변경이 있음 → 다음 복사 전까지 조회는 원본에서."""
+        self._gen += 1
+
+    @property
+    def behind(self) -> bool:
+        return self._gen != self._clean_gen
+
+    def _source(self):
+        if self._src is None:
+            self._src = engine.raw_connection()   # 풀에서 빌려 계속 보유(설정 PRAGMA 적용된 연결)
+        return self._src.driver_connection
+
+    def _drop_source(self) -> None:
+        if self._src is not None:
+            try:
+                self._src.close()
+            except Exception:
+                pass
+        self._src = None
+
+    def sync(self, force: bool = False) -> bool:
+        """원본이 바뀌었고 최소 복사 간격이 지났으면(force면 바로) 복제본 갱신 → 복사했으면 True."""
+        with self._lock:
+            now = time.monotonic()
+            if self._synced and not force and now - self._checked < _REPLICA_CHECK_SEC:
+                return False
+            self._checked = now
+            gen = self._gen
+            try:
+                src = self._source()
+                ver = src.execute("PRAGMA data_version").fetchone()[0]
+                if self._synced and ver == self._version:
+                    self._clean_gen = gen   # 표시된 변경도 이미 복제본에 있음
+                    return False
+                if self._synced and not force and now - self._copied < _REPLICA_MIN_COPY_SEC:
+                    return False
+                dst = sqlite3.connect(self.path)
+                try:
+                    src.backup(dst)
+                finally:
+                    dst.close()
+            except Exception:
+                self._drop_source()
+                raise
+            self._version = ver
+            self._copied = now
+            self._clean_gen = gen
+            self._synced = True
+            return True
+
+
+_replica: ReadReplica | None = None
+_replica_lock = threading.Lock()
+
+
+def _replica_path() -> str | None:
+    if not settings or not DB_URL.startswith("sqlite"):
+        return None
+    try:
+        if not settings.get_read_replica_enabled():
+            return None
+        d = settings.get_replica_dir()
+        os.makedirs(d, exist_ok=True)
+    except Exception:
+        return None
+    tag = hashlib.sha1(DB_URL.encode("utf-8")).hexdigest()[:12]   # 서버가 바뀌면 다른 파일
+    return os.path.join(d, f"{tag}_{DB_FILE or 'app.db'}")
+
+
+def get_read_replica() -> ReadReplica | None:
+    """복제본 모드면 ReadReplica(첫 호출 시 생성), 아니면 None."""
+    global _replica
+    with _replica_lock:
+        if _replica is None:
+            path = _replica_path()
+            if path is None:
+                return None
+            _replica = ReadReplica(path)
+            # 이 PC의 쓰기 커밋 → 다음 복사 전까지 조회는 원본에서(내 저장이 바로 보이도록)
+            event.listen(engine, "commit", _on_source_commit)
+        return _replica
+
+
+def _on_source_commit(conn) -> None:
+    # 조회만 한 트랜잭션은 제외(pysqlite는 쓰기 문장에서만 BEGIN → in_transaction)
+    try:
+        wrote = conn.connection.dbapi_connection.in_transaction
+    except Exception:
+        wrote = True
+    if wrote and _replica is not None:
+        _replica.mark_stale()
+
+
+@contextmanager
+def read_session_scope() -> Generator:
+    """
+    조회 전용 세션. 복제본 모드면 로컬 복제본, 아니면 session_scope()와 같음.
+    쓰기 스레드(연결이 바인딩된 스레드)에서는 자기 트랜잭션이 보이도록 항상 원본 사용.
+    """
+    _warn_if_remote()
+    rep = None if getattr(_thread_conn, "conn", None) is not None else get_read_replica()
+    if rep is not None:
+        try:
+            rep.sync()
+        except Exception as e:
+            log.warning("읽기 복제본 갱신 실패, 원본에서 조회: %s", e)
+            rep = None
+    if rep is not None and rep.behind:
+        rep = None   # 내 저장/방금 감지된 변경이 아직 복제본에 없음 → 다음 복사 전까지 원본
+    if rep is None:
+        with session_scope() as s:
+            yield s
+        return
+    s = rep.Session()
     try:
         yield s
         s.commit()
@@ -191,68 +387,424 @@ def _col_exists(conn, table: str, col: str) -> bool:
     return any(r[1] == col for r in rows)
 
 
-def _ensure_equipment_columns(conn):
-    if not _table_exists(conn, "equipment"):
+def _add_missing_columns(conn, table: str, wanted: dict[str, str]):
+    """PRAGMA 1회로 현재 컬럼을 읽고, 빠진 컬럼만 ALTER TABLE ADD COLUMN."""
+    if not _table_exists(conn, table):
         return
-    for col, ddl in [
-        ("status",     "ALTER TABLE equipment ADD COLUMN status TEXT"),
-        ("category",   "ALTER TABLE equipment ADD COLUMN category TEXT"),
-        ("is_deleted", "ALTER TABLE equipment ADD COLUMN is_deleted INTEGER NOT NULL DEFAULT 0"),
-        ("deleted_at", "ALTER TABLE equipment ADD COLUMN deleted_at TEXT"),
-        ("created_at", "ALTER TABLE equipment ADD COLUMN created_at TEXT"),
-        # ★ 새로 추가: 용도(purpose) 분리
-        ("purpose",    "ALTER TABLE equipment ADD COLUMN purpose VARCHAR(200)"),
-    ]:
+    cols = {r[1] for r in conn.execute(text(f"PRAGMA table_info({table})")).fetchall()}
+    for col, decl in wanted.items():
+        if col in cols:
+            continue
         try:
-            if not _col_exists(conn, "equipment", col):
-                conn.execute(text(ddl))
+            conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {col} {decl}"))
         except Exception:
             pass
 
 
+def _ensure_equipment_columns(conn):
+    _add_missing_columns(conn, "equipment", {
+        "no": "INTEGER",
+        "asset_name": "VARCHAR(200)",
+        "alt_name": "VARCHAR(200)",
+        "model": "VARCHAR(100)",
+        "size_mm": "VARCHAR(200)",
+        "voltage": "VARCHAR(50)",
+        "power_kwh": "FLOAT",
+        "util_air": "VARCHAR(200)",
+        "util_coolant": "VARCHAR(200)",
+        "util_vac": "VARCHAR(200)",
+        "util_other": "VARCHAR(200)",
+        "purpose": "VARCHAR(200)",      # ★ 용도(purpose) 분리
+        "maker": "VARCHAR(100)",
+        "maker_phone": "VARCHAR(50)",
+        "manufacture_date": "DATE",
+        "in_year": "INTEGER",
+        "in_month": "INTEGER",
+        "in_day": "INTEGER",
+        "qty": "FLOAT",
+        "purchase_price": "FLOAT",
+        "location": "VARCHAR(200)",
+        "note": "TEXT",
+        "part": "VARCHAR(100)",
+        "installed_on": "DATE",
+        "status": "TEXT",
+        "category": "TEXT",
+        "is_deleted": "INTEGER NOT NULL DEFAULT 0",
+        "deleted_at": "TEXT",
+        "created_at": "TEXT",
+    })
+
+
+def _ensure_repair_columns(conn):
+    _add_missing_columns(conn, "repair", {
+        "progress_status": "VARCHAR(20)",
+        "complete_date": "DATE",
+        "vendor": "VARCHAR(100)",
+        "work_hours": "FLOAT",
+    })
+
+
+def _ensure_photo_columns(conn):
+    _add_missing_columns(conn, "photo", {"file_path": "VARCHAR(500)"})
+
+
 def _ensure_consumable_txn_columns(conn):
+    _add_missing_columns(conn, "consumable_txn", {
+        "created_at": "TEXT",
+        "txn_time": "TEXT NOT NULL DEFAULT (datetime('now'))",
+    })
+
+
+def _ensure_consumable_columns(conn):
+    _add_missing_columns(conn, "consumable", {"note": "TEXT"})
+
+
+def _migrate_legacy_columns(conn):
+    _ensure_equipment_columns(conn)
+    _ensure_repair_columns(conn)
+    _ensure_photo_columns(conn)
+    _ensure_consumable_txn_columns(conn)
+    _ensure_consumable_columns(conn)
+
+
+# ─────────────────────────────────────────────────────────────
+# 설비 통합검색용 FTS5 색인(equipment_fts)
+# - trigram 토크나이저: 한글도 3글자 이상 부분일치 검색 가능
+# - external content(equipment) + 트리거로 자동 동기화
+# - 최소 SQLite 3.34(trigram) + FTS5 빌드. 색인을 한 번 만들면 equipment 트리거가 fts5 모듈을
+#   쓰므로 이 DB에 쓰는 모든 PC(서버 모드면 DB 서비스 PC)가 이 조건을 만족해야 함
+#   → 미지원 PC에서는 색인을 만들지 않고 마이그레이션 2를 기록하지 않음(지원 PC가 나중에 생성)
+EQUIPMENT_FTS_COLUMNS = (
+    "code", "asset_name", "name", "alt_name", "model",
+    "location", "part", "purpose", "util_other",
+)
+FTS_MIN_QUERY_LEN = 3  # trigram 특성상 3글자 미만은 LIKE로 검색
+
+_fts_available: bool | None = None
+_sqlite_fts_ok: bool | None = None
+
+
+def sqlite_supports_fts() -> bool:
+    """이 PC의 SQLite가 FTS5 + trigram 토크나이저(3.34+)를 지원하는지(프로세스당 1회, 메모리 DB로 확인)."""
+    global _sqlite_fts_ok
+    if _sqlite_fts_ok is None:
+        try:
+            con = sqlite3.connect(":memory:")
+            try:
+                ok = bool(con.execute("SELECT sqlite_compileoption_used('ENABLE_FTS5')").fetchone()[0])
+                if ok:
+                    con.execute("CREATE VIRTUAL TABLE temp.fts_probe USING fts5(a, tokenize='trigram')")
+            finally:
+                con.close()
+            _sqlite_fts_ok = ok
+        except Exception:
+            _sqlite_fts_ok = False
+    return _sqlite_fts_ok
+
+
+def _ensure_equipment_fts(conn):
+    """False를 돌려주면 색인을 만들지 못한 것 → ensure_db가 이 단계를 기록하지 않음."""
+    global _fts_available
+    if not _table_exists(conn, "equipment"):
+        return
+    if not sqlite_supports_fts():
+        log.warning("SQLite %s: FTS5/trigram 미지원 → 설비 검색 색인 생략(LIKE 검색)", sqlite3.sqlite_version)
+        _fts_available = False
+        return False
+    # 레거시 DB에 색인 대상 컬럼이 빠져 있으면 트리거가 INSERT/UPDATE를 깨뜨리므로 생략
+    if not all(_col_exists(conn, "equipment", c) for c in EQUIPMENT_FTS_COLUMNS):
+        _fts_available = False
+        return False
+    cols = ", ".join(EQUIPMENT_FTS_COLUMNS)
+    new_cols = ", ".join(f"new.{c}" for c in EQUIPMENT_FTS_COLUMNS)
+    old_cols = ", ".join(f"old.{c}" for c in EQUIPMENT_FTS_COLUMNS)
+    # 지원 여부는 위에서 확인했으므로 여기서 난 오류는 그대로 올림(단계 미기록 → 다음 시작 때 재시도)
+    created = not _table_exists(conn, "equipment_fts")
+    if created:
+        conn.execute(text(
+            f"CREATE VIRTUAL TABLE equipment_fts USING fts5("
+            f"{cols}, content='equipment', content_rowid='id', tokenize='trigram')"
+        ))
+    conn.execute(text(
+        f"CREATE TRIGGER IF NOT EXISTS equipment_fts_ai AFTER INSERT ON equipment BEGIN "
+        f"INSERT INTO equipment_fts(rowid, {cols}) VALUES (new.id, {new_cols}); END"
+    ))
+    conn.execute(text(
+        f"CREATE TRIGGER IF NOT EXISTS equipment_fts_ad AFTER DELETE ON equipment BEGIN "
+        f"INSERT INTO equipment_fts(equipment_fts, rowid, {cols}) VALUES ('delete', old.id, {old_cols}); END"
+    ))
+    conn.execute(text(
+        f"CREATE TRIGGER IF NOT EXISTS equipment_fts_au AFTER UPDATE ON equipment BEGIN "
+        f"INSERT INTO equipment_fts(equipment_fts, rowid, {cols}) VALUES ('delete', old.id, {old_cols}); "
+        f"INSERT INTO equipment_fts(rowid, {cols}) VALUES (new.id, {new_cols}); END"
+    ))
+    if created:
+        # 기존 데이터 색인(최초 1회)
+        conn.execute(text("INSERT INTO equipment_fts(equipment_fts) VALUES ('rebuild')"))
+    _fts_available = True
+
+
+def has_equipment_fts() -> bool:
+    """MATCH 검색을 쓸 수 있는지: 이 PC의 SQLite가 FTS5/trigram 지원 + equipment_fts 존재(프로세스당 1회)."""
+    global _fts_available
+    if _fts_available is None:
+        if not sqlite_supports_fts():
+            _fts_available = False
+            return False
+        try:
+            with engine.connect() as conn:
+                _fts_available = _table_exists(conn, "equipment_fts")
+        except Exception:
+            _fts_available = False
+    return bool(_fts_available)
+
+
+def fts_match_query(keyword: str) -> str:
+    """사용자 입력을 FTS5 MATCH 구문(구문 일치)으로 안전하게 감싼다."""
+    return '"' + (keyword or "").replace('"', '""') + '"'
+
+
+# ─────────────────────────────────────────────────────────────
+# 소모품 원장 인덱스 + 월별 스냅샷 무효화 트리거
+def _ensure_consumable_ledger(conn):
     if not _table_exists(conn, "consumable_txn"):
         return
+    _add_missing_columns(conn, "consumable_txn", {
+        "reason": "VARCHAR(200)",
+        "related_repair_id": "INTEGER",
+    })
+    conn.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_consumable_txn_cid_time ON consumable_txn (consumable_id, txn_time)"
+    ))
+    conn.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_consumable_txn_repair ON consumable_txn (related_repair_id)"
+    ))
+    if not _table_exists(conn, "consumable_stock_snapshot"):
+        return
+    # 과거 일시로 원장이 추가/삭제되면 그 이후 스냅샷은 다시 계산하도록 지움
+    for name, event_, ref in (("ai", "INSERT", "new"), ("ad", "DELETE", "old")):
+        conn.execute(text(
+            f"CREATE TRIGGER IF NOT EXISTS consumable_txn_snapshot_{name} AFTER {event_} ON consumable_txn BEGIN "
+            f"DELETE FROM consumable_stock_snapshot WHERE consumable_id = {ref}.consumable_id "
+            f"AND as_of > date({ref}.txn_time); END"
+        ))
+
+
+def _ensure_consumable_txn_import_key(conn):
+    if not _table_exists(conn, "consumable_txn"):
+        return
+    _add_missing_columns(conn, "consumable_txn", {"import_key": "VARCHAR(64)"})
+    conn.execute(text(
+        "CREATE UNIQUE INDEX IF NOT EXISTS ux_consumable_txn_import_key "
+        "ON consumable_txn (import_key) WHERE import_key IS NOT NULL"
+    ))
+
+
+# ─────────────────────────────────────────────────────────────
+# 변경 피드(change_feed) 트리거 — 다른 PC의 변경을 행 단위로 감지(services.change_feed)
+# (테이블, 상위 설비 id 컬럼) — 상위 id는 이력카드처럼 설비 단위로 보는 화면용
+CHANGE_FEED_TABLES = (
+    ("equipment", None),
+    ("repair", "equipment_id"),
+    ("equipment_accessory", "equipment_id"),
+    ("photo", "equipment_id"),
+    ("consumable", None),
+)
+
+
+def _ensure_change_feed(conn):
+    if not _table_exists(conn, "change_feed"):
+        conn.execute(text(
+            "CREATE TABLE change_feed ("
+            "seq INTEGER PRIMARY KEY AUTOINCREMENT, tbl VARCHAR(50) NOT NULL, "
+            "row_id INTEGER NOT NULL, parent_id INTEGER, op VARCHAR(1) NOT NULL, "
+            "changed_at TEXT DEFAULT (datetime('now')))"
+        ))
+    for table, parent in CHANGE_FEED_TABLES:
+        if not _table_exists(conn, table):
+            continue
+        p_new = f"new.{parent}" if parent else "NULL"
+        p_old = f"old.{parent}" if parent else "NULL"
+        conn.execute(text(
+            f"CREATE TRIGGER IF NOT EXISTS change_feed_{table}_ai AFTER INSERT ON {table} BEGIN "
+            f"INSERT INTO change_feed(tbl, row_id, parent_id, op) VALUES ('{table}', new.id, {p_new}, 'I'); END"
+        ))
+        # 상위 설비가 바뀐 경우(이력 이동) 옛 설비 쪽에도 알림
+        moved = (
+            f"INSERT INTO change_feed(tbl, row_id, parent_id, op) "
+            f"SELECT '{table}', old.id, {p_old}, 'U' WHERE {p_old} IS NOT {p_new}; "
+            if parent else ""
+        )
+        conn.execute(text(
+            f"CREATE TRIGGER IF NOT EXISTS change_feed_{table}_au AFTER UPDATE ON {table} BEGIN "
+            f"{moved}"
+            f"INSERT INTO change_feed(tbl, row_id, parent_id, op) VALUES ('{table}', new.id, {p_new}, 'U'); END"
+        ))
+        conn.execute(text(
+            f"CREATE TRIGGER IF NOT EXISTS change_feed_{table}_ad AFTER DELETE ON {table} BEGIN "
+            f"INSERT INTO change_feed(tbl, row_id, parent_id, op) VALUES ('{table}', old.id, {p_old}, 'D'); END"
+        ))
+
+
+# ─────────────────────────────────────────────────────────────
+# 설비별 수리 요약(equipment_stats) — 대장/이력카드가 조회마다 repair를 집계하지 않도록
+# - repair 추가/수정/삭제 트리거가 해당 설비 1건만 다시 계산(equipment_id 인덱스 범위 조회)
+#   엑셀 가져오기 등 어떤 경로로 바뀌어도 맞게 유지됨
+# - '올해 수리 건수'는 연도가 바뀌어도 틀리지 않도록 "최근 수리일 연도의 건수"로 저장
+#   → 조회 시 최근 수리일이 올해일 때만 그 값을 사용(services.equipment_service.list_equipment)
+def _equipment_stats_select(where: str) -> str:
+    return (
+        "SELECT r.equipment_id, COUNT(*), COALESCE(SUM(r.work_hours), 0), MAX(r.work_date), "
+        "SUM(substr(r.work_date, 1, 4) = (SELECT substr(MAX(x.work_date), 1, 4) FROM repair x "
+        "WHERE x.equipment_id = r.equipment_id)) "
+        f"FROM repair r WHERE {where} GROUP BY r.equipment_id"
+    )
+
+
+def _equipment_stats_refresh(ref: str) -> str:
+    """트리거 본문용: {ref} 설비의 요약 행을 다시 계산(수리가 없으면 행 삭제)."""
+    return (
+        f"DELETE FROM equipment_stats WHERE equipment_id = {ref}; "
+        "INSERT INTO equipment_stats(equipment_id, repair_count, work_hours, last_work_date, last_year_repairs) "
+        f"{_equipment_stats_select(f'r.equipment_id = {ref}')}; "
+    )
+
+
+def _ensure_equipment_stats(conn):
+    if not _table_exists(conn, "repair"):
+        return
+    if not _table_exists(conn, "equipment_stats"):
+        conn.execute(text(
+            "CREATE TABLE equipment_stats ("
+            "equipment_id INTEGER PRIMARY KEY REFERENCES equipment(id) ON DELETE CASCADE, "
+            "repair_count INTEGER, work_hours FLOAT, last_work_date DATE, last_year_repairs INTEGER)"
+        ))
+    conn.execute(text(
+        "CREATE TRIGGER IF NOT EXISTS equipment_stats_repair_ai AFTER INSERT ON repair BEGIN "
+        f"{_equipment_stats_refresh('new.equipment_id')}END"
+    ))
+    conn.execute(text(
+        "CREATE TRIGGER IF NOT EXISTS equipment_stats_repair_ad AFTER DELETE ON repair BEGIN "
+        f"{_equipment_stats_refresh('old.equipment_id')}END"
+    ))
+    # 다른 설비로 옮겨진 경우 옛 설비도 다시 계산
+    conn.execute(text(
+        "CREATE TRIGGER IF NOT EXISTS equipment_stats_repair_au "
+        "AFTER UPDATE OF equipment_id, work_date, work_hours ON repair BEGIN "
+        f"{_equipment_stats_refresh('new.equipment_id')}"
+        "DELETE FROM equipment_stats WHERE equipment_id = old.equipment_id "
+        "AND old.equipment_id IS NOT new.equipment_id; "
+        "INSERT INTO equipment_stats(equipment_id, repair_count, work_hours, last_work_date, last_year_repairs) "
+        f"{_equipment_stats_select('r.equipment_id = old.equipment_id AND old.equipment_id IS NOT new.equipment_id')}; "
+        "END"
+    ))
+    # 기존 데이터 채우기(최초 1회)
+    conn.execute(text("DELETE FROM equipment_stats"))
+    conn.execute(text(
+        "INSERT INTO equipment_stats(equipment_id, repair_count, work_hours, last_work_date, last_year_repairs) "
+        f"{_equipment_stats_select('r.equipment_id IS NOT NULL')}"
+    ))
+
+
+# ─────────────────────────────────────────────────────────────
+# 자주 쓰는 조회용 복합/부분 인덱스(실행 계획 점검: python -m services.query_plans)
+# - 부분 인덱스는 쿼리 WHERE에 같은 식이 '리터럴 그대로' 있어야 쓰임 → 조회 쪽도 이 식을 사용
+EQUIPMENT_ACTIVE_WHERE = "coalesce(is_deleted, 0) = 0"
+
+
+def _ensure_hot_query_indexes(conn):
+    if _table_exists(conn, "repair") and _col_exists(conn, "repair", "work_date"):
+        conn.execute(text(
+            "CREATE INDEX IF NOT EXISTS ix_repair_eq_date ON repair (equipment_id, work_date, id)"
+        ))
+    if _table_exists(conn, "change_log") and all(
+        _col_exists(conn, "change_log", c) for c in ("module", "record_id", "changed_at")
+    ):
+        conn.execute(text(
+            "CREATE INDEX IF NOT EXISTS ix_change_log_module_record ON change_log (module, record_id, changed_at)"
+        ))
+    if _table_exists(conn, "equipment") and _col_exists(conn, "equipment", "is_deleted"):
+        conn.execute(text(
+            f"CREATE INDEX IF NOT EXISTS ix_equipment_active_code ON equipment (code) WHERE {EQUIPMENT_ACTIVE_WHERE}"
+        ))
+
+
+# ─────────────────────────────────────────────────────────────
+# 버전 기반 마이그레이션
+# - schema_version 테이블에 적용된 번호를 기록
+# - 시작 시 MAX(version) 1회 조회 → 최신이면 create_all/PRAGMA 점검 모두 생략
+# - 새 스키마 변경은 아래 목록 끝에 (번호, 설명, 함수)로 추가
+MIGRATIONS = [
+    (1, "legacy column backfill", _migrate_legacy_columns),
+    (2, "equipment FTS5 index", _ensure_equipment_fts),
+    (3, "consumable ledger indexes + stock snapshots", _ensure_consumable_ledger),
+    (4, "consumable_txn import_key (idempotent Excel import)", _ensure_consumable_txn_import_key),
+    (5, "change_feed table + triggers (cross-client change detection)", _ensure_change_feed),
+    (6, "equipment_stats summary table + repair triggers", _ensure_equipment_stats),
+    (7, "composite/partial indexes for hot queries", _ensure_hot_query_indexes),
+]
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+
+def get_schema_version(conn) -> int:
     try:
-        if not _col_exists(conn, "consumable_txn", "created_at"):
-            conn.execute(text("ALTER TABLE consumable_txn ADD COLUMN created_at TEXT"))
-    except Exception:
-        pass
-    try:
-        if not _col_exists(conn, "consumable_txn", "txn_time"):
-            conn.execute(
-                text(
-                    "ALTER TABLE consumable_txn "
-                    "ADD COLUMN txn_time TEXT NOT NULL DEFAULT (datetime('now'))"
-                )
-            )
+        return int(conn.execute(text("SELECT MAX(version) FROM schema_version")).scalar() or 0)
     except Exception:
-        pass
+        return 0  # schema_version 테이블 없음 = 미관리 DB
 
 
-def _ensure_consumable_columns(conn):
-    if not _table_exists(conn, "consumable"):
-        return
+def get_applied_versions(conn) -> set:
     try:
-        if not _col_exists(conn, "consumable", "note"):
-            conn.execute(text("ALTER TABLE consumable ADD COLUMN note TEXT"))
+        return {int(v) for v in conn.execute(text("SELECT version FROM schema_version")).scalars()}
     except Exception:
-        pass
+        return set()  # schema_version 테이블 없음 = 미관리 DB
 
 
 def ensure_db():
     """
     - 모델 로드(메타데이터 등록)
-    - 테이블 생성
-    - 누락 컬럼 보강(증분 마이그레이션)
+    - 원격(DB 서비스) 모드면 아무것도 안 함
+    - 모든 단계가 기록돼 있으면 즉시 종료(네트워크 왕복 1회)
+    - 아니면 테이블 생성 + 미적용 마이그레이션만 순서대로 실행 후 번호 기록
+      (단계 함수가 False를 돌려주면 적용 못 한 것 → 기록하지 않음. 예: FTS 미지원 PC의 2단계)
     """
     importlib.import_module("models")  # 메타데이터에 모델 등록
 
-    # 테이블 생성
+    from services.remote import is_remote
+    if is_remote():
+        return  # 서버 모드: 스키마는 DB 서비스 프로세스가 관리
+
+    with engine.connect() as conn:
+        applied = get_applied_versions(conn)
+    missing = {v for v, _, _ in MIGRATIONS} - applied
+    if missing == {2} and not sqlite_supports_fts():
+        missing = set()   # 이 PC에선 만들 수 없는 FTS 색인만 남음 → 지원 PC에 맡김
+    elif 2 in applied and not sqlite_supports_fts():
+        log.error(
+            "SQLite %s는 FTS5/trigram(3.34+)을 지원하지 않습니다. 이 DB에는 설비 검색 색인이 있어 "
+            "설비 저장이 'no such module' 오류로 실패합니다.", sqlite3.sqlite_version,
+        )
+    if not missing:
+        return
+
+    # 테이블 생성(신규 테이블 포함)
     Base.metadata.create_all(bind=engine)
 
-    # 증분 마이그레이션
     with engine.begin() as conn:
-        _ensure_equipment_columns(conn)
-        _ensure_consumable_txn_columns(conn)
-        _ensure_consumable_columns(conn)
+        conn.execute(text(
+            "CREATE TABLE IF NOT EXISTS schema_version ("
+            "version INTEGER PRIMARY KEY, description TEXT, "
+            "applied_at TEXT NOT NULL DEFAULT (datetime('now')))"
+        ))
+
+    # 단계별 트랜잭션: 한 단계 실패가 앞 단계를 롤백하지 않도록
+    for version, desc, fn in MIGRATIONS:
+        if version not in missing:
+            continue
+        with engine.begin() as conn:
+            if fn(conn) is False:
+                continue
+            conn.execute(
+                text("INSERT OR IGNORE INTO schema_version(version, description) VALUES (:v, :d)"),
+                {"v": version, "d": desc},
+            )
@@ -3,10 +3,9 @@ from datetime import datetime, date
 from typing import Optional, List
 
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy import String, Integer, Date, DateTime, ForeignKey, Text, Float, UniqueConstraint
-from sqlalchemy import text
+from sqlalchemy import String, Integer, Date, DateTime, ForeignKey, Text, Float, UniqueConstraint, Index, text
 
-from db import Base, engine
+from db import Base, EQUIPMENT_ACTIVE_WHERE
 
 # ─────────────────────────────────────────────────────────────────────
 # 설비(Equipment)
@@ -65,6 +64,11 @@ class Equipment(Base):
         back_populates="equipment", cascade="all, delete-orphan", order_by="EquipmentAccessory.ord"
     )
 
+    __table_args__ = (
+        # 설비대장(보관함 제외) 코드순 — 삭제된 설비는 색인에서 빠짐
+        Index("ix_equipment_active_code", "code", sqlite_where=text(EQUIPMENT_ACTIVE_WHERE)),
+    )
+
 # ─────────────────────────────────────────────────────────────────────
 # 설비 사진
 class Photo(Base):
@@ -105,6 +109,11 @@ class Repair(Base):
     items: Mapped[List["RepairItem"]] = relationship(back_populates="repair", cascade="all, delete-orphan")
     photos: Mapped[List["RepairPhoto"]] = relationship(back_populates="repair", cascade="all, delete-orphan")
 
+    __table_args__ = (
+        # 설비별 이력(작업일 역순) / 이력카드 연도 필터
+        Index("ix_repair_eq_date", "equipment_id", "work_date", "id"),
+    )
+
 # ─────────────────────────────────────────────────────────────────────
 class Consumable(Base):
     __tablename__ = "consumable"
@@ -116,6 +125,40 @@ class Consumable(Base):
     note: Mapped[Optional[str]] = mapped_column(String(200))
     __table_args__ = (UniqueConstraint("name", "spec", name="uq_consumable_name_spec"),)
 
+# ─────────────────────────────────────────────────────────────────────
+# 소모품 입출고 원장(추가 전용) — qty: +입고 / -출고
+class ConsumableTxn(Base):
+    __tablename__ = "consumable_txn"
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    consumable_id: Mapped[int] = mapped_column(ForeignKey("consumable.id"))
+    qty: Mapped[float] = mapped_column(Float)
+    reason: Mapped[Optional[str]] = mapped_column(String(200))
+    related_repair_id: Mapped[Optional[int]] = mapped_column(Integer)       # 수리 삭제 후에도 이력은 남김(FK 없음)
+    txn_time: Mapped[datetime] = mapped_column(DateTime, default=datetime.now)
+    created_at: Mapped[Optional[datetime]] = mapped_column(DateTime, default=datetime.now)
+    import_key: Mapped[Optional[str]] = mapped_column(String(64))                # 엑셀 가져오기 행 해시(재가져오기 중복 방지)
+
+    __table_args__ = (
+        Index("ix_consumable_txn_cid_time", "consumable_id", "txn_time"),
+        Index("ix_consumable_txn_repair", "related_repair_id"),
+        Index("ux_consumable_txn_import_key", "import_key", unique=True,
+              sqlite_where=text("import_key IS NOT NULL")),
+    )
+
+# ─────────────────────────────────────────────────────────────────────
+# 월별 재고 스냅샷: as_of(매월 1일) 0시 직전까지의 원장 누계
+class ConsumableStockSnapshot(Base):
+    __tablename__ = "consumable_stock_snapshot"
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    consumable_id: Mapped[int] = mapped_column(ForeignKey("consumable.id", ondelete="CASCADE"))
+    as_of: Mapped[date] = mapped_column(Date)
+    qty: Mapped[float] = mapped_column(Float, default=0.0)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.now)
+
+    __table_args__ = (UniqueConstraint("consumable_id", "as_of", name="uq_stock_snapshot_cid_asof"),)
+
 # ─────────────────────────────────────────────────────────────────────
 class RepairItem(Base):
     __tablename__ = "repair_item"
@@ -165,66 +208,39 @@ class ChangeLog(Base):
     user: Mapped[Optional[str]] = mapped_column(String(100))
     changed_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
 
+    __table_args__ = (
+        Index("ix_change_log_module_record", "module", "record_id", "changed_at"),
+    )
+
+# ─────────────────────────────────────────────────────────────────────
+# 변경 피드: 트리거가 기록(db._ensure_change_feed), 각 PC가 seq 이후만 읽어 화면 부분 갱신
+class ChangeFeed(Base):
+    __tablename__ = "change_feed"
+
+    seq: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    tbl: Mapped[str] = mapped_column(String(50))                                # 'equipment' / 'repair' / ...
+    row_id: Mapped[int] = mapped_column(Integer)
+    parent_id: Mapped[Optional[int]] = mapped_column(Integer)                   # repair 등 → 설비 id
+    op: Mapped[str] = mapped_column(String(1))                                  # I / U / D
+    changed_at: Mapped[Optional[str]] = mapped_column(Text, server_default=text("(datetime('now'))"))
+
+    __table_args__ = ({"sqlite_autoincrement": True},)
+
+# ─────────────────────────────────────────────────────────────────────
+# 설비별 수리 요약: repair 트리거가 해당 설비 행만 다시 계산(db._ensure_equipment_stats)
+# 수리 이력이 없는 설비는 행 없음
+class EquipmentStats(Base):
+    __tablename__ = "equipment_stats"
+
+    equipment_id: Mapped[int] = mapped_column(ForeignKey("equipment.id", ondelete="CASCADE"), primary_key=True)
+    repair_count: Mapped[int] = mapped_column(Integer, default=0)               # 전체 수리 건수
+    work_hours: Mapped[float] = mapped_column(Float, default=0.0)               # 누적 수리 시간
+    last_work_date: Mapped[Optional[date]] = mapped_column(Date)                # 최근 수리일
+    last_year_repairs: Mapped[int] = mapped_column(Integer, default=0)          # 최근 수리일 연도의 건수
+
 # ─────────────────────────────────────────────────────────────────────
-# DB 초기화 + 경량 마이그레이션
+# DB 초기화 (구 호출부 호환) — 실제 작업은 db.ensure_db()의 버전 마이그레이션
 def init_db():
-    """테이블 생성 + 누락 컬럼 보강(기존 DB 안전 유지)."""
-    Base.metadata.create_all(engine)
-
-    # equipment 컬럼 보강
-    with engine.connect() as conn:
-        cols = {row[1] for row in conn.execute(text("PRAGMA table_info(equipment)")).fetchall()}
-        def add(sql: str): conn.execute(text(sql))
-
-        wanted = {
-            "no": "ALTER TABLE equipment ADD COLUMN no INTEGER",
-            "asset_name": "ALTER TABLE equipment ADD COLUMN asset_name VARCHAR(200)",
-            "alt_name": "ALTER TABLE equipment ADD COLUMN alt_name VARCHAR(200)",
-            "size_mm": "ALTER TABLE equipment ADD COLUMN size_mm VARCHAR(200)",
-            "voltage": "ALTER TABLE equipment ADD COLUMN voltage VARCHAR(50)",
-            "power_kwh": "ALTER TABLE equipment ADD COLUMN power_kwh FLOAT",
-            "util_air": "ALTER TABLE equipment ADD COLUMN util_air VARCHAR(200)",
-            "util_coolant": "ALTER TABLE equipment ADD COLUMN util_coolant VARCHAR(200)",
-            "util_vac": "ALTER TABLE equipment ADD COLUMN util_vac VARCHAR(200)",
-            "util_other": "ALTER TABLE equipment ADD COLUMN util_other VARCHAR(200)",
-            "purpose": "ALTER TABLE equipment ADD COLUMN purpose VARCHAR(200)",  # ★ 추가
-            "maker": "ALTER TABLE equipment ADD COLUMN maker VARCHAR(100)",
-            "maker_phone": "ALTER TABLE equipment ADD COLUMN maker_phone VARCHAR(50)",
-            "manufacture_date": "ALTER TABLE equipment ADD COLUMN manufacture_date DATE",
-            "in_year": "ALTER TABLE equipment ADD COLUMN in_year INTEGER",
-            "in_month": "ALTER TABLE equipment ADD COLUMN in_month INTEGER",
-            "in_day": "ALTER TABLE equipment ADD COLUMN in_day INTEGER",
-            "qty": "ALTER TABLE equipment ADD COLUMN qty FLOAT",
-            "purchase_price": "ALTER TABLE equipment ADD COLUMN purchase_price FLOAT",
-            "location": "ALTER TABLE equipment ADD COLUMN location VARCHAR(200)",
-            "note": "ALTER TABLE equipment ADD COLUMN note TEXT",
-            "part": "ALTER TABLE equipment ADD COLUMN part VARCHAR(100)",
-            "installed_on": "ALTER TABLE equipment ADD COLUMN installed_on DATE",
-            "status": "ALTER TABLE equipment ADD COLUMN status VARCHAR(20)",
-            "category": "ALTER TABLE equipment ADD COLUMN category VARCHAR(100)",
-            "is_deleted": "ALTER TABLE equipment ADD COLUMN is_deleted INTEGER DEFAULT 0",
-            "deleted_at": "ALTER TABLE equipment ADD COLUMN deleted_at DATETIME",
-        }
-        for c, sql in wanted.items():
-            if c not in cols: add(sql)
-
-    # repair 컬럼 보강
-    with engine.connect() as conn:
-        rcols = {row[1] for row in conn.execute(text("PRAGMA table_info(repair)")).fetchall()}
-        def add(sql: str): conn.execute(text(sql))
-        needed = {
-            "progress_status": "ALTER TABLE repair ADD COLUMN progress_status VARCHAR(20)",
-            "complete_date":  "ALTER TABLE repair ADD COLUMN complete_date DATE",
-            "vendor":         "ALTER TABLE repair ADD COLUMN vendor VARCHAR(100)",
-            "work_hours":     "ALTER TABLE repair ADD COLUMN work_hours FLOAT",
-        }
-        for c, sql in needed.items():
-            if c not in rcols: add(sql)
-
-    # photo 컬럼 보강(file_path)
-    with engine.connect() as conn:
-        pcols = {row[1] for row in conn.execute(text("PRAGMA table_info(photo)")).fetchall()}
-        if "file_path" not in pcols:
-            conn.execute(text("ALTER TABLE photo ADD COLUMN file_path VARCHAR(500)"))
-
-    Base.metadata.create_all(engine)
+    """테이블 생성 + 누락 컬럼 보강(기존 DB 안전 유지). 최신 스키마면 버전 조회 1회로 끝."""
+    from db import ensure_db
+    ensure_db()
@@ -5,15 +5,17 @@ from types import SimpleNamespace
 from sqlalchemy import select, delete
 from sqlalchemy.orm import Session
 
-from db import session_scope
+from db import session_scope, read_session_scope
+from services.remote import remote_op
 from models import EquipmentAccessory
 
 
+@remote_op("read")
 def list_accessories(equipment_id: int) -> List[SimpleNamespace]:
     """
     UI 바인딩이 안전하도록 DTO(SimpleNamespace)로 반환.
     """
-    with session_scope() as s:
+    with read_session_scope() as s:
         rows = (
             s.execute(
                 select(EquipmentAccessory)
@@ -52,6 +54,7 @@ def _normalize_rows(rows: Iterable[Tuple[str, str, str]]) -> List[Tuple[str, str
     return out
 
 
+@remote_op("write")
 def replace_accessories(
     equipment_id: int,
     rows: Iterable[Tuple[str, str, str]],
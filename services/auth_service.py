@@ -10,6 +10,7 @@ from sqlalchemy import (
 from sqlalchemy.exc import IntegrityError
 
 from db import session_scope
+from services.remote import remote_op
 
 # ─────────────────────────────────────────
 # DB 테이블(코어) 정의: ORM Base에 의존하지 않음
@@ -111,6 +112,7 @@ def _migrate_from_users_json_if_needed():
 # ─────────────────────────────────────────
 # 퍼블릭 API
 
+@remote_op("write")
 def ensure_default_admin() -> None:
     """테이블 보장 + (유저 없으면) users.json 이관 + admin/1234 생성"""
     _ensure_table()
@@ -126,7 +128,8 @@ def ensure_default_admin() -> None:
             ))
             s.commit()
 
-def verify(name: str, password: str) -> bool:
+@remote_op("write")
+def verify(name: str, password: str) -> bool:   # last_login_at 갱신
     _ensure_table()
     name = (name or "").strip()
     if not name or not password:
@@ -143,12 +146,14 @@ def verify(name: str, password: str) -> bool:
             s.commit()
         return ok
 
+@remote_op("read")
 def get_role(name: str) -> str:
     _ensure_table()
     with session_scope() as s:
         row = s.execute(select(USERS.c.role).where(USERS.c.name == name)).first()
         return (row[0] if row else "user")
 
+@remote_op("read")
 def list_users() -> List[Dict[str, Any]]:
     _ensure_table()
     with session_scope() as s:
@@ -162,6 +167,7 @@ def list_users() -> List[Dict[str, Any]]:
 def list_users_detailed() -> List[Dict[str, Any]]:
     return [{"name": u["name"], "role": u["role"]} for u in list_users()]
 
+@remote_op("write")
 def create_user(name: str, password: str, role: str = "user", email: Optional[str]=None) -> None:
     _ensure_table()
     name = (name or "").strip()
@@ -187,6 +193,7 @@ def create_user(name: str, password: str, role: str = "user", email: Optional[st
 def add_user(name: str, password: str, role: str = "user") -> None:
     create_user(name, password, role=role)
 
+@remote_op("write")
 def change_password(name: str, new_password: str) -> None:
     _ensure_table()
     name = (name or "").strip()
@@ -203,6 +210,7 @@ def change_password(name: str, new_password: str) -> None:
             raise ValueError("사용자를 찾을 수 없습니다.")
         s.commit()
 
+@remote_op("write")
 def set_role(name: str, role: str) -> None:
     _ensure_table()
     name = (name or "").strip()
@@ -222,6 +230,7 @@ def set_role(name: str, role: str) -> None:
                  .values(role=role, updated_at=_now()))
         s.commit()
 
+@remote_op("write")
 def set_active(name: str, active: bool) -> None:
     _ensure_table()
     name = (name or "").strip()
@@ -238,6 +247,7 @@ def set_active(name: str, active: bool) -> None:
                  .values(is_active=bool(active), updated_at=_now()))
         s.commit()
 
+@remote_op("write")
 def delete_user(name: str) -> None:
     _ensure_table()
     name = (name or "").strip()
@@ -0,0 +1,134 @@
+from __future__ import annotations
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import text
+
+import db
+from services.remote import remote_op, is_remote
+
+# ─────────────────────────────────────────────────────────
+# 다른 PC의 변경 감지(change feed)
+# - 트리거가 change_feed(seq, tbl, row_id, parent_id, op)에 변경 행을 기록(db 마이그레이션 5)
+# - ChangeFeedPoller.poll(): 전용 연결의 PRAGMA data_version 비교(파일 변경 없으면 쿼리 1번으로 끝)
+#   → 바뀌었을 때만 마지막 seq 이후 항목을 가져와 ChangeBatch로 묶음
+# - 각 탭은 ChangeBatch에서 자기 테이블의 id만 골라 그 행만 다시 조회/반영
+# - 서버 모드(services/remote.py)에선 data_version 확인 없이 DB 서비스에 seq 이후 항목만 물어봄
+
+FEED_MAX_ROWS = 500        # 한 번에 이보다 많이 바뀌면(엑셀 가져오기 등) 전체 새로고침 권장
+FEED_KEEP_DAYS = 2         # 이보다 오래된 항목은 정리(폴링 간격에 비해 충분히 김)
+
+
+@dataclass
+class ChangeBatch:
+    seq: int                                                       # 이번에 반영한 마지막 seq
+    rows: Dict[str, Dict[int, str]] = field(default_factory=dict)  # tbl → {row_id: 마지막 op(I/U/D)}
+    parents: Dict[str, Set[int]] = field(default_factory=dict)     # tbl → 상위 설비 id(repair 등)
+    overflow: bool = False                                         # True면 항목 대신 전체 새로고침
+
+    def touched(self, table: str) -> bool:
+        return self.overflow or bool(self.rows.get(table))
+
+    def ids(self, table: str) -> Dict[int, str]:
+        return self.rows.get(table, {})
+
+    def parent_ids(self, table: str) -> Set[int]:
+        return self.parents.get(table, set())
+
+
+class ChangeFeedPoller:
+    """
+    data_version 확인용 영구 연결 1개를 가진 폴러(한 번에 한 스레드에서만 poll 호출).
+    data_version은 '다른 연결'의 커밋에만 바뀌므로 이 연결은 읽기만 함(피드 조회는 일반 세션).
+    """
+    def __init__(self, max_rows: int = FEED_MAX_ROWS):
+        self._max_rows = max_rows
+        self._conn = None
+        self._version: Optional[int] = None
+        self._seq: Optional[int] = None
+
+    def _connect(self):
+        self._conn = db.engine.connect()
+        self._version = None
+
+    def close(self) -> None:
+        if self._conn is not None:
+            try:
+                self._conn.close()
+            except Exception:
+                pass
+        self._conn = None
+
+    def _data_changed(self) -> bool:
+        if is_remote():
+            return True
+        if self._conn is None:
+            self._connect()
+        ver = self._conn.exec_driver_sql("PRAGMA data_version").scalar()
+        if ver == self._version:
+            return False
+        self._version = ver
+        return True
+
+    def poll(self) -> Optional[ChangeBatch]:
+        """변경 없으면 None. 첫 호출은 현재 위치만 기억하고 None."""
+        try:
+            if not self._data_changed():
+                return None
+            if self._seq is None:
+                self._seq = feed_max_seq()
+                return None
+
+            latest, got = fetch_changes(self._seq, self._max_rows + 1)
+            # 백업 복원 등으로 피드가 되감겼거나, 너무 많거나, 정리(prune)로 중간이 비었으면
+            # 항목 단위 반영 불가 → 전체 새로고침
+            if latest < self._seq or (got and (len(got) > self._max_rows or got[0][0] > self._seq + 1)):
+                self._seq = latest
+                return ChangeBatch(seq=self._seq, overflow=True)
+            if not got:
+                return None
+
+            batch = ChangeBatch(seq=got[-1][0])
+            for _seq, tbl, row_id, parent_id, op in got:
+                batch.rows.setdefault(tbl, {})[int(row_id)] = op
+                if parent_id is not None:
+                    batch.parents.setdefault(tbl, set()).add(int(parent_id))
+            self._seq = batch.seq
+            return batch
+        except Exception:
+            self.close()   # 네트워크 끊김 등 → 다음 폴링에서 새 연결, 마지막 seq부터 이어 받음
+            raise
+        finally:
+            try:
+                if self._conn is not None and self._conn.in_transaction():
+                    self._conn.rollback()
+            except Exception:
+                pass
+
+
+@remote_op("read")
+def feed_max_seq() -> int:
+    with db.session_scope() as s:
+        return int(s.execute(text("SELECT COALESCE(MAX(seq), 0) FROM change_feed")).scalar() or 0)
+
+
+@remote_op("read")
+def fetch_changes(after_seq: int, limit: int) -> Tuple[int, List[Tuple[int, str, int, Optional[int], str]]]:
+    """(현재 최대 seq, seq 이후 피드 항목 (seq, tbl, row_id, parent_id, op) 최대 limit개)."""
+    with db.session_scope() as s:
+        latest = int(s.execute(text("SELECT COALESCE(MAX(seq), 0) FROM change_feed")).scalar() or 0)
+        rows = s.execute(text(
+            "SELECT seq, tbl, row_id, parent_id, op FROM change_feed "
+            "WHERE seq > :s ORDER BY seq LIMIT :n"
+        ), {"s": int(after_seq), "n": int(limit)}).all()
+        return latest, [tuple(r) for r in rows]
+
+
+@remote_op("write")
+def prune_change_feed(keep_days: int = FEED_KEEP_DAYS) -> int:
+    """오래된 피드 항목 삭제 → 지운 개수."""
+    with db.session_scope() as s:
+        res = s.execute(text(
+            "DELETE FROM change_feed WHERE changed_at < datetime('now', :age)"
+        ), {"age": f"-{int(keep_days)} days"})
+        return int(res.rowcount or 0)
@@ -0,0 +1,91 @@
+from __future__ import annotations
+from typing import List, Optional, Sequence, Tuple
+
+from sqlalchemy import select, desc, and_
+
+from db import session_scope
+from models import ChangeLog
+from services.remote import remote_op
+
+# ─────────────────────────────────────────────────────────
+# 변경이력(change_log) 조회 — ChangeLogDialog 용
+# - 스키마마다 컬럼명이 달라 '있는' 컬럼만 골라 씀(change_log_columns)
+# - 서버 모드에선 DB 서비스에서 실행(화면은 컬럼 이름만 넘김)
+
+
+def _col(*names):
+    """ChangeLog 모델에 '있는' 첫 번째 컬럼 속성."""
+    for n in names:
+        if hasattr(ChangeLog, n):
+            return getattr(ChangeLog, n)
+    return None
+
+
+def _col_name(*names) -> Optional[str]:
+    for n in names:
+        if hasattr(ChangeLog, n):
+            return n
+    return None
+
+
+def change_log_columns() -> List[Tuple[str, str]]:
+    """[(머리글, 컬럼 속성 이름)] — 시간/사용자/필드/이전/이후 중 있는 것만. 최소 1개."""
+    out = []
+    for header, names in (
+        ("시간",   ("changed_at", "created_at", "ts", "timestamp")),
+        ("사용자", ("changed_by", "user", "username", "author")),
+        ("필드",   ("field", "column", "attr")),
+        ("이전",   ("old_value", "before", "old", "prev_value")),
+        ("이후",   ("new_value", "after", "new", "cur_value")),
+    ):
+        n = _col_name(*names)
+        if n:
+            out.append((header, n))
+    if not out:
+        out.append(("시간", list(ChangeLog.__table__.columns)[0].key))
+    return out
+
+
+@remote_op("read")
+def list_change_log(table_name: str, record_id: int, record_code: Optional[str] = None,
+                    columns: Sequence[str] = ()) -> List[Tuple]:
+    """
+    대상 레코드의 변경이력(최신순). columns: 가져올 ChangeLog 속성 이름들(없으면 change_log_columns()).
+    where 조합을 차례대로 시도해 첫 번째로 결과가 나오는 쿼리를 사용.
+    """
+    select_cols = [getattr(ChangeLog, n) for n in (columns or [n for _, n in change_log_columns()])
+                   if hasattr(ChangeLog, n)]
+    if not select_cols:
+        return []
+
+    # where 조건 컬럼 자동 감지
+    name_col = _col("table_name", "module", "table", "entity")
+    id_col   = _col("record_id", "target_id", "entity_id", "equipment_id")
+    code_col = _col("record_code", "code", "target_code", "equipment_code", "key", "record_key")
+
+    combos = []
+    if name_col is not None and id_col is not None:
+        combos.append(and_(name_col == table_name, id_col == record_id))
+    if name_col is not None and code_col is not None and record_code:
+        combos.append(and_(name_col == table_name, code_col == record_code))
+    if id_col is not None:
+        combos.append(id_col == record_id)
+    if code_col is not None and record_code:
+        combos.append(code_col == record_code)
+    if name_col is not None:
+        combos.append(name_col == table_name)
+    if not combos:  # 아무 필터 컬럼도 없으면 전체(디버그용)
+        combos.append(None)
+
+    order_col = _col("changed_at", "created_at", "ts", "timestamp") or _col("id") or select_cols[0]
+
+    with session_scope() as s:
+        for cond in combos:
+            stmt = select(*select_cols)
+            if cond is not None:
+                stmt = stmt.where(cond)
+            stmt = stmt.order_by(desc(order_col))
+            rows = s.execute(stmt).all()
+            if rows:
+                return [tuple(r) for r in rows]
+        return []
@@ -1,11 +1,14 @@
 from __future__ import annotations
-from typing import Optional, Tuple
+from typing import Dict, Iterable, List, Optional, Tuple
 from types import SimpleNamespace
+from datetime import date, datetime, timedelta
 import os
 import pandas as pd
-from sqlalchemy import select, delete, text
+import sqlite3
+from sqlalchemy import select, delete, insert, text, or_, bindparam, DateTime
 
-from db import session_scope
+from db import session_scope, read_session_scope
+from services.remote import remote_op
 from models import Consumable
 
 # ConsumableTxn 이 없을 수도 있으므로 선택적 임포트
@@ -43,49 +46,32 @@ def _txn_columns(s) -> set[str]:
         pass
     return cols
 
-def _insert_txn_safe(
-    s,
-    consumable_id: int,
-    qty: float,
-    reason: Optional[str],
-    related_repair_id: Optional[int],
-    when_dt,  # datetime
-):
-    """
-    consumable_txn 테이블이 존재하고, 해당 컬럼이 있을 때만 안전하게 INSERT.
-    - txn_time / created_at 컬럼이 있으면 when_dt로 채움
-    - 테이블이 없거나 컬럼이 없으면 아무 것도 하지 않음(에러 없음)
-    """
+# 원장 INSERT 컬럼(모델이 있으면 고정, 없으면 실제 테이블에 있는 것만) — 없으면 빈 목록(기록 생략)
+_TXN_OPTIONAL_COLS = ("reason", "related_repair_id", "txn_time", "created_at")
+
+def _txn_names(s) -> list[str]:
+    if HAS_TXN:
+        return ["consumable_id", "qty", *_TXN_OPTIONAL_COLS]
     cols = _txn_columns(s)
     if not cols:
-        return
-
-    names = ["consumable_id", "qty"]
-    params = {"consumable_id": int(consumable_id), "qty": float(qty)}
-
-    if "reason" in cols:
-        names.append("reason"); params["reason"] = (reason or None)
-    if "related_repair_id" in cols:
-        names.append("related_repair_id"); params["related_repair_id"] = related_repair_id
-    if "txn_time" in cols:
-        names.append("txn_time"); params["txn_time"] = when_dt
-    if "created_at" in cols:
-        names.append("created_at"); params["created_at"] = when_dt
-
-    cols_sql = ", ".join(names)
-    ph = ", ".join([f":{k}" for k in names])
-    s.execute(text(f"INSERT INTO consumable_txn ({cols_sql}) VALUES ({ph})"), params)
+        return []
+    return ["consumable_id", "qty"] + [c for c in _TXN_OPTIONAL_COLS if c in cols]
 
 # ─────────────────────────────────────────────────────────────
 # 조회 (세션 안전: DTO로 반환, 컬럼 유무 무관)
-def list_consumables(keyword: str = "") -> list[SimpleNamespace]:
+@remote_op("read")
+def list_consumables(keyword: str = "", ids: Optional[Iterable[int]] = None) -> list[SimpleNamespace]:
     """
     ✅ 세션 안에서 ORM → SimpleNamespace 로 변환해서 반환
        (세션 종료 후에도 안전하게 속성 접근 가능)
+    ids: 주어지면 그 품목만(변경 피드 부분 갱신용)
     """
     kw = (keyword or "").strip().lower()
-    with session_scope() as s:
-        rows = s.execute(select(Consumable).order_by(Consumable.id.asc())).scalars().all()
+    with read_session_scope() as s:
+        q = select(Consumable).order_by(Consumable.id.asc())
+        if ids is not None:
+            q = q.where(Consumable.id.in_(list(ids)))
+        rows = s.execute(q).scalars().all()
         out: list[SimpleNamespace] = []
         for r in rows:
             name = getattr(r, "name", "") or ""
@@ -102,6 +88,7 @@ def list_consumables(keyword: str = "") -> list[SimpleNamespace]:
             ))
         return out  # ← 세션 안에서 변환 끝!
 
+@remote_op("read")
 def get_consumable(cid: int) -> Optional[SimpleNamespace]:
     """
     ✅ 단건도 세션 안에서 안전 객체로 변환해 반환
@@ -121,6 +108,7 @@ def get_consumable(cid: int) -> Optional[SimpleNamespace]:
 
 # ─────────────────────────────────────────────────────────────
 # 생성/수정(업서트) — 존재하는 컬럼만 안전하게 설정
+@remote_op("write")
 def upsert_consumable(
     name: str,
     spec: str = "",
@@ -128,43 +116,59 @@ def upsert_consumable(
     note: str = "",
     cid: int | None = None,
     stock_qty: float | None = None,   # 가져올 때 현재고도 반영하고 싶을 때
+    *,
+    session=None,                     # 호출자 트랜잭션에 합류(가져오기 청크 단위 커밋)
 ) -> Consumable:
+    if session is not None:
+        return _upsert_consumable_in_session(session, name, spec, min_qty, note, cid, stock_qty)
     with session_scope() as s:
-        c: Consumable | None = None
-        if cid:
-            c = s.get(Consumable, int(cid))
-
-        if not c:
-            stmt = select(Consumable).where(
-                Consumable.name == name,
-                Consumable.spec == (spec or None),
-            )
-            c = s.execute(stmt).scalars().first()
+        return _upsert_consumable_in_session(s, name, spec, min_qty, note, cid, stock_qty)
 
-        if not c:
-            # 생성 시에는 안전하게 최소 필드만 생성 후 속성 셋(존재시만)
-            c = Consumable(name=name, spec=(spec or None))
-            if hasattr(c, "min_qty"):
-                c.min_qty = float(min_qty or 0.0)
-            if stock_qty is not None and hasattr(c, "stock_qty"):
-                c.stock_qty = float(stock_qty)
-            if hasattr(c, "note"):
-                c.note = (note or None) if note else None
-            s.add(c)
-            s.flush()
-        else:
-            c.name = name
-            c.spec = spec or None
-            if hasattr(c, "min_qty"):
-                c.min_qty = float(min_qty or 0.0)
-            if stock_qty is not None and hasattr(c, "stock_qty"):
-                c.stock_qty = float(stock_qty)
-            if hasattr(c, "note"):
-                c.note = note or None
-        return c
+def _upsert_consumable_in_session(
+    s,
+    name: str,
+    spec: str,
+    min_qty: float,
+    note: str,
+    cid: int | None,
+    stock_qty: float | None,
+) -> Consumable:
+    c: Consumable | None = None
+    if cid:
+        c = s.get(Consumable, int(cid))
+
+    if not c:
+        stmt = select(Consumable).where(
+            Consumable.name == name,
+            Consumable.spec == (spec or None),
+        )
+        c = s.execute(stmt).scalars().first()
+
+    if not c:
+        # 생성 시에는 안전하게 최소 필드만 생성 후 속성 셋(존재시만)
+        c = Consumable(name=name, spec=(spec or None))
+        if hasattr(c, "min_qty"):
+            c.min_qty = float(min_qty or 0.0)
+        if stock_qty is not None and hasattr(c, "stock_qty"):
+            c.stock_qty = float(stock_qty)
+        if hasattr(c, "note"):
+            c.note = (note or None) if note else None
+        s.add(c)
+        s.flush()
+    else:
+        c.name = name
+        c.spec = spec or None
+        if hasattr(c, "min_qty"):
+            c.min_qty = float(min_qty or 0.0)
+        if stock_qty is not None and hasattr(c, "stock_qty"):
+            c.stock_qty = float(stock_qty)
+        if hasattr(c, "note"):
+            c.note = note or None
+    return c
 
 # ─────────────────────────────────────────────────────────────
 # 삭제
+@remote_op("write")
 def delete_consumable(consumable_id: int, force: bool = False) -> None:
     with session_scope() as s:
         c = s.get(Consumable, consumable_id)
@@ -191,156 +195,294 @@ def delete_consumable(consumable_id: int, force: bool = False) -> None:
         s.execute(delete(Consumable).where(Consumable.id == c.id))
 
 # ─────────────────────────────────────────────────────────────
-# 재고 조정 (레거시 txn_time/created_at 제약까지 안전)
+# 재고 증감 — 조건부 UPDATE 한 번(읽고-계산-쓰기 없음 → 여러 PC 동시 출고에도 누락 없음)
+# RETURNING은 SQLite 3.35+ — 그 전 버전은 같은 트랜잭션에서 한 번 더 읽음(쓰기 잠금은 이미 잡힌 상태)
+_HAS_RETURNING = sqlite3.sqlite_version_info >= (3, 35, 0)
+
+_STOCK_DELTA_SQL = (
+    "UPDATE consumable SET stock_qty = CASE "
+    "WHEN abs(COALESCE(stock_qty, 0) + :d) <= :eps THEN 0 "   # 근사 0 스냅
+    "ELSE COALESCE(stock_qty, 0) + :d END "
+    "WHERE id = :id AND COALESCE(stock_qty, 0) + :d >= -:eps"
+)
+
+def _apply_stock_delta(s, cid: int, d: float) -> float:
+    """재고에 d를 더함 → 반영 후 재고. 없거나 음수가 되면 ValueError(아무것도 안 바뀜)."""
+    params = {"id": cid, "d": d, "eps": EPS}
+    if _HAS_RETURNING:
+        row = s.execute(text(_STOCK_DELTA_SQL + " RETURNING stock_qty"), params).first()
+        if row is not None:
+            return float(row[0] or 0.0)
+    elif s.execute(text(_STOCK_DELTA_SQL), params).rowcount:
+        return float(s.execute(select(Consumable.stock_qty).where(Consumable.id == cid)).scalar() or 0.0)
+    # 실패 사유 안내용(실패 시에만 추가 조회)
+    cur = s.execute(select(Consumable.stock_qty).where(Consumable.id == cid)).first()
+    if cur is None:
+        raise ValueError(f"해당 소모품이 없습니다. (ID: {cid})")
+    raise ValueError(f"재고 부족: 현재 {float(cur[0] or 0.0)}, 요청 {d}")
+
+def _insert_txns(s, rows: List[Tuple[int, float, Optional[str], Optional[int]]], when) -> None:
+    """원장 [(consumable_id, qty, reason, related_repair_id), ...] 일괄 INSERT(같은 트랜잭션)."""
+    if HAS_TXN:
+        s.execute(insert(ConsumableTxn), [
+            {"consumable_id": cid, "qty": d, "reason": (reason or None),
+             "related_repair_id": rid, "txn_time": when, "created_at": when}
+            for cid, d, reason, rid in rows
+        ])
+        return
+    names = _txn_names(s)
+    if not names:
+        return
+    params = []
+    for cid, d, reason, rid in rows:
+        p = {"consumable_id": cid, "qty": d, "reason": (reason or None),
+             "related_repair_id": rid, "txn_time": when, "created_at": when}
+        params.append({k: p[k] for k in names})
+    cols_sql = ", ".join(names)
+    ph = ", ".join(f":{k}" for k in names)
+    s.execute(text(f"INSERT INTO consumable_txn ({cols_sql}) VALUES ({ph})"), params)
+
+@remote_op("write")
 def adjust_stock(
     consumable_id: int,
     qty: float,
     reason: str = "",
     related_repair_id: int | None = None,
     when=None,  # datetime | None (엑셀에서 일시 지정 시 사용)
-) -> Tuple[Optional[Consumable], Optional[object]]:
+) -> float:
     """
-    ✅ 중요: ConsumableTxn ORM이 있으면 우선 사용하고,
-             실패 시(또는 ORM이 없으면) 재고는 적용하되
-             안전 SQL로 이력 기록을 시도합니다(테이블/컬럼이 있으면).
+    재고 증감 + 원장 1행을 한 트랜잭션에서(조건부 UPDATE ... RETURNING → INSERT).
+    재고가 음수가 되면 ValueError. 반환: 반영 후 재고.
     """
-    from datetime import datetime as _dt
     if not qty or qty == 0:
         raise ValueError("수량(qty)은 0이 될 수 없습니다.")
-
-    when = when or _dt.now()
+    when = when or datetime.now()
+    cid, qty = int(consumable_id), float(qty)
 
     with session_scope() as s:
-        # 1) 현재 재고 읽고 새 재고 계산
-        c = s.get(Consumable, consumable_id)
-        if not c:
-            raise ValueError("해당 소모품이 없습니다.")
-
-        if hasattr(c, "stock_qty"):
-            cur = float(getattr(c, "stock_qty", 0.0) or 0.0)
-            proposed = cur + float(qty)
-            if proposed < -EPS:
-                raise ValueError(f"재고 부족: 현재 {cur}, 요청 {qty}")
-            # 근사 0 스냅
-            if abs(proposed) <= EPS:
-                proposed = 0.0
-            setattr(c, "stock_qty", proposed)
-        else:
-            # stock 컬럼 자체가 없다면, 로그만 남기거나 skip
-            proposed = None  # 알림용
-
-        txn = None
-
-        if HAS_TXN:
-            # 3) 이력 ORM으로 시도
-            try:
-                txn = ConsumableTxn(
-                    consumable_id=getattr(c, "id", consumable_id),
-                    qty=float(qty),
-                    reason=reason or None,
-                    related_repair_id=related_repair_id,
-                )
-                if hasattr(txn, "txn_time"):
-                    txn.txn_time = when
-                if hasattr(txn, "created_at"):
-                    txn.created_at = when
-                s.add(txn)
-                s.flush()
-            except Exception:
-                # 4) 문제 발생 → 롤백되며 재고 변경도 취소됨. 재반영 + 안전 SQL로 이력 삽입
-                s.rollback()
-
-                c2 = s.get(Consumable, consumable_id)
-                if c2 and hasattr(c2, "stock_qty") and proposed is not None:
-                    setattr(c2, "stock_qty", proposed)
-                    s.flush()
-
-                _insert_txn_safe(
-                    s,
-                    consumable_id=getattr(c2 or c, "id", consumable_id),
-                    qty=float(qty),
-                    reason=(reason or None),
-                    related_repair_id=related_repair_id,
-                    when_dt=when,
-                )
-                txn = None
-        else:
-            # ORM 모델이 없으면: 재고 적용(가능 시) + 안전 SQL만 시도
-            _insert_txn_safe(
-                s,
-                consumable_id=getattr(c, "id", consumable_id),
-                qty=float(qty),
-                reason=(reason or None),
-                related_repair_id=related_repair_id,
-                when_dt=when,
-            )
-            txn = None
+        new_qty = _apply_stock_delta(s, cid, qty)
+        _insert_txns(s, [(cid, qty, reason, related_repair_id)], when)
+        return new_qty
 
-        s.flush()
-        return c, txn
-
-def zero_out_stock(consumable_id: int, reason: str = "재고정리(0으로)") -> Tuple[Optional[Consumable], Optional[object]]:
+# ─────────────────────────────────────────────────────────────
+# 재고 일괄 반영 (호출자 세션 안에서 — 추가 트랜잭션/락 없음)
+def apply_stock_deltas(
+    s,
+    deltas: Iterable[Tuple[int, float, Optional[str], Optional[int]]],
+    when=None,  # datetime | None
+) -> int:
     """
-    ✅ 위와 동일 로직: ORM이 있으면 우선 사용,
-       실패하거나 ORM이 없으면 안전 SQL로만 기록.
+    [(consumable_id, delta, reason, related_repair_id), ...] 를 호출자 세션 s 에서 반영.
+    - 재고: 건마다 조건부 UPDATE 1회(_apply_stock_delta, 원자적, 근사 0 스냅)
+    - 재고가 음수가 되면 ValueError → 호출자 트랜잭션 전체 롤백
+    - 이력: consumable_txn 일괄 INSERT
+    반환: 반영 건수
     """
-    from datetime import datetime as _dt
-    with session_scope() as s:
-        c = s.get(Consumable, consumable_id)
-        if not c:
-            raise ValueError("해당 소모품이 없습니다.")
-        if not hasattr(c, "stock_qty"):
-            # 재고 컬럼이 없다면 아무 것도 하지 않음
-            return c, None
+    when = when or datetime.now()
 
-        cur = float(getattr(c, "stock_qty", 0.0) or 0.0)
-        if _is_zero(cur):
-            return c, None
+    rows = [(int(cid), float(d or 0.0), reason, rid) for cid, d, reason, rid in (deltas or ())]
+    rows = [r for r in rows if not _is_zero(r[1])]
+    if not rows:
+        return 0
 
-        delta = -cur  # 전량 출고로 0으로
-        when = _dt.now()
+    for cid, d, _reason, _rid in rows:
+        _apply_stock_delta(s, cid, d)
+    _insert_txns(s, rows, when)
+    return len(rows)
 
-        # 먼저 0으로 맞춤
-        setattr(c, "stock_qty", 0.0)
+@remote_op("write")
+def zero_out_stock(consumable_id: int, reason: str = "재고정리(0으로)") -> float:
+    """
+    재고를 0으로(전량 출고 원장 1행과 함께). 반환: 정리한 수량(원장 qty, 이미 0이면 0.0).
+    - 원장을 먼저 INSERT ... SELECT(-현재 재고)로 기록 → 이 문장에서 쓰기 잠금을 잡으므로
+      이어지는 같은 양의 조건부 UPDATE 사이에 다른 PC의 출고가 끼어들 수 없음
+    """
+    cid = int(consumable_id)
+    when = datetime.now()
+    params = {"id": cid, "reason": (reason or None), "when": when, "eps": EPS}
 
-        txn = None
-        if HAS_TXN:
-            try:
-                txn = ConsumableTxn(
-                    consumable_id=getattr(c, "id", consumable_id),
-                    qty=delta,
-                    reason=reason or None,
-                    related_repair_id=None,
-                )
-                if hasattr(txn, "txn_time"):
-                    txn.txn_time = when
-                if hasattr(txn, "created_at"):
-                    txn.created_at = when
-                s.add(txn)
-                s.flush()
-            except Exception:
-                s.rollback()
-
-                c2 = s.get(Consumable, consumable_id)
-                if c2 and hasattr(c2, "stock_qty"):
-                    setattr(c2, "stock_qty", 0.0)
-                    s.flush()
-
-                _insert_txn_safe(
-                    s, consumable_id=getattr(c2 or c, "id", consumable_id), qty=float(delta),
-                    reason=(reason or None), related_repair_id=None, when_dt=when
-                )
-                txn = None
+    with session_scope() as s:
+        names = _txn_names(s)
+        if not names:
+            # 원장 테이블 없음 → 재고만 0으로
+            if not s.execute(text("UPDATE consumable SET stock_qty = 0 WHERE id = :id"), params).rowcount:
+                raise ValueError("해당 소모품이 없습니다.")
+            return 0.0
+
+        exprs = {
+            "consumable_id": "id", "qty": "-COALESCE(stock_qty, 0)", "reason": ":reason",
+            "related_repair_id": "NULL", "txn_time": ":when", "created_at": ":when",
+        }
+        sql = (
+            f"INSERT INTO consumable_txn ({', '.join(names)}) "
+            f"SELECT {', '.join(exprs[k] for k in names)} FROM consumable "
+            "WHERE id = :id AND abs(COALESCE(stock_qty, 0)) > :eps"
+        )
+        stmt = text(sql + (" RETURNING qty" if _HAS_RETURNING else "")).bindparams(
+            bindparam("when", type_=DateTime)
+        )
+        res = s.execute(stmt, params)
+        if _HAS_RETURNING:
+            row = res.first()
+            delta = None if row is None else float(row[0])
         else:
-            _insert_txn_safe(
-                s, consumable_id=getattr(c, "id", consumable_id), qty=float(delta),
-                reason=(reason or None), related_repair_id=None, when_dt=when
-            )
-            txn = None
+            delta = float(s.execute(text(
+                "SELECT qty FROM consumable_txn WHERE rowid = last_insert_rowid()"
+            )).scalar()) if res.rowcount else None
 
-        s.flush()
-        return c, txn
+        if delta is None:
+            if s.get(Consumable, cid) is None:
+                raise ValueError("해당 소모품이 없습니다.")
+            return 0.0   # 이미 0
+        _apply_stock_delta(s, cid, delta)
+        return delta
+
+# ─────────────────────────────────────────────────────────────
+# 원장 조회 / 월별 스냅샷 / 특정 시점 재고
+def _bound_str(x) -> str:
+    """date → 다음날 0시(해당일 포함), datetime → 그대로. txn_time 문자열 비교용."""
+    if isinstance(x, datetime):
+        return x.strftime("%Y-%m-%d %H:%M:%S.%f")
+    return (x + timedelta(days=1)).isoformat()
+
+@remote_op("read")
+def list_consumable_txns(keyword: str = "", start_date: date | None = None, end_date: date | None = None) -> list[dict]:
+    """
+    기간/키워드로 입출고 원장 조회(인덱스 범위 검색).
+    반환 dict: txn_time, reason, qty, name, spec, related_repair_id
+    """
+    if not HAS_TXN:
+        return []
+    T = ConsumableTxn
+    stmt = (
+        select(T.txn_time, T.reason, T.qty, Consumable.name, Consumable.spec, T.related_repair_id)
+        .join(Consumable, Consumable.id == T.consumable_id, isouter=True)
+    )
+    if start_date:
+        stmt = stmt.where(T.txn_time >= datetime(start_date.year, start_date.month, start_date.day))
+    if end_date:
+        stmt = stmt.where(T.txn_time < datetime(end_date.year, end_date.month, end_date.day) + timedelta(days=1))
+    kw = (keyword or "").strip()
+    if kw:
+        like = f"%{kw}%"
+        stmt = stmt.where(or_(Consumable.name.like(like), Consumable.spec.like(like), T.reason.like(like)))
+    stmt = stmt.order_by(T.txn_time.asc(), T.id.asc())
+    with read_session_scope() as s:
+        return [dict(r) for r in s.execute(stmt).mappings().all()]
+
+@remote_op("write")
+def refresh_stock_snapshots(today: date | None = None) -> int:
+    """
+    지난달까지의 월별 스냅샷을 증분 생성(이미 있는 달은 건너뜀).
+    과거 일시 원장이 들어오면 DB 트리거가 이후 스냅샷을 지우므로 다음 호출에서 재계산된다.
+    반환: 새로 만든 스냅샷 수
+    """
+    if not HAS_TXN:
+        return 0
+    today = today or date.today()
+    limit = date(today.year, today.month, 1).isoformat()
+    with session_scope() as s:
+        latest = {
+            int(cid): float(qty or 0.0)
+            for cid, qty in s.execute(text(
+                "SELECT p.consumable_id, p.qty FROM consumable_stock_snapshot p "
+                "WHERE p.as_of = (SELECT MAX(x.as_of) FROM consumable_stock_snapshot x "
+                "WHERE x.consumable_id = p.consumable_id)"
+            )).all()
+        }
+        monthly = s.execute(text(
+            "SELECT t.consumable_id, substr(t.txn_time, 1, 7) AS ym, SUM(t.qty) "
+            "FROM consumable_txn t "
+            "LEFT JOIN (SELECT consumable_id, MAX(as_of) AS as_of FROM consumable_stock_snapshot "
+            "           GROUP BY consumable_id) p ON p.consumable_id = t.consumable_id "
+            "WHERE t.txn_time < :limit AND (p.as_of IS NULL OR t.txn_time >= p.as_of) "
+            "GROUP BY t.consumable_id, ym ORDER BY t.consumable_id, ym"
+        ), {"limit": limit}).all()
+
+        params = []
+        running: Dict[int, float] = dict(latest)
+        for cid, ym, qty in monthly:
+            cid = int(cid)
+            y, m = int(ym[:4]), int(ym[5:7])
+            as_of = date(y + (m // 12), m % 12 + 1, 1)
+            running[cid] = running.get(cid, 0.0) + float(qty or 0.0)
+            params.append({"cid": cid, "as_of": as_of.isoformat(), "qty": running[cid],
+                           "now": datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f")})
+        if params:
+            s.execute(text(
+                "INSERT OR IGNORE INTO consumable_stock_snapshot (consumable_id, as_of, qty, created_at) "
+                "VALUES (:cid, :as_of, :qty, :now)"
+            ), params)
+        return len(params)
+
+@remote_op("read")
+def stock_as_of(when, consumable_ids: Iterable[int] | None = None) -> Dict[int, float]:
+    """
+    원장 기준 특정 시점 재고 {consumable_id: qty}.
+    - when 이 date면 그날까지 포함, datetime이면 그 시각 직전까지
+    - 직전 월 스냅샷 + 그 이후 원장만 범위 조회(전체 원장 재생 없음)
+    """
+    if not HAS_TXN:
+        return {}
+    bound = _bound_str(when)
+    ids = [int(x) for x in consumable_ids] if consumable_ids is not None else None
+    if ids is not None and not ids:
+        return {}
+    id_filter = f"WHERE c.id IN ({', '.join(str(i) for i in ids)})" if ids is not None else ""
+    sql = text(
+        "SELECT c.id, COALESCE(p.qty, 0) + COALESCE(("
+        "  SELECT SUM(t.qty) FROM consumable_txn t "
+        "  WHERE t.consumable_id = c.id AND t.txn_time >= COALESCE(p.as_of, '') AND t.txn_time < :b"
+        "), 0) "
+        "FROM consumable c "
+        "LEFT JOIN consumable_stock_snapshot p ON p.consumable_id = c.id AND p.as_of = ("
+        "  SELECT MAX(x.as_of) FROM consumable_stock_snapshot x "
+        "  WHERE x.consumable_id = c.id AND x.as_of <= :b) "
+        f"{id_filter}"
+    )
+    with session_scope() as s:
+        return {int(cid): float(q or 0.0) for cid, q in s.execute(sql, {"b": bound}).all()}
 
+@remote_op("write")   # 먼저 월별 스냅샷을 채움(INSERT) → 서버 모드에선 쓰기 스레드에서
+def period_stock_summary(start_date: date | None, end_date: date | None) -> list[SimpleNamespace]:
+    """
+    기간 수불 요약(품목별 기초/입고/출고/기말).
+    기초·기말은 stock_as_of(스냅샷+범위), 입출고 합계는 기간 범위 집계 1회.
+    """
+    if not HAS_TXN:
+        return []
+    end_date = end_date or date.today()
+    refresh_stock_snapshots()
+    opening = stock_as_of(start_date - timedelta(days=1)) if start_date else {}
+    closing = stock_as_of(end_date)
+
+    conds, params = ["t.txn_time < :b"], {"b": _bound_str(end_date)}
+    if start_date:
+        conds.append("t.txn_time >= :a"); params["a"] = start_date.isoformat()
+    with session_scope() as s:
+        moves = {
+            int(cid): (float(qin or 0.0), float(qout or 0.0))
+            for cid, qin, qout in s.execute(text(
+                "SELECT t.consumable_id, "
+                "SUM(CASE WHEN t.qty > 0 THEN t.qty ELSE 0 END), "
+                "SUM(CASE WHEN t.qty < 0 THEN -t.qty ELSE 0 END) "
+                f"FROM consumable_txn t WHERE {' AND '.join(conds)} GROUP BY t.consumable_id"
+            ), params).all()
+        }
+        items = s.execute(select(Consumable.id, Consumable.name, Consumable.spec)
+                          .order_by(Consumable.name.asc(), Consumable.spec.asc())).all()
+
+    out: list[SimpleNamespace] = []
+    for cid, name, spec in items:
+        qin, qout = moves.get(int(cid), (0.0, 0.0))
+        op, cl = opening.get(int(cid), 0.0), closing.get(int(cid), 0.0)
+        if _is_zero(op) and _is_zero(cl) and _is_zero(qin) and _is_zero(qout):
+            continue
+        out.append(SimpleNamespace(id=int(cid), name=name or "", spec=spec or "",
+                                   opening=op, qty_in=qin, qty_out=qout, closing=cl))
+    return out
+
+@remote_op("read")
 def low_stock_items() -> list[SimpleNamespace]:
     """
     안전수량(min_qty) 대비 부족한 품목만 DTO로 반환.
@@ -351,6 +493,7 @@ def low_stock_items() -> list[SimpleNamespace]:
 
 # ─────────────────────────────────────────────────────────────
 # 정리/내보내기/양식
+@remote_op("write")
 def clean_empty_consumables(force: bool = False) -> int:
     removed = 0
     with session_scope() as s:
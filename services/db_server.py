@@ -0,0 +1,201 @@
+from __future__ import annotations
+import argparse
+import asyncio
+import hmac
+import importlib
+import ipaddress
+import json
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Dict
+
+from services import remote
+
+log = logging.getLogger(__name__)
+
+# ─────────────────────────────────────────────────────────
+# DB 서비스 프로세스(선택: 서버 모드)
+# - 이 프로세스만 SQLite 파일을 열고, 클라이언트는 소켓으로 서비스 함수를 호출(services/remote.py)
+# - 쓰기(op kind="write")는 전용 스레드 1개에서 순서대로 → 파일 잠금 경합 없음
+#   조회는 작은 스레드 풀에서 병렬
+# - 실행: python -m services.db_server --listen 127.0.0.1:8765   (또는 --listen unix:/tmp/em-db.sock)
+#   DB 위치는 이 프로세스 작업폴더의 app_settings.json(db_dir/db_file) 기준
+# - 인증: 공유 비밀값(--token 또는 settings "db_server_token")이 있으면 모든 요청의 "token"이 같아야 실행
+#   루프백이 아닌 주소(다른 PC에서 접속)로 열 때는 비밀값 필수 — 없으면 시작하지 않음
+#   (요청의 "user"는 클라이언트가 보낸 값 그대로 쓰므로, 비밀값을 아는 PC만 믿는다는 뜻)
+
+# 등록(@remote_op)된 함수가 있는 모듈 — 시작 시 임포트해서 OPERATIONS 채움
+SERVICE_MODULES = (
+    "services.equipment_service",
+    "services.repair_service",
+    "services.consumable_service",
+    "services.accessory_service",
+    "services.change_feed",
+    "services.change_log_service",
+    "services.auth_service",
+    "services.reason_code_service",
+    "services.photo_service",
+)
+_READ_WORKERS = 4
+_LINE_LIMIT = 16 * 1024 * 1024
+
+
+def _invoke(fn, args, kwargs, user):
+    """
+    쓰기 작업은 요청한 사용자로 실행(변경 이력 ChangeLog 기록용) — 이 호출 동안만.
+    사용자 없이 온 요청(스크립트 등)이 앞 클라이언트 이름으로 기록되지 않도록 끝나면 원래대로.
+    """
+    if user is None:
+        return fn(*args, **kwargs)
+    import user_session
+    prev = user_session.get_current_user()
+    if user:
+        user_session.set_current_user(*user)
+    else:
+        user_session.clear_current_user()
+    try:
+        return fn(*args, **kwargs)
+    finally:
+        if prev is not None:
+            user_session.set_current_user(prev.name, prev.role)
+        else:
+            user_session.clear_current_user()
+
+
+def _is_loopback(address: str) -> bool:
+    family, addr = remote.parse_address(address)
+    if isinstance(addr, str):
+        return True   # unix 소켓: 같은 PC에서만 접속
+    host = addr[0]
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+class DbServer:
+    def __init__(self, read_workers: int = _READ_WORKERS, token: str = ""):
+        self._token = (token or "").encode("utf-8")
+        self._write_exec = ThreadPoolExecutor(1, thread_name_prefix="db-server-write")
+        self._read_exec = ThreadPoolExecutor(read_workers, thread_name_prefix="db-server-read")
+
+    async def _respond(self, writer, lock: asyncio.Lock, resp: Dict[str, Any]) -> None:
+        data = remote.dumps_line(resp)
+        async with lock:
+            writer.write(data)
+            await writer.drain()
+
+    async def _serve_one(self, line: bytes, writer, lock: asyncio.Lock) -> None:
+        rid = None
+        try:
+            req = json.loads(line)
+            rid = req.get("id")
+            if self._token and not hmac.compare_digest(str(req.get("token") or "").encode("utf-8"), self._token):
+                raise PermissionError("DB 서비스 인증 실패: db_server_token이 서버와 다릅니다.")
+            op = req.get("op") or ""
+            if op == "ping":
+                from db import SCHEMA_VERSION
+                await self._respond(writer, lock, {"id": rid, "ok": True, "result": {"schema": SCHEMA_VERSION}})
+                return
+            if op not in remote.OPERATIONS:
+                raise LookupError(f"알 수 없는 작업: {op}")
+            fn, kind = remote.OPERATIONS[op]
+            args = remote.decode_value(req.get("args") or [])
+            kwargs = remote.decode_value(req.get("kwargs") or {})
+            user = (req.get("user") or []) if kind == "write" else None   # 쓰기는 항상 사용자 지정(없으면 비움)
+            pool = self._write_exec if kind == "write" else self._read_exec
+            result = await asyncio.get_running_loop().run_in_executor(
+                pool, partial(_invoke, fn, args, kwargs, user)
+            )
+            resp = {"id": rid, "ok": True, "result": remote.encode_value(result)}
+        except Exception as e:
+            if isinstance(e, PermissionError):
+                log.warning("요청 거부: %s", e)
+            elif not isinstance(e, (ValueError, LookupError)):
+                log.exception("요청 처리 실패")
+            resp = {"id": rid, "ok": False, "error": type(e).__name__, "message": str(e)}
+        await self._respond(writer, lock, resp)
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        lock = asyncio.Lock()
+        tasks: set = set()
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                t = asyncio.create_task(self._serve_one(line, writer, lock))
+                tasks.add(t)
+                t.add_done_callback(tasks.discard)
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+            writer.close()
+
+    async def start(self, address: str):
+        """리스닝 시작 → asyncio Server."""
+        family, addr = remote.parse_address(address)
+        if isinstance(addr, str):
+            try:
+                os.remove(addr)   # 이전 실행이 남긴 소켓 파일
+            except OSError:
+                pass
+            return await asyncio.start_unix_server(self._handle, path=addr, limit=_LINE_LIMIT)
+        host, port = addr
+        return await asyncio.start_server(self._handle, host, port, limit=_LINE_LIMIT)
+
+    def close(self) -> None:
+        self._write_exec.shutdown(wait=True)
+        self._read_exec.shutdown(wait=False)
+
+
+def prepare() -> None:
+    """서버 프로세스 초기화: 로컬 실행 모드로 전환 + 스키마 최신화 + 서비스 등록."""
+    remote.SERVER_MODE = True
+    import db
+    db.ensure_db()
+    for name in SERVICE_MODULES:
+        importlib.import_module(name)
+
+
+async def serve(address: str, token: str = "") -> None:
+    prepare()
+    server = DbServer(token=token)
+    srv = await server.start(address)
+    log.info("DB 서비스 시작: %s (작업 %d개)", address, len(remote.OPERATIONS))
+    try:
+        async with srv:
+            await srv.serve_forever()
+    finally:
+        server.close()
+
+
+def main(argv=None) -> None:
+    try:
+        import settings
+        default = settings.get_db_server_address()
+        default_token = settings.get_db_server_token()
+    except Exception:
+        default, default_token = remote.DEFAULT_ADDRESS, ""
+    ap = argparse.ArgumentParser(description="설비관리 DB 서비스(단일 쓰기 프로세스)")
+    ap.add_argument("--listen", default=default, help="host:port 또는 unix:/경로 (기본: %(default)s)")
+    ap.add_argument("--token", default=default_token,
+                    help="공유 비밀값(기본: settings db_server_token). 루프백 외 주소면 필수")
+    ns = ap.parse_args(argv)
+    if not ns.token and not _is_loopback(ns.listen):
+        ap.error(f"{ns.listen} 은(는) 다른 PC에서 접속 가능한 주소입니다. --token(또는 settings db_server_token)을 지정하세요.")
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    try:
+        asyncio.run(serve(ns.listen, ns.token))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
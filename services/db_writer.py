@@ -0,0 +1,201 @@
+from __future__ import annotations
+import atexit
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Optional
+
+from sqlalchemy import event
+from sqlalchemy.exc import OperationalError
+
+import db
+from services.remote import is_remote
+
+# ─────────────────────────────────────────────────────────
+# 단일 쓰기 스레드(모든 DB 변경을 한 줄로 세워 처리)
+# - 전용 스레드가 영구 연결 1개를 소유 → 작업(서비스 함수)을 순서대로 실행
+#   (db.bind_thread_connection 으로 등록 → 작업 안의 session_scope()가 그 연결 사용)
+# - 공유 폴더 DB를 다른 사용자가 잠그고 있으면(database is locked/busy)
+#   작업 전체를 지수 백오프로 재시도 — 단, 아직 아무것도 커밋하지 않은 경우에만
+#   (한 트랜잭션 작업은 통째로 롤백되므로 재실행해도 안전)
+# - 여러 번 커밋하는 작업(일괄 처리 루프 등)은 트랜잭션마다 retry_busy()로 감쌀 것
+#   → 일부가 커밋된 뒤 잠금 오류가 작업 밖으로 나오면 재실행하지 않고 실패로 넘김(중복 반영 방지)
+# - submit() 은 concurrent.futures.Future 반환(GUI 쪽 Qt 신호 연결은 ui/db_async.py)
+
+log = logging.getLogger(__name__)
+
+_BUSY_TIMEOUT_MS = 1000      # 연결 단위 대기(짧게) — 나머지는 백오프 재시도로
+_RETRY_BASE_DELAY = 0.05     # 첫 재시도 대기(초), 이후 2배씩
+_RETRY_MAX_DELAY = 2.0
+_RETRY_DEADLINE = 60.0       # 이 시간 동안 잠금이 안 풀리면 실패로 넘김
+
+def is_busy_error(e: BaseException) -> bool:
+    """SQLite 잠금 경합(재시도하면 풀릴 수 있는 오류) 여부."""
+    if not isinstance(e, OperationalError):
+        return False
+    msg = str(getattr(e, "orig", e) or "").lower()
+    return "locked" in msg or "busy" in msg
+
+def retry_busy(fn: Callable[..., Any], *args, **kwargs) -> Any:
+    """
+    한 트랜잭션 단위 fn을 잠금 경합 시 지수 백오프로 재시도(쓰기 작업 안에서 여러 번 커밋할 때 사용).
+    잠금 외 오류나 마감 시간 초과는 그대로 올림.
+    """
+    delay = _RETRY_BASE_DELAY
+    deadline = time.monotonic() + _RETRY_DEADLINE
+    while True:
+        try:
+            return fn(*args, **kwargs)
+        except Exception as e:
+            if not is_busy_error(e) or time.monotonic() + delay > deadline:
+                raise
+            log.info("DB 잠금 대기 재시도 (%.2fs 후): %s", delay, getattr(fn, "__name__", fn))
+            time.sleep(delay)
+            delay = min(delay * 2, _RETRY_MAX_DELAY)
+
+class DbWriter:
+    def __init__(self, name: str = "db-writer"):
+        self._q: "queue.Queue[Optional[tuple]]" = queue.Queue()
+        self._conn = None
+        self._pending = 0
+        self._commits = 0            # 쓰기 연결의 커밋 횟수(작업 일부 커밋 여부 판단)
+        self._lock = threading.Lock()
+        self._listeners: list[Callable[[int], None]] = []
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    # ── 외부 API
+    def submit(self, fn: Callable[..., Any], *args, **kwargs) -> Future:
+        """fn(*args, **kwargs)를 쓰기 스레드에서 실행. 결과/예외는 Future로."""
+        fut: Future = Future()
+        self._add_pending(+1)
+        self._q.put((fut, fn, args, kwargs))
+        return fut
+
+    def pending(self) -> int:
+        return self._pending
+
+    def add_pending_listener(self, cb: Callable[[int], None]) -> None:
+        """대기+실행 중 작업 수가 바뀔 때 cb(n) 호출(쓰기 스레드에서 호출될 수 있음)."""
+        self._listeners.append(cb)
+
+    def shutdown(self, wait: bool = True, timeout: float | None = None) -> None:
+        """남은 작업을 모두 처리한 뒤 스레드 종료."""
+        self._q.put(None)
+        if wait:
+            self._thread.join(timeout)
+
+    # ── 내부
+    def _add_pending(self, delta: int) -> None:
+        with self._lock:
+            self._pending += delta
+            n = self._pending
+        for cb in list(self._listeners):
+            try:
+                cb(n)
+            except Exception:
+                pass
+
+    def _connect(self):
+        conn = db.engine.connect()
+        if db.DB_URL.startswith("sqlite"):
+            try:
+                conn.exec_driver_sql(f"PRAGMA busy_timeout = {_BUSY_TIMEOUT_MS}")
+            except Exception:
+                pass
+        # 자동 시작된 트랜잭션을 닫아 둠(열려 있으면 작업 세션이 합류만 하고 커밋하지 않음)
+        conn.commit()
+        event.listen(conn, "commit", self._on_commit)
+        return conn
+
+    def _on_commit(self, _conn) -> None:
+        self._commits += 1
+
+    def _drop_connection(self) -> None:
+        db.bind_thread_connection(None)
+        if self._conn is not None:
+            try:
+                self._conn.close()
+            except Exception:
+                pass
+        self._conn = None
+
+    def _call(self, fn, args, kwargs):
+        delay = _RETRY_BASE_DELAY
+        deadline = time.monotonic() + _RETRY_DEADLINE
+        attempt = 0
+        while True:
+            if is_remote():
+                return fn(*args, **kwargs)   # 서버 모드: 작업 안의 서비스 호출이 DB 서비스로 전달됨(순서만 보장)
+            if self._conn is None:
+                self._conn = self._connect()
+                db.bind_thread_connection(self._conn)
+            commits = self._commits
+            try:
+                result = fn(*args, **kwargs)
+                if self._conn.in_transaction():   # 세션 밖에서 연결을 직접 쓴 작업
+                    self._conn.commit()
+                return result
+            except Exception as e:
+                # 작업이 열어 둔 트랜잭션이 남아 있으면 정리
+                try:
+                    if self._conn.in_transaction():
+                        self._conn.rollback()
+                except Exception:
+                    pass
+                if getattr(e, "connection_invalidated", False):
+                    self._drop_connection()   # 네트워크 끊김 등 → 다음 시도에서 새 연결
+                if not is_busy_error(e) or time.monotonic() + delay > deadline:
+                    raise
+                if self._commits != commits:
+                    # 앞부분이 이미 커밋됨 → 통째 재실행하면 중복 반영(트랜잭션마다 retry_busy로 감쌀 것)
+                    log.warning("일부 커밋된 작업은 재시도하지 않음: %s", getattr(fn, "__name__", fn))
+                    raise
+                attempt += 1
+                log.info("DB 잠금 대기 재시도 %d회 (%.2fs 후): %s", attempt, delay, getattr(fn, "__name__", fn))
+                time.sleep(delay)
+                delay = min(delay * 2, _RETRY_MAX_DELAY)
+
+    def _run(self) -> None:
+        while True:
+            job = self._q.get()
+            if job is None:
+                break
+            fut, fn, args, kwargs = job
+            try:
+                if not fut.set_running_or_notify_cancel():
+                    continue
+                try:
+                    fut.set_result(self._call(fn, args, kwargs))
+                except BaseException as e:
+                    fut.set_exception(e)
+            finally:
+                self._add_pending(-1)
+        self._drop_connection()
+
+
+# ─────────────────────────────────────────────────────────
+# 앱 전역 쓰기 스레드(첫 사용 시 시작, 종료 시 남은 작업 처리)
+_writer: Optional[DbWriter] = None
+_writer_lock = threading.Lock()
+
+def get_writer() -> DbWriter:
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            _writer = DbWriter()
+            atexit.register(shutdown_writer)
+        return _writer
+
+def submit_write(fn: Callable[..., Any], *args, **kwargs) -> Future:
+    """전역 쓰기 스레드에 작업 등록 → Future."""
+    return get_writer().submit(fn, *args, **kwargs)
+
+def shutdown_writer(timeout: float | None = 30.0) -> None:
+    global _writer
+    with _writer_lock:
+        w, _writer = _writer, None
+    if w is not None:
+        w.shutdown(wait=True, timeout=timeout)
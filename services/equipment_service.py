@@ -1,13 +1,16 @@
 from __future__ import annotations
 from dataclasses import dataclass
-from typing import List, Optional, Tuple
+from datetime import date
+from typing import Iterable, List, Optional, Tuple
 
 import os
-from sqlalchemy import select, or_, func
+from sqlalchemy import select, or_, func, text, literal_column
 from sqlalchemy.orm import load_only
 
-from db import session_scope
-from models import Equipment, Repair, Photo, EquipmentAccessory
+from db import session_scope, read_session_scope, has_equipment_fts, fts_match_query, FTS_MIN_QUERY_LEN
+from models import Equipment, EquipmentStats, Repair, Photo, EquipmentAccessory, ChangeLog
+from services.accessory_service import replace_accessories
+from services.remote import remote_op
 
 
 # ------------------------------------------------------------
@@ -47,35 +50,54 @@ class EquipmentRow:
     part: Optional[str]
     status: Optional[str]
 
+    # 수리 요약(with_stats=True일 때만, equipment_stats)
+    last_repair_date: Optional[str] = None
+    repairs_this_year: Optional[int] = None
+    repair_hours: Optional[float] = None
+
 
 # ------------------------------------------------------------
 # 목록 조회
 # ------------------------------------------------------------
+@remote_op("read")
 def list_equipment(keyword: str = "",
                    status: str = "모두",
-                   include_deleted: bool = False) -> List[EquipmentRow]:
+                   include_deleted: bool = False,
+                   ids: Optional[Iterable[int]] = None,
+                   with_stats: bool = False) -> List[EquipmentRow]:
     """
     설비관리대장 표용 데이터 조회.
     - purpose(용도) 포함해서 반환
     - 세션 종료 후에도 안전하도록 dataclass로 복사해서 리턴
+    - ids: 주어지면 그 설비만(변경 피드로 바뀐 행만 다시 읽을 때) — 나머지 필터는 그대로 적용
+    - with_stats: 최근 수리일/올해 수리 건수/누적 수리 시간을 equipment_stats에서 함께(집계 쿼리 없음)
     """
     kw = (keyword or "").strip()
     rows: List[EquipmentRow] = []
 
-    with session_scope() as s:
+    with read_session_scope() as s:
         q = s.query(Equipment)
 
+        if ids is not None:
+            q = q.filter(Equipment.id.in_(list(ids)))
+
         # 삭제 필터
         if not include_deleted:
-            q = q.filter((Equipment.is_deleted == 0) | (Equipment.is_deleted.is_(None)))
+            # = db.EQUIPMENT_ACTIVE_WHERE (리터럴 0이어야 부분 인덱스 ix_equipment_active_code 사용)
+            q = q.filter(func.coalesce(Equipment.is_deleted, literal_column("0")) == literal_column("0"))
 
         # 상태 필터
         st = (status or "모두").strip()
         if st != "모두":
             q = q.filter(Equipment.status == st)
 
-        # 키워드(간단 통합 검색)
-        if kw:
+        # 키워드(통합 검색) — FTS5 색인 우선, 불가하면 LIKE
+        if kw and len(kw) >= FTS_MIN_QUERY_LEN and has_equipment_fts():
+            q = q.filter(Equipment.id.in_(
+                text("SELECT rowid FROM equipment_fts WHERE equipment_fts MATCH :fts_q")
+                .bindparams(fts_q=fts_match_query(kw))
+            ))
+        elif kw:
             like = f"%{kw}%"
             q = q.filter(or_(
                 Equipment.code.like(like),
@@ -103,8 +125,15 @@ def list_equipment(keyword: str = "",
             Equipment.is_deleted,
         )).order_by(Equipment.code.asc())
 
-        for e in q.all():
-            rows.append(EquipmentRow(
+        if with_stats:
+            q = q.outerjoin(EquipmentStats, EquipmentStats.equipment_id == Equipment.id).add_columns(
+                EquipmentStats.work_hours, EquipmentStats.last_work_date, EquipmentStats.last_year_repairs,
+            )
+        this_year = date.today().year
+
+        for res in q.all():
+            e = res[0] if with_stats else res
+            row = EquipmentRow(
                 id=e.id,
                 code=e.code or "",
                 asset_name=e.asset_name,
@@ -126,13 +155,21 @@ def list_equipment(keyword: str = "",
                 qty=e.qty, purchase_price=e.purchase_price,
                 location=e.location, note=e.note, part=e.part,
                 status=e.status,
-            ))
+            )
+            if with_stats:
+                hours, last, last_year_n = res[1:]
+                row.last_repair_date = str(last) if last else None
+                # 저장값은 '최근 수리일 연도'의 건수 → 그 연도가 올해일 때만 올해 건수
+                row.repairs_this_year = int(last_year_n or 0) if last and last.year == this_year else 0
+                row.repair_hours = float(hours or 0.0)
+            rows.append(row)
     return rows
 
 
 # ------------------------------------------------------------
 # 단건 조회 (편집/이력창 등)
 # ------------------------------------------------------------
+@remote_op("read")
 def get_equipment_by_code(code: str) -> Optional[Equipment]:
     with session_scope() as s:
         e = s.execute(
@@ -156,6 +193,7 @@ def get_equipment_by_code(code: str) -> Optional[Equipment]:
 # ------------------------------------------------------------
 # 생성/수정/상태 변경/삭제
 # ------------------------------------------------------------
+@remote_op("write")
 def add_equipment(code: str, name: str = "") -> Equipment:
     with session_scope() as s:
         e = Equipment(code=code, name=name or code)
@@ -163,6 +201,7 @@ def add_equipment(code: str, name: str = "") -> Equipment:
         return e
 
 
+@remote_op("write")
 def update_status(code: str, status: str) -> None:
     with session_scope() as s:
         e = s.execute(select(Equipment).where(Equipment.code == code)).scalars().first()
@@ -171,6 +210,7 @@ def update_status(code: str, status: str) -> None:
         e.status = status or None
 
 
+@remote_op("read")
 def get_delete_preview(code: str) -> Tuple[int, int, int]:
     with session_scope() as s:
         e = s.execute(select(Equipment).where(Equipment.code == code)).scalars().first()
@@ -182,6 +222,7 @@ def get_delete_preview(code: str) -> Tuple[int, int, int]:
         return (rep, ph, acc)
 
 
+@remote_op("write")
 def delete_equipment_by_code(code: str, mode: str = "soft") -> None:
     """
     mode = "soft" → 보관함 이동(is_deleted=1)
@@ -197,6 +238,72 @@ def delete_equipment_by_code(code: str, mode: str = "soft") -> None:
             e.is_deleted = 1
 
 
+@remote_op("write")
+def apply_equipment_edit(
+    original_code: str,
+    new_vals: dict,
+    before: dict,
+    acc_before: list,
+    acc_now: list,
+    user: str | None,
+) -> None:
+    """편집 내용 저장 + 변경이력 기록(한 트랜잭션). 쓰기 스레드에서 실행."""
+    with session_scope() as s:
+        e: Equipment | None = (
+            s.execute(
+                select(Equipment).where(
+                    Equipment.code == original_code, Equipment.is_deleted == 0
+                )
+            )
+            .scalars()
+            .first()
+        )
+        if not e:
+            raise ValueError(f"설비({original_code})를 찾을 수 없습니다.")
+
+        # 코드 중복 체크
+        if new_vals["code"] != original_code:
+            dup = (
+                s.execute(select(Equipment).where(Equipment.code == new_vals["code"]))
+                .scalars()
+                .first()
+            )
+            if dup:
+                raise ValueError(f"이미 존재하는 설비번호입니다: {new_vals['code']}")
+
+        # 변경 이력 계산
+        changes: dict[str, tuple[object, object]] = {}
+        for k, v_new in new_vals.items():
+            v_old = before.get(k)
+            if v_old != v_new:
+                changes[k] = (v_old, v_new)
+
+        # 실제 업데이트
+        for k, v in new_vals.items():
+            setattr(e, k, v)
+        s.flush()
+        eq_id = int(e.id)
+
+        # 액세서리 변경 기록
+        if acc_before != acc_now:
+            replace_accessories(eq_id, acc_now, session=s)
+            def _fmt(lst): return ", ".join([f"{a or ''}/{b or ''}/{c or ''}" for a, b, c in lst])
+            changes["accessories"] = (_fmt(acc_before), _fmt(acc_now))
+
+        # ChangeLog 기록
+        for field, (b, a) in changes.items():
+            s.add(
+                ChangeLog(
+                    module="equipment",
+                    record_id=eq_id,
+                    field=field,
+                    before=None if b is None else str(b),
+                    after=None if a is None else str(a),
+                    user=user,
+                )
+            )
+
+
 # ------------------------------------------------------------
 # 파일/폴더 유틸(프로젝트에 맞춰 필요 시 수정)
 # ------------------------------------------------------------
@@ -1,4 +1,5 @@
 from __future__ import annotations
+import logging
 import os
 from datetime import date, datetime
 from typing import Any, List, Optional, Tuple, Dict
@@ -7,10 +8,14 @@ from openpyxl import Workbook
 from openpyxl.styles import Alignment, Font
 from openpyxl.utils import get_column_letter
 from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
 
 from db import session_scope
+from services.remote import RemoteError
 from .exporter_common import EXPORT_DIR, fmt_date
 
+log = logging.getLogger(__name__)
+
 # ─────────────────────────────────────────────────────────────
 def _to_date(x) -> Optional[date]:
     """문자열/타입을 date 로 변환. 'YYYY-MM-DD HH:MM:SS'도 지원."""
@@ -190,6 +195,26 @@ def _fallback_query(keyword: str, start_date: Optional[date], end_date: Optional
         return [dict(r) for r in rows]
 
 # ─────────────────────────────────────────────────────────────
+def _write_period_summary(wb: Workbook, start_date: Optional[date], end_date: Optional[date]) -> None:
+    try:
+        from services.consumable_service import period_stock_summary
+        items = period_stock_summary(start_date, end_date)
+    except Exception as e:
+        # 원장 테이블이 없는 레거시 DB는 조용히 생략, 그 밖의 오류는 기록만(내역 시트는 그대로 저장)
+        if not (isinstance(e, (OperationalError, RemoteError)) and "no such table" in str(e)):
+            log.exception("기간 수불 요약 생성 실패(요약 시트 생략)")
+        return
+    ws = wb.create_sheet("기간 수불 요약")
+    headers = ["품명", "규격", "기초재고", "입고", "출고", "기말재고"]
+    ws.append(headers)
+    for it in items:
+        ws.append([it.name, it.spec, it.opening, it.qty_in, it.qty_out, it.closing])
+    for i, w in enumerate([28, 28, 12, 12, 12, 12], start=1):
+        ws.column_dimensions[get_column_letter(i)].width = w
+    for c in range(1, len(headers) + 1):
+        cell = ws.cell(1, c)
+        cell.alignment = Alignment(horizontal="center", vertical="center"); cell.font = Font(bold=True)
+
 def export_consumable_txn_xlsx(
     keyword: str = "",
     start_date: Optional[date] = None,
@@ -257,6 +282,10 @@ def export_consumable_txn_xlsx(
         ws.cell(r, 2).alignment = center    # 구분
         ws.cell(r, 5).alignment = right     # 수량
 
+    # 기간 지정 시: 품목별 수불 요약 시트(월 스냅샷 + 기간 범위 집계)
+    if start_date or end_date:
+        _write_period_summary(wb, start_date, end_date)
+
     # 저장
     out_path = _finalize_path(path, "소모품_입출고이력.xlsx")
     wb.save(out_path)
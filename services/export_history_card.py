@@ -1,18 +1,23 @@
 # services/export_history_card.py
 from __future__ import annotations
-import os, re, io
-from typing import Optional, Dict, List
+import os, re, io, json, hashlib, weakref, zipfile
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from types import SimpleNamespace
+from typing import Optional, Dict, List, Callable, Tuple
 from datetime import date as _date
 
 from openpyxl import Workbook, load_workbook
 from openpyxl.worksheet.worksheet import Worksheet
 from openpyxl.utils import column_index_from_string
 from openpyxl.drawing.image import Image as XLImage
-from sqlalchemy import select, and_
-from PIL import Image as PILImage
+from sqlalchemy import select, and_, func
 
 from db import session_scope
-from models import Equipment, Repair, Photo
+from models import Equipment, Repair, Photo, EquipmentAccessory
+from .image_cache import get_resized
 from .exporter_common import (
     fmt_date, safe_sheet_title, ensure_template_history_card,
     find_first_photo_path_for_code, EXPORT_DIR, safe_save_workbook
@@ -42,20 +47,33 @@ except Exception:
             return cand3
         return None
 
-from services.accessory_service import list_accessories  # 부속기구 목록
-
 # ─────────────────────────────────────────────────────────────
 # 유틸
 def _norm(s: object) -> str:
     if not isinstance(s, str): return ""
     return re.sub(r"[^0-9a-zA-Z가-힣]", "", s).lower()
 
+# 시트별 병합셀 색인: {(row, col): (anchor_row, anchor_col)} — 병합 범위 수가 바뀌면 다시 만듦
+_MERGED_INDEX: "weakref.WeakKeyDictionary[Worksheet, tuple]" = weakref.WeakKeyDictionary()
+
+def _merged_index(ws: Worksheet) -> Dict[tuple, tuple]:
+    ranges = ws.merged_cells.ranges
+    cached = _MERGED_INDEX.get(ws)
+    if cached is not None and cached[0] == len(ranges):
+        return cached[1]
+    idx: Dict[tuple, tuple] = {}
+    for mr in ranges:
+        anchor = (mr.min_row, mr.min_col)
+        for r in range(mr.min_row, mr.max_row + 1):
+            for c in range(mr.min_col, mr.max_col + 1):
+                idx[(r, c)] = anchor
+    _MERGED_INDEX[ws] = (len(ranges), idx)
+    return idx
+
 def _write_cell(ws: Worksheet, r: int, c: int, val):
     """병합셀 상단좌측 기준으로 안전하게 값 쓰기"""
-    for mr in ws.merged_cells.ranges:
-        if mr.min_row <= r <= mr.max_row and mr.min_col <= c <= mr.max_col:
-            ws.cell(mr.min_row, mr.min_col, val); return
-    ws.cell(r, c, val)
+    ar, ac = _merged_index(ws).get((r, c), (r, c))
+    ws.cell(ar, ac).value = val
 
 def _cell_rc(addr: str):
     import re as _re
@@ -80,13 +98,16 @@ def _anchor_to_rc(anchor):
         pass
     return None
 
-def _wipe_photos_keep_logo(ws: Worksheet, logo_min_row: int = 32):
-    """하단 로고(앵커 row >= logo_min_row)만 남기고 사진 삭제"""
+def _wipe_photos_keep_logo(ws: Worksheet, logo_min_row: int = 32, keep_anchors=None):
+    """하단 로고(앵커 row >= logo_min_row, 또는 keep_anchors 위치)만 남기고 사진 삭제"""
     imgs = list(getattr(ws, "_images", []))
+    keep_set = {tuple(a) for a in keep_anchors} if keep_anchors is not None else None
     keep = []
     for img in imgs:
         rc = _anchor_to_rc(img.anchor)
-        if rc and rc[0] >= logo_min_row:
+        if not rc:
+            continue
+        if (rc in keep_set) if keep_set is not None else (rc[0] >= logo_min_row):
             keep.append(img)
     ws._images = keep
 
@@ -97,10 +118,10 @@ def _cm_to_px(cm: float, dpi: int = 96) -> int:
 def _put_image_exact_size(ws: Worksheet, img_path: str, anchor: str, width_cm: float, height_cm: float):
     target_w = _cm_to_px(width_cm); target_h = _cm_to_px(height_cm)
     try:
-        with PILImage.open(img_path) as im:
-            im = im.resize((target_w, target_h), PILImage.LANCZOS)
-            buf = io.BytesIO(); im.save(buf, format="PNG"); buf.seek(0)
-        xi = XLImage(buf); xi.width = target_w; xi.height = target_h
+        got = get_resized(img_path, target_w, target_h, mode="exact", fmt="PNG")
+        if not got:
+            return
+        xi = XLImage(io.BytesIO(got[0])); xi.width = target_w; xi.height = target_h
         ws.add_image(xi, anchor)
     except Exception:
         pass
@@ -118,9 +139,9 @@ HIST_HEADER_MAP = {
 HIST_COL_INDEX = {k: column_index_from_string(v.rstrip("0123456789")) for k, v in HIST_HEADER_MAP.items()}
 HIST_START_ROW = 28
 
-def _clear_history_fixed(ws: Worksheet, max_rows: int = 400):
+def _clear_history_fixed(ws: Worksheet, max_rows: int = 400, start_row: int = HIST_START_ROW):
     """템플릿 잔여 이력을 완전히 지움(A~K, 병합 포함)."""
-    start = HIST_START_ROW
+    start = start_row
     end = start + max_rows - 1
     max_col = column_index_from_string("K")
 
@@ -129,19 +150,24 @@ def _clear_history_fixed(ws: Worksheet, max_rows: int = 400):
     except Exception:
         ranges = []
     for mr in ranges:
-        if mr.max_row < start or mr.min_col > max_col or mr.min_row == 27:
+        if mr.max_row < start or mr.min_col > max_col or mr.min_row == start - 1:
             continue
         try:
             ws.cell(mr.min_row, mr.min_col).value = None
         except Exception:
             pass
 
-    for r in range(start, end + 1):
-        for c in range(1, max_col + 1):
-            try:
-                _write_cell(ws, r, c, None)
-            except Exception:
-                pass
+    # 실제 존재하는 셀만 비움(빈 셀을 새로 만들지 않음)
+    existing = getattr(ws, "_cells", None)
+    if existing is None:
+        targets = [(r, c) for r in range(start, end + 1) for c in range(1, max_col + 1)]
+    else:
+        targets = [(r, c) for (r, c) in list(existing) if start <= r <= end and c <= max_col]
+    for r, c in targets:
+        try:
+            _write_cell(ws, r, c, None)
+        except Exception:
+            pass
 
 # 부속기구 헤더 자동 인식(있으면 채움)
 def _norm_str(x): return _norm(x)
@@ -226,13 +252,223 @@ def _fill_fixed_cells(ws: Worksheet, eq: Equipment):
     r_note, c_note = _cell_rc("A16")
     _write_cell(ws, r_note, c_note, note)
 
-def _fill_manager_code_down(ws: Worksheet, code: str):
-    # 템플릿의 '관리번호' 라벨 아래로 값 넣기
+# ─────────────────────────────────────────────────────────────
+# 템플릿 컴파일: 한 번 스캔해 레이아웃 기술자로 만들고, 해시 기준으로 캐시
+_LAYOUT_VERSION = 1
+
+@dataclass
+class TemplateLayout:
+    digest: str = ""                                # 템플릿 내용 sha256
+    manager_code_cell: Optional[tuple] = None       # '관리번호' 라벨 아래 (row, col)
+    machine_no_cells: List[tuple] = field(default_factory=list)   # '기기번호' 라벨 오른쪽
+    accessory: Optional[tuple] = None               # (header_row, {"No"/"품명"/"규격"/"비고": col})
+    hist_start_row: int = HIST_START_ROW            # 수리 이력 첫 데이터 행
+    hist_cols: Dict[str, int] = field(default_factory=lambda: dict(HIST_COL_INDEX))
+    merged: Dict[tuple, tuple] = field(default_factory=dict)      # (row, col) → 병합 앵커
+    logo_anchors: List[tuple] = field(default_factory=list)       # 남겨둘 로고 이미지 앵커
+
+    def to_json(self) -> dict:
+        return {
+            "version": _LAYOUT_VERSION,
+            "digest": self.digest,
+            "manager_code_cell": list(self.manager_code_cell) if self.manager_code_cell else None,
+            "machine_no_cells": [list(x) for x in self.machine_no_cells],
+            "accessory": [self.accessory[0], self.accessory[1]] if self.accessory else None,
+            "hist_start_row": self.hist_start_row,
+            "hist_cols": self.hist_cols,
+            "merged": [[r, c, ar, ac] for (r, c), (ar, ac) in self.merged.items()],
+            "logo_anchors": [list(x) for x in self.logo_anchors],
+        }
+
+    @classmethod
+    def from_json(cls, d: dict) -> "TemplateLayout":
+        acc = d.get("accessory")
+        return cls(
+            digest=d.get("digest") or "",
+            manager_code_cell=tuple(d["manager_code_cell"]) if d.get("manager_code_cell") else None,
+            machine_no_cells=[tuple(x) for x in d.get("machine_no_cells") or []],
+            accessory=(int(acc[0]), {k: int(v) for k, v in acc[1].items()}) if acc else None,
+            hist_start_row=int(d.get("hist_start_row") or HIST_START_ROW),
+            hist_cols={k: int(v) for k, v in (d.get("hist_cols") or HIST_COL_INDEX).items()},
+            merged={(r, c): (ar, ac) for r, c, ar, ac in d.get("merged") or []},
+            logo_anchors=[tuple(x) for x in d.get("logo_anchors") or []],
+        )
+
+def _compile_layout(ws: Worksheet, digest: str = "", logo_min_row: int = 32) -> TemplateLayout:
+    """시트를 한 번 훑어 라벨/부속기구 헤더/이력표 위치/병합/로고 앵커를 기록."""
+    lay = TemplateLayout(digest=digest)
+
+    want_mgr, want_mno = _norm("관리번호"), _norm("기기번호")
     for row in ws.iter_rows(min_row=1, max_row=25):
+        mno_hit = False
+        for cell in row:
+            v = _norm(str(cell.value))
+            if v == want_mgr and lay.manager_code_cell is None:
+                lay.manager_code_cell = (cell.row + 1, cell.column)
+            elif v == want_mno and not mno_hit:
+                lay.machine_no_cells.append((cell.row, cell.column + 1))
+                mno_hit = True
+
+    lay.accessory = _find_accessory_header(ws)
+
+    # 이력표 머리글을 찾으면 그 위치를, 못 찾으면 고정 좌표 사용
+    want_hist = {_norm(k): k for k in HIST_HEADER_MAP}
+    for row in ws.iter_rows(min_row=1, max_row=ws.max_row):
+        cols: Dict[str, int] = {}
         for cell in row:
-            if _norm(str(cell.value)) == _norm("관리번호"):
-                _write_cell(ws, cell.row + 1, cell.column, code or "")
-                return
+            k = want_hist.get(_norm(str(cell.value)))
+            if k and k not in cols:
+                cols[k] = cell.column
+        if len(cols) == len(want_hist):
+            lay.hist_start_row = row[0].row + 1
+            lay.hist_cols = cols
+            break
+
+    lay.merged = dict(_merged_index(ws))
+    for img in getattr(ws, "_images", []):
+        rc = _anchor_to_rc(img.anchor)
+        if rc and rc[0] >= logo_min_row:
+            lay.logo_anchors.append(rc)
+    return lay
+
+# 경로 → ((mtime_ns, size), 템플릿 바이트, 레이아웃)
+_TEMPLATE_CACHE: Dict[str, tuple] = {}
+
+def _layout_sidecar_path(tpath: str) -> str:
+    return os.path.splitext(tpath)[0] + ".layout.json"
+
+def _read_layout_sidecar(tpath: str, digest: str) -> Optional[TemplateLayout]:
+    try:
+        with open(_layout_sidecar_path(tpath), "r", encoding="utf-8") as f:
+            d = json.load(f)
+        if d.get("version") == _LAYOUT_VERSION and d.get("digest") == digest:
+            return TemplateLayout.from_json(d)
+    except Exception:
+        pass
+    return None
+
+def _write_layout_sidecar(tpath: str, layout: TemplateLayout) -> None:
+    # 템플릿 폴더가 읽기 전용이면 메모리 캐시만 사용
+    side = _layout_sidecar_path(tpath)
+    tmp = side + ".tmp"
+    try:
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(layout.to_json(), f, ensure_ascii=False)
+        os.replace(tmp, side)
+    except Exception:
+        try:
+            os.remove(tmp)
+        except Exception:
+            pass
+
+def load_compiled_template(tpath: str) -> tuple:
+    """
+    템플릿 → (바이트, TemplateLayout).
+    파일 크기/수정시각이 그대로면 메모리 캐시, 내용 해시가 같으면 옆의 .layout.json 재사용.
+    """
+    key = os.path.abspath(tpath)
+    st = os.stat(key)
+    sig = (st.st_mtime_ns, st.st_size)
+    hit = _TEMPLATE_CACHE.get(key)
+    if hit and hit[0] == sig:
+        return hit[1], hit[2]
+
+    with open(key, "rb") as f:
+        data = f.read()
+    digest = hashlib.sha256(data).hexdigest()
+    layout = _read_layout_sidecar(key, digest)
+    if layout is None:
+        layout = _compile_layout(load_workbook(io.BytesIO(data)).active, digest)
+        _write_layout_sidecar(key, layout)
+    _TEMPLATE_CACHE[key] = (sig, data, layout)
+    return data, layout
+
+def _bind_layout(ws: Worksheet, layout: TemplateLayout) -> None:
+    # 템플릿(또는 그 사본) 시트에 컴파일된 병합 색인을 그대로 연결
+    _MERGED_INDEX[ws] = (len(ws.merged_cells.ranges), layout.merged)
+
+def _open_template(template_path: Optional[str]):
+    """(wb, ws, layout). 템플릿이 없으면 빈 시트."""
+    tpath = template_path or ensure_template_history_card()
+    if tpath and os.path.isfile(tpath):
+        data, layout = load_compiled_template(tpath)
+        wb = load_workbook(io.BytesIO(data)); ws = wb.active
+        _bind_layout(ws, layout)
+        return wb, ws, layout
+    wb = Workbook(); ws = wb.active; ws.title = "이력카드"
+    return wb, ws, _compile_layout(ws)
+
+# ─────────────────────────────────────────────────────────────
+# 데이터 선조회(prefetch): 여러 설비를 IN 쿼리 몇 번으로 한꺼번에 읽어 둠
+_EQ_FIELDS = ("id", "code", "name", "model", "size_mm", "voltage", "power_kwh", "maker",
+              "in_year", "in_month", "in_day", "purchase_price", "location",
+              "purpose", "util_other", "maker_phone", "note")
+_IN_CHUNK = 500  # SQLite 바인드 변수 한도 여유
+
+@dataclass
+class CardData:
+    eq: SimpleNamespace                     # 설비 필드(세션 분리 사본)
+    photo_rel: Optional[str] = None         # 대표 사진(첫 Photo.file_path)
+    accessories: List[tuple] = field(default_factory=list)   # (name, spec, note)
+    repairs: List[tuple] = field(default_factory=list)       # (work_date, kind, title, detail, vendor, hours)
+
+def _chunks(seq: List, n: int = _IN_CHUNK):
+    for i in range(0, len(seq), n):
+        yield seq[i:i + n]
+
+def prefetch_cards(equipment_codes: List[str], target_year: Optional[int] = None) -> Dict[str, CardData]:
+    """
+    코드 목록 → {code: CardData}. 설비/사진/부속기구/수리이력을 각 1회(청크별) IN 쿼리로 적재.
+    없는 코드는 결과에서 빠짐.
+    """
+    codes = list(dict.fromkeys(c for c in (equipment_codes or []) if c))
+    bundle: Dict[str, CardData] = {}
+    if not codes:
+        return bundle
+
+    with session_scope() as s:
+        cols = [getattr(Equipment, f) for f in _EQ_FIELDS]
+        by_id: Dict[int, CardData] = {}
+        for part in _chunks(codes):
+            for row in s.execute(select(*cols).where(Equipment.code.in_(part))).all():
+                cd = CardData(eq=SimpleNamespace(**dict(zip(_EQ_FIELDS, row))))
+                bundle[cd.eq.code] = cd
+                by_id[int(cd.eq.id)] = cd
+
+        ids = list(by_id)
+        for part in _chunks(ids):
+            # 대표 사진: 설비별 가장 작은 id
+            first = (
+                select(Photo.equipment_id, func.min(Photo.id).label("pid"))
+                .where(Photo.equipment_id.in_(part))
+                .group_by(Photo.equipment_id)
+                .subquery()
+            )
+            for eid, rel in s.execute(
+                select(Photo.equipment_id, Photo.file_path).join(first, Photo.id == first.c.pid)
+            ).all():
+                by_id[int(eid)].photo_rel = rel
+
+            for eid, nm, sp, nt in s.execute(
+                select(EquipmentAccessory.equipment_id, EquipmentAccessory.name,
+                       EquipmentAccessory.spec, EquipmentAccessory.note)
+                .where(EquipmentAccessory.equipment_id.in_(part))
+                .order_by(EquipmentAccessory.equipment_id, EquipmentAccessory.ord.asc(), EquipmentAccessory.id.asc())
+            ).all():
+                by_id[int(eid)].accessories.append((nm or "", sp or "", nt or ""))
+
+            rep_stmt = select(
+                Repair.equipment_id, Repair.work_date, Repair.kind, Repair.title,
+                Repair.detail, Repair.vendor, Repair.work_hours
+            ).where(Repair.equipment_id.in_(part))
+            if target_year is not None:
+                rep_stmt = rep_stmt.where(and_(Repair.work_date >= _date(target_year, 1, 1),
+                                               Repair.work_date <= _date(target_year, 12, 31)))
+            rep_stmt = rep_stmt.order_by(Repair.equipment_id, Repair.work_date.asc(), Repair.id.asc())
+            for eid, *rest in s.execute(rep_stmt).all():
+                by_id[int(eid)].repairs.append(tuple(rest))
+
+    return bundle
 
 # ─────────────────────────────────────────────────────────────
 # 워크시트 채우기(연도 필터 지원)
@@ -241,67 +477,38 @@ def _fill_sheet_for_code(
     equipment_code: str,
     fill_machine_no: bool = False,
     target_year: Optional[int] = None,  # ← 이 연도만 출력(없으면 전체)
+    data: Optional[CardData] = None,    # ← 선조회 결과가 있으면 DB 조회 생략
+    layout: Optional[TemplateLayout] = None,  # ← 컴파일된 템플릿 레이아웃(없으면 시트 스캔)
 ):
-    with session_scope() as s:
-        eq = (
-            s.execute(select(Equipment).where(Equipment.code == equipment_code).limit(1))
-            .scalars()
-            .first()
-        )
-        if not eq:
-            raise ValueError(f"설비({equipment_code})를 찾을 수 없습니다.")
-
-        # shallow copy (세션 분리)
-        eq_copy = Equipment()
-        for k in ("code","name","model","size_mm","voltage","power_kwh","maker",
-                  "in_year","in_month","in_day","purchase_price","location",
-                  "purpose","util_other","maker_phone","id","note"):
-            setattr(eq_copy, k, getattr(eq, k))
-        eq = eq_copy
-
-        # 대표 사진
-        photo_rel = s.execute(
-            select(Photo.file_path).where(Photo.equipment_id == eq.id).order_by(Photo.id.asc())
-        ).scalar()
-
-        # 수리 이력(연도 필터 적용)
-        rep_stmt = select(
-            Repair.work_date, Repair.kind, Repair.title,
-            Repair.detail, Repair.vendor, Repair.work_hours
-        ).where(Repair.equipment_id == eq.id)
-
-        if target_year is not None:
-            start = _date(target_year, 1, 1)
-            end   = _date(target_year, 12, 31)
-            rep_stmt = rep_stmt.where(and_(Repair.work_date >= start, Repair.work_date <= end))
-
-        rep_stmt = rep_stmt.order_by(Repair.work_date.asc(), Repair.id.asc())
-        reps_raw = s.execute(rep_stmt).all()
-
-    # 고정 필드
-    _fill_manager_code_down(ws, eq.code or "")
+    if data is None:
+        data = prefetch_cards([equipment_code], target_year).get(equipment_code)
+    if data is None:
+        raise ValueError(f"설비({equipment_code})를 찾을 수 없습니다.")
+    eq = data.eq
+    if layout is None:
+        layout = _compile_layout(ws)
+
+    # 고정 필드 ('관리번호' 라벨 아래)
+    if layout.manager_code_cell:
+        _write_cell(ws, *layout.manager_code_cell, eq.code or "")
     _fill_fixed_cells(ws, eq)
 
     if fill_machine_no:
         # 기기번호 라벨 오른쪽에 코드 출력(있을 때만)
-        for row in ws.iter_rows(min_row=1, max_row=25):
-            for cell in row:
-                if _norm(str(cell.value)) == _norm("기기번호"):
-                    _write_cell(ws, cell.row, cell.column + 1, eq.code or "")
-                    break
+        for r_, c_ in layout.machine_no_cells:
+            _write_cell(ws, r_, c_, eq.code or "")
 
     # 사진(고정 위치/크기)
-    _wipe_photos_keep_logo(ws, logo_min_row=32)
-    photo_path = resolve_photo_abs(photo_rel) if photo_rel else None
+    _wipe_photos_keep_logo(ws, keep_anchors=layout.logo_anchors)
+    photo_path = resolve_photo_abs(data.photo_rel) if data.photo_rel else None
     if not photo_path:
         photo_path = find_first_photo_path_for_code(eq.code or "")
     if photo_path and os.path.isfile(photo_path):
         _put_image_exact_size(ws, photo_path, anchor="G6", width_cm=11.67, height_cm=9.74)
 
     # 부속기구
-    accs = list_accessories(eq.id)
-    acc_list = [ (getattr(a, "name", "") or "", getattr(a, "spec", "") or "", getattr(a, "note", "") or "") for a in accs ][:7]
-    acc_info = _find_accessory_header(ws)
+    acc_list = data.accessories[:7]
+    acc_info = layout.accessory
     if acc_info:
         acc_header_row, acc_col_map = acc_info
         # 초기화
@@ -318,15 +525,16 @@ def _fill_sheet_for_code(
             if "비고" in acc_col_map:  _write_cell(ws, acc_header_row + idx, acc_col_map["비고"], nt)
 
     # 수리 이력 표
-    _clear_history_fixed(ws, max_rows=400)
-    r = HIST_START_ROW
-    for wdate, kind, title, detail, vendor, hours in reps_raw:
-        _write_cell(ws, r, HIST_COL_INDEX["년월일"], fmt_date(wdate))
-        _write_cell(ws, r, HIST_COL_INDEX["구분"], kind or "")
-        _write_cell(ws, r, HIST_COL_INDEX["고장개소·이력"], title or "")
-        _write_cell(ws, r, HIST_COL_INDEX["조치 내용"], detail or "")
-        _write_cell(ws, r, HIST_COL_INDEX["수리처"], vendor or "")
-        _write_cell(ws, r, HIST_COL_INDEX["수리 시간"], hours or "")
+    _clear_history_fixed(ws, max_rows=400, start_row=layout.hist_start_row)
+    cols = layout.hist_cols
+    r = layout.hist_start_row
+    for wdate, kind, title, detail, vendor, hours in data.repairs:
+        _write_cell(ws, r, cols["년월일"], fmt_date(wdate))
+        _write_cell(ws, r, cols["구분"], kind or "")
+        _write_cell(ws, r, cols["고장개소·이력"], title or "")
+        _write_cell(ws, r, cols["조치 내용"], detail or "")
+        _write_cell(ws, r, cols["수리처"], vendor or "")
+        _write_cell(ws, r, cols["수리 시간"], hours or "")
         r += 1
 
     ws.title = safe_sheet_title(eq.name or eq.code or "이력카드")
@@ -346,14 +554,11 @@ def export_history_card_xlsx(
     if not equipment_code:
         raise ValueError("equipment_code가 비어있습니다.")
 
-    tpath = template_path or ensure_template_history_card()
-    if tpath and os.path.isfile(tpath):
-        wb = load_workbook(tpath); ws = wb.active
-    else:
-        wb = Workbook(); ws = wb.active; ws.title = "이력카드"
+    wb, ws, layout = _open_template(template_path)
 
     ty = (base_date or _date.today()).year if year_only else None
-    _fill_sheet_for_code(ws, equipment_code, fill_machine_no=fill_machine_no, target_year=ty)
+    _fill_sheet_for_code(ws, equipment_code, fill_machine_no=fill_machine_no, target_year=ty,
+                         layout=layout)
 
     if not path:
         fn = f"{(equipment_code or 'NONCODE')}_이력카드.xlsx"
@@ -385,30 +590,29 @@ def export_history_cards_multi_xlsx(
     if not codes:
         raise ValueError("equipment_codes가 비어있습니다.")
 
-    # 코드→이름 조회(시트명 정렬용)
-    name_map: Dict[str, str] = {}
-    with session_scope() as s:
-        rows = s.execute(select(Equipment.code, Equipment.name).where(Equipment.code.in_(codes))).all()
-        for code, name in rows:
-            name_map[code] = name or ""
+    ty = (base_date or _date.today()).year if year_only else None
+    bundle = prefetch_cards(codes, ty)
+
+    # 코드→이름(시트명 정렬용)
+    name_map: Dict[str, str] = {code: (cd.eq.name or "") for code, cd in bundle.items()}
 
     if sort_by == "name":
         codes.sort(key=lambda c: (name_map.get(c, "") or "", c))
     else:
         codes.sort(key=lambda c: c)
 
-    tpath = template_path or ensure_template_history_card()
-    if not (tpath and os.path.isfile(tpath)):
-        wb = Workbook(); ws_master = wb.active; ws_master.title = "이력카드"
-    else:
-        wb = load_workbook(tpath); ws_master = wb.active
+    wb, ws_master, layout = _open_template(template_path)
 
     used_titles: set[str] = set()
-    ty = (base_date or _date.today()).year if year_only else None
 
     for idx, code in enumerate(codes):
-        ws = ws_master if idx == 0 else wb.copy_worksheet(ws_master)
-        _fill_sheet_for_code(ws, code, fill_machine_no=fill_machine_no, target_year=ty)
+        if idx == 0:
+            ws = ws_master
+        else:
+            ws = wb.copy_worksheet(ws_master)
+            _bind_layout(ws, layout)
+        _fill_sheet_for_code(ws, code, fill_machine_no=fill_machine_no, target_year=ty,
+                             data=bundle.get(code), layout=layout)
 
         nm = name_map.get(code, "") or ""
         base = (sheet_title_format.format(code=code, name=nm) if sheet_title_format
@@ -426,3 +630,140 @@ def export_history_cards_multi_xlsx(
     if not path:
         path = os.path.join(EXPORT_DIR, f"이력카드_묶음_{len(codes)}대.xlsx")
     return safe_save_workbook(wb, path)
+
+# ─────────────────────────────────────────────────────────────
+# 개별 이력카드 ZIP (프로세스 풀, 임시 폴더 없이 메모리 → ZIP)
+def render_history_card_bytes(
+    equipment_code: str,
+    template_path: Optional[str] = None,
+    fill_machine_no: bool = False,
+    target_year: Optional[int] = None,
+    data: Optional[CardData] = None,
+) -> bytes:
+    """이력카드 한 장을 xlsx 바이트로 생성(파일 저장 없음)."""
+    wb, ws, layout = _open_template(template_path)
+    _fill_sheet_for_code(ws, equipment_code, fill_machine_no=fill_machine_no,
+                         target_year=target_year, data=data, layout=layout)
+    buf = io.BytesIO(); wb.save(buf)
+    return buf.getvalue()
+
+def _render_cards_chunk(
+    codes: List[str],
+    template_path: Optional[str],
+    fill_machine_no: bool,
+    target_year: Optional[int],
+) -> List[tuple]:
+    """작업자 프로세스용: 코드 묶음 → [(code, xlsx 바이트 | None, 오류 | None)]"""
+    try:
+        bundle = prefetch_cards(codes, target_year)
+    except Exception as e:
+        return [(c, None, str(e)) for c in codes]
+    out = []
+    for code in codes:
+        try:
+            out.append((code, render_history_card_bytes(
+                code, template_path, fill_machine_no, target_year, data=bundle.get(code)
+            ), None))
+        except Exception as e:
+            out.append((code, None, str(e)))
+    return out
+
+def _zip_entry_name(code: str) -> str:
+    return re.sub(r'[\\/:*?"<>|]', "_", code or "NONCODE") + "_이력카드.xlsx"
+
+_POOL_MIN_CARDS = 8  # 이보다 적으면 프로세스 기동 비용이 더 큼 → 순차 처리
+
+@dataclass
+class ZipExportResult:
+    path: str
+    ok: int = 0
+    failed: List[tuple] = field(default_factory=list)   # (code, 오류 메시지)
+    cancelled: bool = False
+
+def export_history_cards_zip(
+    equipment_codes: List[str],
+    zip_path: str,
+    template_path: Optional[str] = None,
+    fill_machine_no: bool = False,
+    year_only: bool = False,
+    base_date: Optional[_date] = None,
+    workers: Optional[int] = None,
+    progress: Optional[Callable[[int, int], None]] = None,    # (완료 수, 전체 수)
+    is_cancelled: Optional[Callable[[], bool]] = None,
+) -> ZipExportResult:
+    """
+    설비별 이력카드 xlsx를 ZIP 한 파일로.
+    - 카드는 작업자 프로세스에서 바이트로 만들고 바로 ZIP에 기록(임시 폴더 없음)
+    - 카드별 실패는 result.failed 에 모으고 계속 진행
+    - 취소되면 만들던 ZIP은 지움
+    - 작업자 프로세스를 쓸 수 없으면 현재 프로세스에서 순차 처리
+    """
+    codes = list(dict.fromkeys(c for c in (equipment_codes or []) if c))
+    if not codes:
+        raise ValueError("equipment_codes가 비어있습니다.")
+
+    tpath = template_path or ensure_template_history_card()
+    ty = (base_date or _date.today()).year if year_only else None
+    n_workers = workers or min(4, os.cpu_count() or 1)
+    # 진행률/취소 반응성을 위해 작업 단위를 작게
+    per_chunk = max(1, min(20, len(codes) // (n_workers * 4) or 1))
+    chunks = [list(c) for c in _chunks(codes, per_chunk)]
+    cancelled = is_cancelled or (lambda: False)
+
+    result = ZipExportResult(path=zip_path)
+    done = 0
+    part_path = zip_path + ".part"
+    with zipfile.ZipFile(part_path, "w", compression=zipfile.ZIP_STORED) as zf:  # xlsx는 이미 압축됨
+        def consume(rows: List[tuple]):
+            nonlocal done
+            for code, data, err in rows:
+                done += 1
+                if data is None:
+                    result.failed.append((code, err or "알 수 없는 오류"))
+                else:
+                    zf.writestr(_zip_entry_name(code), data); result.ok += 1
+            if progress:
+                progress(done, len(codes))
+
+        pending = list(range(len(chunks)))
+        if n_workers > 1 and len(codes) >= _POOL_MIN_CARDS:
+            try:
+                with ProcessPoolExecutor(max_workers=n_workers,
+                                         mp_context=mp.get_context("spawn")) as ex:
+                    futs = {ex.submit(_render_cards_chunk, chunks[i], tpath, fill_machine_no, ty): i
+                            for i in pending}
+                    try:
+                        for f in as_completed(futs):
+                            i = futs[f]
+                            try:
+                                rows = f.result()
+                            except BrokenProcessPool:
+                                raise
+                            except Exception as e:
+                                rows = [(c, None, str(e)) for c in chunks[i]]
+                            pending.remove(i)
+                            consume(rows)
+                            if cancelled():
+                                result.cancelled = True
+                                break
+                    finally:
+                        for f in futs:
+                            f.cancel()
+            except (BrokenProcessPool, OSError):
+                pass  # 남은 묶음은 아래에서 순차 처리
+
+        if not result.cancelled:
+            for i in list(pending):
+                if cancelled():
+                    result.cancelled = True
+                    break
+                consume(_render_cards_chunk(chunks[i], tpath, fill_machine_no, ty))
+
+    if result.cancelled or result.ok == 0:
+        try:
+            os.remove(part_path)
+        except OSError:
+            pass
+    else:
+        os.replace(part_path, zip_path)
+    return result
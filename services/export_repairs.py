@@ -2,16 +2,86 @@
 from __future__ import annotations
 from datetime import date, datetime
 import os
-from typing import Optional, Iterable, Dict
+from typing import Optional, Iterable, Iterator, Dict
 
 from openpyxl import Workbook
-from openpyxl.worksheet.worksheet import Worksheet
-from sqlalchemy import select, func
-from sqlalchemy.orm import selectinload
+from sqlalchemy import select
 
 from db import session_scope
 from models import Equipment, Repair, RepairItem, Consumable
-from .exporter_common import header, autofit, fmt_date, EXPORT_DIR
+from .exporter_common import fmt_date, EXPORT_DIR, StreamingSheet
+
+
+REPAIR_EXPORT_COLUMNS = [
+    "설비코드","설비명","일자","구분","제목","내용",
+    "사용소모품수","사용소모품상세","완료일자","진행현황","등록시각","수리ID"
+]
+
+
+def iter_repair_export_rows(
+    equipment_id: Optional[int] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+) -> Iterator[Dict[str, object]]:
+    """
+    개선·수리 내보내기용 비정규화 행 생성기(REPAIR_EXPORT_COLUMNS 키의 dict).
+    - 쿼리는 건수와 무관하게 3번: 소모품 이름 사전 / 수리 행 / 사용 소모품 행
+    - 수리·소모품 행은 같은 순서(일자, 수리ID)로 스트리밍해 순서대로 짝지음
+    """
+    def _filtered(stmt):
+        if equipment_id:
+            stmt = stmt.where(Repair.equipment_id == int(equipment_id))
+        if date_from:
+            stmt = stmt.where(Repair.work_date >= date_from)
+        if date_to:
+            stmt = stmt.where(Repair.work_date <= date_to)
+        return stmt
+
+    with session_scope() as s:
+        # 1) 소모품 이름 사전(한 번)
+        name_map: Dict[int, str] = {
+            cid: f"{nm or ''} / {sp or ''}".strip()
+            for cid, nm, sp in s.execute(select(Consumable.id, Consumable.name, Consumable.spec)).all()
+        }
+
+        # 2) 수리 행(설비 조인)
+        rep_stmt = _filtered(
+            select(Repair.id, Repair.work_date, Repair.kind, Repair.title, Repair.detail,
+                   Repair.complete_date, Repair.progress_status, Repair.created_at,
+                   Equipment.code, Equipment.name)
+            .outerjoin(Equipment, Equipment.id == Repair.equipment_id)
+        ).order_by(Repair.work_date.asc(), Repair.id.asc())
+
+        # 3) 사용 소모품 행(같은 필터/순서)
+        item_stmt = _filtered(
+            select(RepairItem.repair_id, RepairItem.consumable_id, RepairItem.qty)
+            .join(Repair, Repair.id == RepairItem.repair_id)
+        ).order_by(Repair.work_date.asc(), Repair.id.asc(), RepairItem.id.asc())
+
+        reps = s.execute(rep_stmt.execution_options(yield_per=1000))
+        items = iter(s.execute(item_stmt.execution_options(yield_per=1000)))
+        pending = next(items, None)
+
+        for rid, wdate, kind, title, detail, cdate, status, created, eq_code, eq_name in reps:
+            parts = []
+            while pending is not None and pending[0] == rid:
+                _rid, cid, qty = pending
+                parts.append(f"{name_map.get(cid, f'ID:{cid}')} x {qty}")
+                pending = next(items, None)
+            yield {
+                "설비코드": eq_code or "",
+                "설비명": eq_name or "",
+                "일자": fmt_date(wdate),
+                "구분": kind or "",
+                "제목": title or "",
+                "내용": detail or "",
+                "사용소모품수": len(parts),
+                "사용소모품상세": "; ".join(parts),
+                "완료일자": fmt_date(cdate),
+                "진행현황": status or "",
+                "등록시각": fmt_date(created),
+                "수리ID": rid,
+            }
 
 
 def export_repairs_xlsx(
@@ -27,65 +97,16 @@ def export_repairs_xlsx(
     - date_from/date_to: 기간 필터(둘 중 하나만 줘도 됨)
     - columns: 내보낼 컬럼 순서를 바꾸고 싶으면 리스트로 전달(없으면 기본)
     """
-    default_cols = [
-        "설비코드","설비명","일자","구분","제목","내용",
-        "사용소모품수","사용소모품상세","완료일자","진행현황","등록시각","수리ID"
-    ]
-    headers = list(columns) if columns else default_cols
+    headers = list(columns) if columns else REPAIR_EXPORT_COLUMNS
 
-    wb = Workbook()
-    ws: Worksheet = wb.active
-    ws.title = "개선·수리"
-    header(ws, 1, headers)
+    # write_only: 행을 바로 파일로 흘려보냄(시트 전체를 메모리에 두지 않음)
+    wb = Workbook(write_only=True)
+    sheet = StreamingSheet(wb, "개선·수리", headers)
 
-    with session_scope() as s:
-        stmt = (
-            select(Repair)
-            .options(selectinload(Repair.items), selectinload(Repair.equipment))
-        )
-        if equipment_id:
-            stmt = stmt.where(Repair.equipment_id == int(equipment_id))
-        if date_from:
-            stmt = stmt.where(Repair.work_date >= date_from)
-        if date_to:
-            stmt = stmt.where(Repair.work_date <= date_to)
-        stmt = stmt.order_by(Repair.work_date.asc(), Repair.id.asc())
-
-        rows = s.execute(stmt).scalars().unique().all()
-
-        def items_detail(r: Repair) -> str:
-            if not r.items:
-                return ""
-            cids = list({it.consumable_id for it in r.items if it.consumable_id})
-            name_map: Dict[int, str] = {}
-            if cids:
-                for c in s.execute(select(Consumable).where(Consumable.id.in_(cids))).scalars().all():
-                    name_map[c.id] = f"{c.name or ''} / {c.spec or ''}".strip()
-            parts = []
-            for it in r.items:
-                label = name_map.get(it.consumable_id, f"ID:{it.consumable_id}")
-                parts.append(f"{label} x {it.qty}")
-            return "; ".join(parts)
-
-        for r in rows:
-            eq = r.equipment or Equipment()
-            vals = {
-                "설비코드": eq.code or "",
-                "설비명": eq.name or "",
-                "일자": fmt_date(r.work_date),
-                "구분": r.kind or "",
-                "제목": r.title or "",
-                "내용": r.detail or "",
-                "사용소모품수": len(r.items or []),
-                "사용소모품상세": items_detail(r),
-                "완료일자": fmt_date(getattr(r, "complete_date", None)),
-                "진행현황": getattr(r, "progress_status", "") or "",
-                "등록시각": fmt_date(getattr(r, "created_at", None)),
-                "수리ID": r.id,
-            }
-            ws.append([vals.get(h, "") for h in headers])
+    for vals in iter_repair_export_rows(equipment_id, date_from, date_to):
+        sheet.append([vals.get(h, "") for h in headers])
 
-    autofit(ws)
+    sheet.close()
     if not path:
         path = os.path.join(EXPORT_DIR, "개선수리_내보내기.xlsx")
     os.makedirs(os.path.dirname(path), exist_ok=True)
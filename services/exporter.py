@@ -3,10 +3,9 @@ from __future__ import annotations
 import os
 from typing import Optional
 from openpyxl import Workbook
-from openpyxl.utils import get_column_letter
 
 # 공통 상수
-from .exporter_common import APP_ROOT, TEMPLATES_DIR, EXPORT_DIR
+from .exporter_common import APP_ROOT, TEMPLATES_DIR, EXPORT_DIR, StreamingSheet, ColumnWidths
 
 # 다른 내보내기 함수들은 그대로 재노출
 from .export_repairs import export_repairs_xlsx
@@ -22,20 +21,9 @@ __all__ = [
 
 # ─────────────────────────────────────────────────────────────
 # 간단한 서식 유틸
-def _header(ws, row_idx: int, labels: list[str]):
-    ws.append(labels)
-    for i in range(1, len(labels)+1):
-        c = ws.cell(row=row_idx, column=i)
-        c.font = c.font.copy(bold=True)
-
-def _autofit(ws):
-    widths = {}
-    for row in ws.iter_rows(values_only=True):
-        for i, val in enumerate(row, start=1):
-            l = 0 if val is None else len(str(val))
-            widths[i] = max(widths.get(i, 0), l)
-    for i, w in widths.items():
-        ws.column_dimensions[get_column_letter(i)].width = min(max(w+2, 8), 60)
+def _text_width(val) -> int:
+    # 열 너비 추정(글자 수 + 여백 2)
+    return (0 if val is None else len(str(val))) + 2
 
 def _fmt_date(d):
     return "" if d is None else str(d)
@@ -49,9 +37,7 @@ def export_equipment_xlsx(keyword: str = "", path: Optional[str] = None) -> str:
     """
     from services.equipment_service import list_equipment
     rows = list_equipment(keyword or "")
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "설비관리대장"
+    wb = Workbook(write_only=True)
 
     headers = [
         "설비번호", "자산명", "설비명", "설비명 변경안", "모델명",
@@ -62,10 +48,12 @@ def export_equipment_xlsx(keyword: str = "", path: Optional[str] = None) -> str:
         "입고일(년)", "입고일(월)", "입고일(일)",
         "수량", "구입가격", "설비위치", "비고", "파트"
     ]
-    _header(ws, 1, headers)
+    sheet = StreamingSheet(wb, "설비관리대장", headers,
+                           widths=ColumnWidths(measure=_text_width, min_width=8, max_width=60),
+                           bold_only_header=True)
 
     for e in rows:
-        ws.append([
+        sheet.append([
             e.code or "", e.asset_name or "", e.name or "", e.alt_name or "", e.model or "",
             e.size_mm or "", e.voltage or "", e.power_kwh or "",
             e.util_air or "", e.util_coolant or "", e.util_vac or "",
@@ -76,7 +64,7 @@ def export_equipment_xlsx(keyword: str = "", path: Optional[str] = None) -> str:
             e.qty or "", e.purchase_price or "", e.location or "", e.note or "", e.part or ""
         ])
 
-    _autofit(ws)
+    sheet.close()
     if not path:
         os.makedirs(EXPORT_DIR, exist_ok=True)
         path = os.path.join(EXPORT_DIR, "설비관리대장.xlsx")
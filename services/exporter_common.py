@@ -7,11 +7,11 @@ from openpyxl import Workbook
 from openpyxl.drawing.image import Image as XLImage
 from openpyxl.utils import get_column_letter
 from openpyxl.worksheet.worksheet import Worksheet
-from PIL import Image as PILImage
 
 from sqlalchemy import select
 from db import session_scope
 from models import Photo
+from services.image_cache import get_resized
 
 import settings  # 서버/로컬 사진 루트
 
@@ -87,17 +87,94 @@ def autofit(ws: Worksheet, max_width: int = 60):
     for i, w in lens.items():
         ws.column_dimensions[get_column_letter(i)].width = max(10, w)
 
-def header(ws: Worksheet, row: int, labels: Iterable[str]):
+def _header_styles():
     from openpyxl.styles import Font, Alignment, PatternFill, Border, Side
-    bold = Font(bold=True); fill = PatternFill("solid", fgColor="F2F2F2")
     thin = Side(style="thin", color="DDDDDD")
-    border = Border(left=thin, right=thin, top=thin, bottom=thin)
+    return (Font(bold=True), PatternFill("solid", fgColor="F2F2F2"),
+            Alignment(horizontal="center", vertical="center"),
+            Border(left=thin, right=thin, top=thin, bottom=thin))
+
+def header(ws: Worksheet, row: int, labels: Iterable[str]):
+    bold, fill, align, border = _header_styles()
     for i, h in enumerate(labels, start=1):
         c = ws.cell(row=row, column=i, value=h)
         c.font = bold; c.fill = fill
-        c.alignment = Alignment(horizontal="center", vertical="center")
+        c.alignment = align
         c.border = border
 
+# ─────────────────────────────────────────────
+# 스트리밍(write-only) 시트: 행을 바로 파일 스트림으로 → 메모리 일정, 한 번만 순회
+def utf8_width(v) -> int:
+    """autofit과 같은 폭 추정식(UTF-8 바이트 × 0.6 + 여백 2)."""
+    s = "" if v is None else str(v)
+    return int(len(s.encode("utf-8")) * 0.6) + 2
+
+class ColumnWidths:
+    """행을 추가하면서 열 너비를 누적 추정(autofit 재순회 대체)."""
+    def __init__(self, measure=utf8_width, min_width: int = 10, max_width: int = 60):
+        self.measure = measure
+        self.min_width = min_width
+        self.max_width = max_width
+        self.widths: Dict[int, int] = {}
+
+    def feed(self, values: Iterable) -> None:
+        w = self.widths
+        for i, v in enumerate(values, start=1):
+            est = min(self.measure(v), self.max_width)
+            if est > w.get(i, 0):
+                w[i] = est
+
+    def apply(self, ws) -> None:
+        for i, est in self.widths.items():
+            ws.column_dimensions[get_column_letter(i)].width = max(self.min_width, est)
+
+class StreamingSheet:
+    """
+    write_only 워크북용 시트 작성기.
+    write_only 시트는 열 너비를 첫 행 기록 전에 정해야 하므로,
+    앞쪽 sample_rows 행만 잠시 모아 너비를 추정한 뒤 모두 흘려보냄(이후 행은 바로 기록).
+    """
+    def __init__(self, wb: Workbook, title: str, headers: Iterable[str],
+                 widths: Optional[ColumnWidths] = None, sample_rows: int = 1000,
+                 bold_only_header: bool = False):
+        from openpyxl.cell import WriteOnlyCell
+        self.ws = wb.create_sheet(title)
+        self.widths = widths or ColumnWidths()
+        self._sample_rows = sample_rows
+        self.rows = 0
+
+        headers = list(headers)
+        bold, fill, align, border = _header_styles()
+        cells = []
+        for h in headers:
+            c = WriteOnlyCell(self.ws, value=h)
+            c.font = bold
+            if not bold_only_header:
+                c.fill = fill; c.alignment = align; c.border = border
+            cells.append(c)
+        self.widths.feed(headers)
+        self._buf: Optional[list] = [cells]
+
+    def append(self, values: Iterable) -> None:
+        values = list(values)
+        self.rows += 1
+        if self._buf is None:
+            self.ws.append(values); return
+        self.widths.feed(values)
+        self._buf.append(values)
+        if len(self._buf) > self._sample_rows:
+            self._flush()
+
+    def _flush(self) -> None:
+        self.widths.apply(self.ws)
+        for row in self._buf or []:
+            self.ws.append(row)
+        self._buf = None
+
+    def close(self) -> None:
+        if self._buf is not None:
+            self._flush()
+
 # ─────────────────────────────────────────────
 # 사진 경로/삽입
 def resolve_photo_abs(rel_or_abs: str | None) -> Optional[str]:
@@ -146,13 +223,11 @@ def find_first_photo_path_for_code(code: str) -> Optional[str]:
 
 def put_image(ws: Worksheet, img_path: str, anchor: str, max_w_px: int, max_h_px: int):
     try:
-        with PILImage.open(img_path) as im:
-            w, h = im.size
-            scale = min(max_w_px / max(1, w), max_h_px / max(1, h), 1.0)
-            nw, nh = int(w * scale), int(h * scale)
-            im = im.resize((nw, nh), PILImage.LANCZOS)
-            buf = io.BytesIO(); im.save(buf, format="PNG"); buf.seek(0)
-        ox = XLImage(buf); ox.width = nw; ox.height = nh
+        got = get_resized(img_path, max_w_px, max_h_px, mode="fit", fmt="PNG")
+        if not got:
+            return
+        data, nw, nh = got
+        ox = XLImage(io.BytesIO(data)); ox.width = nw; ox.height = nh
         ws.add_image(ox, anchor)
     except Exception:
         pass
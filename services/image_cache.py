@@ -0,0 +1,148 @@
+from __future__ import annotations
+import os, io, hashlib, threading
+from typing import Optional, Tuple
+
+from PIL import Image as PILImage
+
+import settings
+
+# ─────────────────────────────────────────────────────────
+# 사진 축소본(파생 이미지) 로컬 디스크 캐시
+# - 키: 원본 경로 + mtime + 크기 + 목표 치수/방식/포맷 → 원본이 바뀌면 자동으로 새 키
+# - 적중 시 파일 mtime을 갱신(LRU), 총량이 한도를 넘으면 오래된 것부터 삭제
+# - 서버 공유 폴더의 원본(수 MB JPEG)은 캐시 미스일 때만 열어 디코딩
+
+_lock = threading.Lock()
+_total_bytes: Optional[int] = None   # 캐시 폴더 총량(첫 기록 때 한 번 스캔)
+_EVICT_RATIO = 0.9                   # 정리 시 한도의 90%까지 줄임
+
+def _cache_dir() -> str:
+    d = settings.get_image_cache_dir()
+    try:
+        os.makedirs(d, exist_ok=True)
+    except Exception:
+        pass
+    return d
+
+def _cache_key(path: str, width: int, height: int, mode: str, fmt: str) -> Optional[str]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    raw = f"{os.path.abspath(path)}|{st.st_mtime_ns}|{st.st_size}|{width}x{height}|{mode}|{fmt}"
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+def _fit_size(w: int, h: int, max_w: int, max_h: int) -> Tuple[int, int]:
+    # 비율 유지, 확대는 하지 않음
+    scale = min(max_w / max(1, w), max_h / max(1, h), 1.0)
+    return max(1, int(w * scale)), max(1, int(h * scale))
+
+def _render(path: str, width: int, height: int, mode: str, fmt: str) -> Tuple[bytes, int, int]:
+    with PILImage.open(path) as im:
+        if mode == "exact":
+            nw, nh = width, height
+        else:
+            nw, nh = _fit_size(im.size[0], im.size[1], width, height)
+        # JPEG는 draft로 축소 디코딩(원본 전체 디코딩 회피)
+        try:
+            im.draft(im.mode, (nw, nh))
+        except Exception:
+            pass
+        out = im.resize((nw, nh), PILImage.LANCZOS)
+        if fmt == "JPEG" and out.mode not in ("RGB", "L"):
+            out = out.convert("RGB")
+        buf = io.BytesIO(); out.save(buf, format=fmt)
+    return buf.getvalue(), nw, nh
+
+def _evict_locked(cache_dir: str, limit: int) -> None:
+    global _total_bytes
+    entries = []
+    for name in os.listdir(cache_dir):
+        p = os.path.join(cache_dir, name)
+        try:
+            st = os.stat(p)
+        except OSError:
+            continue
+        if os.path.isfile(p):
+            entries.append((st.st_mtime, st.st_size, p))
+    total = sum(e[1] for e in entries)
+    if total > limit:
+        target = int(limit * _EVICT_RATIO)
+        for _mtime, size, p in sorted(entries):
+            if total <= target:
+                break
+            try:
+                os.remove(p); total -= size
+            except OSError:
+                pass
+    _total_bytes = total
+
+def _store(cache_dir: str, fn: str, data: bytes) -> None:
+    global _total_bytes
+    dst = os.path.join(cache_dir, fn)
+    tmp = f"{dst}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, dst)
+    except Exception:
+        try:
+            os.remove(tmp)
+        except Exception:
+            pass
+        return
+
+    with _lock:
+        limit = settings.get_image_cache_max_bytes()
+        if _total_bytes is None:
+            _evict_locked(cache_dir, limit)
+        else:
+            _total_bytes += len(data)
+            if _total_bytes > limit:
+                _evict_locked(cache_dir, limit)
+
+def get_resized(path: str, width: int, height: int,
+                mode: str = "fit", fmt: str = "PNG") -> Optional[Tuple[bytes, int, int]]:
+    """
+    원본 경로 → (이미지 바이트, 가로px, 세로px). 원본을 열 수 없으면 None.
+    mode="fit": width×height 안에 비율 유지(확대 안 함), mode="exact": 정확히 그 크기로.
+    """
+    fmt = fmt.upper()
+    key = _cache_key(path, width, height, mode, fmt)
+    if key is None:
+        return None
+
+    cache_dir = _cache_dir()
+    fn = f"{key}.{'jpg' if fmt == 'JPEG' else fmt.lower()}"
+    cpath = os.path.join(cache_dir, fn)
+    try:
+        with open(cpath, "rb") as f:
+            data = f.read()
+        with PILImage.open(io.BytesIO(data)) as im:   # 헤더만 읽어 크기 확인
+            nw, nh = im.size
+        try:
+            os.utime(cpath, None)   # LRU 갱신
+        except OSError:
+            pass
+        return data, nw, nh
+    except Exception:
+        pass
+
+    try:
+        data, nw, nh = _render(path, width, height, mode, fmt)
+    except Exception:
+        return None
+    _store(cache_dir, fn, data)
+    return data, nw, nh
+
+def clear_cache() -> None:
+    """캐시 폴더 비우기."""
+    global _total_bytes
+    d = _cache_dir()
+    with _lock:
+        for name in os.listdir(d):
+            try:
+                os.remove(os.path.join(d, name))
+            except OSError:
+                pass
+        _total_bytes = 0
@@ -1,11 +1,16 @@
 from __future__ import annotations
+import numpy as np
 import pandas as pd
 import re
-from typing import Any, Optional
+import hashlib
+from collections import Counter
+from typing import Any, Callable, Iterator, Optional
 from datetime import datetime
-from models import init_db, Equipment
+from openpyxl import load_workbook
+from models import init_db, Equipment, Consumable, ConsumableTxn
 from db import session_scope
-from sqlalchemy import select
+from sqlalchemy import func, select, insert, update, case
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 
 # ── 공통 유틸
 def pick(row:dict, keys:list[str]) -> Any:
@@ -49,146 +54,351 @@ def parse_datetime(value) -> Optional[datetime]:
     except Exception:
         return None
 
+# ─────────────────────────────────────────────────────────────
+# 엑셀 청크 스트리밍 읽기 (openpyxl read_only → 고정 크기 DataFrame 묶음)
+# - 파일 전체를 DataFrame/딕셔너리로 만들지 않음 → 수년치 입출고 이력도 메모리 일정
+# - 값은 pd.read_excel(dtype=str).fillna("") 와 같은 문자열 규칙
+IMPORT_CHUNK_ROWS = 2000
+
+ProgressFn = Callable[[int, int], None]   # (처리한 행, 전체 행 — 모르면 0)
+
+def _cell_text(v) -> str:
+    if v is None:
+        return ""
+    if isinstance(v, float) and v.is_integer():
+        return str(int(v))   # read_excel 과 동일: 3.0 → "3"
+    return str(v)
+
+def _header_names(cells) -> list[str]:
+    # 빈 머리글은 "Unnamed: n", 중복 머리글은 "이름.1" (read_excel 규칙)
+    names, seen = [], {}
+    for i, v in enumerate(cells):
+        name = _cell_text(v) or f"Unnamed: {i}"
+        if name in seen:
+            seen[name] += 1
+            name = f"{name}.{seen[name]}"
+        else:
+            seen[name] = 0
+        names.append(name)
+    return names
+
+def iter_excel_chunks(
+    path: str,
+    chunk_size: int = IMPORT_CHUNK_ROWS,
+    progress: Optional[ProgressFn] = None,
+    sheet: Optional[str] = None,
+) -> Iterator[pd.DataFrame]:
+    """
+    첫 시트(또는 sheet)의 첫 행을 머리글로, 나머지를 chunk_size 행씩 문자열 DataFrame으로 yield.
+    - 완전히 빈 행은 건너뜀
+    - progress(done, total)는 호출자가 한 청크를 처리(커밋)한 뒤 호출됨
+    """
+    wb = load_workbook(path, read_only=True, data_only=True)
+    try:
+        ws = wb[sheet] if sheet else wb.worksheets[0]
+        total = max(0, (ws.max_row or 0) - 1)   # 시트 dimension 기준(없으면 0)
+        rows = ws.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        cols = _header_names(header)
+        width = len(cols)
+
+        buf: list[tuple] = []
+        done = 0
+        for r in rows:
+            done += 1
+            vals = tuple(_cell_text(v) for v in r[:width])
+            if not any(vals):
+                continue
+            if len(vals) < width:
+                vals += ("",) * (width - len(vals))
+            buf.append(vals)
+            if len(buf) >= chunk_size:
+                yield pd.DataFrame(buf, columns=cols, dtype=object)
+                buf = []
+                if progress:
+                    progress(done, max(total, done))
+        if buf:
+            yield pd.DataFrame(buf, columns=cols, dtype=object)
+        if progress:
+            progress(done, max(total, done))
+    finally:
+        wb.close()
+
+def read_excel_frame(path: str, progress: Optional[ProgressFn] = None) -> pd.DataFrame:
+    """전체가 한꺼번에 필요한 경우(미리보기/비교)용: 청크를 이어 붙인 문자열 DataFrame."""
+    chunks = list(iter_excel_chunks(path, progress=progress))
+    if not chunks:
+        return pd.DataFrame()
+    return pd.concat(chunks, ignore_index=True)
+
 # ─────────────────────────────────────────────────────────────
 # 설비 (용도=purpose / 유틸리티 기타=util_other)
-def import_equipment_xlsx(path:str):
-    df = pd.read_excel(path, dtype=str).fillna("")
-    for _, r in df.iterrows():
-        row = r.to_dict()
-
-        no = parse_int(pick(row, ["NO","No","no"]))
-        code = pick(row, ["설비번호","관리번호","설비코드","코드","code","Code"]) or ""
-        if not code:
-            continue
+# 속성 → (엑셀 머리글 후보, 형식). 후보는 앞에서부터 처음 있는 열 하나만 사용
+EQUIPMENT_IMPORT_FIELDS: list[tuple[str, list[str], str]] = [
+    ("no",               ["NO","No","no"], "int"),
+    ("code",             ["설비번호","관리번호","설비코드","코드","code","Code"], "str"),
+    ("asset_name",       ["자산명","asset_name","AssetName"], "str"),
+    ("name",             ["설비명","장비명","name","Name"], "str"),
+    ("alt_name",         ["설비명 변경안","설비명변경안","변경안","alt_name","AltName"], "str"),
+    ("model",            ["모델명","모델","Model","형식","type","Type"], "str"),
+    ("size_mm",          ["크기(가로x세로x높이)mm","크기","규격(mm)","규격","size","Size"], "str"),
+    ("voltage",          ["전압","voltage","Voltage"], "str"),
+    ("power_kwh",        ["전력용량(Kwh)","전력용량(kWh)","전력용량","전력(kW)","kW","power","Power"], "float"),
+    ("util_air",         ["유틸리티 AIR","유틸리티AIR","AIR","air"], "str"),
+    ("util_coolant",     ["유틸리티 냉각수","냉각수","coolant","Coolant"], "str"),
+    ("util_vac",         ["유틸리티 진공","진공","vacuum","Vacuum"], "str"),
+    # ★ util_other 후보(‘용도’는 제외!)
+    ("util_other",       ["유틸리티 기타","기타유틸리티","유틸리티","Util","util"], "str"),
+    # ★ purpose 후보(‘용도’만!)
+    ("purpose",          ["용도","용 도","purpose","Purpose","usage","Usage","用途"], "str"),
+    ("maker",            ["제조회사","제조사","Maker","maker"], "str"),
+    ("maker_phone",      ["제조회사 대표 전화번호","대표 전화","제조사 전화","Tel","tel","전화","전화번호","Phone","phone"], "str"),
+    ("manufacture_date", ["제조일자","제작일자","제작일","manufacture_date","ManufactureDate"], "date"),
+    ("in_year",          ["입고일(년)","입고년","in_year","InYear"], "int"),
+    ("in_month",         ["입고일(월)","입고월","in_month","InMonth"], "int"),
+    ("in_day",           ["입고일(일)","입고일","in_day","InDay"], "int"),
+    ("qty",              ["수량","qty","Qty"], "float"),
+    ("purchase_price",   ["구입가격","구매가격","가격","price","Price"], "float"),
+    ("location",         ["설비위치","위치","location","Location"], "str"),
+    ("note",             ["비고","메모","특이사항","note","Note"], "str"),
+    ("part",             ["파트","부서","라인","part","Part"], "str"),
+]
 
-        asset_name = pick(row, ["자산명","asset_name","AssetName"])
-        name = pick(row, ["설비명","장비명","name","Name"]) or ""
-        alt_name = pick(row, ["설비명 변경안","설비명변경안","변경안","alt_name","AltName"])
-        model = pick(row, ["모델명","모델","Model","형식","type","Type"])
-
-        size_mm = pick(row, ["크기(가로x세로x높이)mm","크기","규격(mm)","규격","size","Size"])
-        voltage = pick(row, ["전압","voltage","Voltage"])
-        power_kwh = parse_float(pick(row, ["전력용량(Kwh)","전력용량(kWh)","전력용량","전력(kW)","kW","power","Power"]))
-
-        util_air = pick(row, ["유틸리티 AIR","유틸리티AIR","AIR","air"])
-        util_coolant = pick(row, ["유틸리티 냉각수","냉각수","coolant","Coolant"])
-        util_vac = pick(row, ["유틸리티 진공","진공","vacuum","Vacuum"])
-        # ★ util_other 후보(‘용도’는 제외!)
-        util_other = pick(row, [
-            "유틸리티 기타","기타유틸리티","유틸리티","Util","util"
-        ])
-        # ★ purpose 후보(‘용도’만!)
-        purpose = pick(row, [
-            "용도","용 도","purpose","Purpose","usage","Usage","用途"
-        ])
+def resolve_alias(columns, aliases: list[str]) -> Optional[str]:
+    """머리글 후보 중 실제로 있는 첫 열 이름(없으면 None)."""
+    cols = set(columns)
+    for k in aliases:
+        if k in cols:
+            return k
+    return None
+
+# ── 열 단위 형 변환(parse_int / parse_float / parse_date 와 같은 규칙)
+def _str_series(s: pd.Series) -> pd.Series:
+    return s.fillna("").astype(str).str.strip()
+
+def _int_series(s: pd.Series) -> pd.Series:
+    num = pd.to_numeric(_str_series(s), errors="coerce")
+    num = num.where(np.isfinite(num))
+    return np.trunc(num).astype("Int64")
+
+def _float_series(s: pd.Series) -> pd.Series:
+    cleaned = _str_series(s).str.replace(",", "", regex=False).str.replace(r"[^0-9.\-]", "", regex=True)
+    return pd.to_numeric(cleaned, errors="coerce")
+
+def _date_series(s: pd.Series) -> pd.Series:
+    s = _str_series(s)
+    try:
+        dt = pd.to_datetime(s.where(s != ""), errors="coerce", format="mixed")
+    except (TypeError, ValueError):   # format="mixed" 미지원(pandas < 2)
+        return s.map(parse_date).astype(object)
+    return dt.dt.date.astype(object).where(dt.notna(), None)
+
+_COERCE = {"int": _int_series, "float": _float_series, "date": _date_series}
 
-        maker = pick(row, ["제조회사","제조사","Maker","maker"])
-        maker_phone = pick(row, ["제조회사 대표 전화번호","대표 전화","제조사 전화","Tel","tel","전화","전화번호","Phone","phone"])
-        manufacture_date = parse_date(pick(row, ["제조일자","제작일자","제작일","manufacture_date","ManufactureDate"]))
+def equipment_frame(df: pd.DataFrame, fields=None) -> pd.DataFrame:
+    """
+    원본 시트 DataFrame → 모델 속성 열을 가진 정리된 DataFrame.
+    - fields: (속성, 머리글 후보, 형식) 목록(기본 EQUIPMENT_IMPORT_FIELDS, "code" 필수)
+    - 별칭은 파일당 한 번만 해석, 형 변환은 열 단위
+    - 설비번호 없는 행 제외, 같은 설비번호가 여러 번이면 마지막 행 사용
+      (설비명은 마지막으로 비어 있지 않은 값)
+    """
+    fields = fields or EQUIPMENT_IMPORT_FIELDS
+    out = pd.DataFrame(index=df.index)
+    code_aliases = next(aliases for attr, aliases, _k in fields if attr == "code")
+    if resolve_alias(df.columns, code_aliases) is None:
+        return out
+    for attr, aliases, kind in fields:
+        col = resolve_alias(df.columns, aliases)
+        if col is None:
+            out[attr] = None
+            continue
+        if kind == "str":
+            v = _str_series(df[col])
+            out[attr] = v if attr in ("code", "name") else v.where(v != "", None)
+        else:
+            out[attr] = _COERCE[kind](df[col])
 
-        in_year = parse_int(pick(row, ["입고일(년)","입고년","in_year","InYear"]))
-        in_month = parse_int(pick(row, ["입고일(월)","입고월","in_month","InMonth"]))
-        in_day = parse_int(pick(row, ["입고일(일)","입고일","in_day","InDay"]))
+    out["code"] = out["code"].fillna("")
+    out["name"] = out["name"].fillna("")
+    out = out[out["code"] != ""]
+    last_names = out[out["name"] != ""].groupby("code")["name"].last()
+    out = out.drop_duplicates("code", keep="last").copy()
+    out["name"] = out["code"].map(last_names).fillna("")
+    return out
 
-        qty = parse_float(pick(row, ["수량","qty","Qty"]))
-        purchase_price = parse_float(pick(row, ["구입가격","구매가격","가격","price","Price"]))
-        location = pick(row, ["설비위치","위치","location","Location"])
-        note = pick(row, ["비고","메모","특이사항","note","Note"])
-        part = pick(row, ["파트","부서","라인","part","Part"])
+def _equipment_upsert_stmt(columns):
+    t = Equipment.__table__
+    stmt = sqlite_insert(t)
+    set_ = {c: stmt.excluded[c] for c in columns if c not in ("code", "name")}
+    set_["name"] = func.coalesce(func.nullif(stmt.excluded.name, ""), t.c.name)
+    return stmt.on_conflict_do_update(index_elements=[t.c.code], set_=set_)
 
+def import_equipment_xlsx(path:str, progress: Optional[ProgressFn] = None,
+                          chunk_size: int = IMPORT_CHUNK_ROWS) -> int:
+    """
+    설비관리대장 엑셀 → equipment 일괄 머지.
+    청크마다 INSERT ... ON CONFLICT(code) DO UPDATE 한 번(executemany)을 한 트랜잭션으로 커밋.
+    설비명이 빈 칸이면 기존 설비명 유지(앞 청크에서 넣은 값 포함). 반영 행 수 반환.
+    """
+    n = 0
+    for df in iter_excel_chunks(path, chunk_size, progress):
+        frame = equipment_frame(df)
+        if frame.empty:
+            continue
+        records = frame.astype(object).where(frame.notna(), None).to_dict("records")
         with session_scope() as s:
-            eq = s.execute(select(Equipment).where(Equipment.code==code)).scalars().first()
-            if not eq:
-                eq = Equipment(code=code, name=name)
-                s.add(eq)
-                s.flush()
-
-            eq.no = no
-            eq.asset_name = asset_name or None
-            eq.name = name or eq.name
-            eq.alt_name = alt_name or None
-            eq.model = model or None
-
-            eq.size_mm = size_mm or None
-            eq.voltage = voltage or None
-            eq.power_kwh = power_kwh
-
-            eq.util_air = util_air or None
-            eq.util_coolant = util_coolant or None
-            eq.util_vac = util_vac or None
-            eq.util_other = util_other or None         # 유틸리티 기타
-            eq.purpose = purpose or None               # ★ 용도
-
-            eq.maker = maker or None
-            eq.maker_phone = maker_phone or None
-            eq.manufacture_date = manufacture_date
-
-            eq.in_year = in_year
-            eq.in_month = in_month
-            eq.in_day = in_day
-
-            eq.qty = qty
-            eq.purchase_price = purchase_price
-            eq.location = location or None
-            eq.note = note or None
-            eq.part = part or None
+            s.execute(_equipment_upsert_stmt(frame.columns), records)
+        n += len(records)
+    return n
 
 # ─────────────────────────────────────────────────────────────
 # 소모품 마스터 가져오기(합쳐 넣기)
-def import_consumables_xlsx(path:str) -> int:
+def import_consumables_xlsx(path:str, progress: Optional[ProgressFn] = None,
+                            chunk_size: int = IMPORT_CHUNK_ROWS) -> int:
     from services.consumable_service import upsert_consumable
-    df = pd.read_excel(path, dtype=str).fillna("")
     n = 0
-    for _, r in df.iterrows():
-        row = r.to_dict()
-        name = pick(row, ["품목","소모품명","항목"]) or ""
-        if not name.strip():
-            continue
-        spec = pick(row, ["규격","사양","Spec"]) or ""
-        stock_qty = parse_float(pick(row, ["현재고","재고","Stock"]))
-        min_qty = parse_float(pick(row, ["안전수량","최저재고","MinQty"])) or 0.0
-        note = pick(row, ["비고","메모"]) or ""
-
-        upsert_consumable(
-            name=name.strip(),
-            spec=spec.strip(),
-            min_qty=min_qty,
-            note=note.strip(),
-            stock_qty=stock_qty,
-        )
-        n += 1
+    for df in iter_excel_chunks(path, chunk_size, progress):
+        with session_scope() as s:   # 청크 단위 커밋
+            for row in df.to_dict("records"):
+                name = pick(row, ["품목","소모품명","항목"]) or ""
+                if not name.strip():
+                    continue
+                spec = pick(row, ["규격","사양","Spec"]) or ""
+                stock_qty = parse_float(pick(row, ["현재고","재고","Stock"]))
+                min_qty = parse_float(pick(row, ["안전수량","최저재고","MinQty"])) or 0.0
+                note = pick(row, ["비고","메모"]) or ""
+
+                upsert_consumable(
+                    name=name.strip(),
+                    spec=spec.strip(),
+                    min_qty=min_qty,
+                    note=note.strip(),
+                    stock_qty=stock_qty,
+                    session=s,
+                )
+                n += 1
     return n
 
 # ─────────────────────────────────────────────────────────────
-def import_consumable_txn_xlsx(path: str) -> int:
-    from services.consumable_service import upsert_consumable, adjust_stock
+# 소모품 입출고 이력 가져오기(멱등: 같은 파일을 다시 가져와도 재고가 두 번 반영되지 않음)
+_KEY_CHUNK = 500  # IN (...) 바인드 변수 한도 여유
 
-    df = pd.read_excel(path, dtype=str).fillna("")
-    n = 0
-    for _, r in df.iterrows():
-        row = r.to_dict()
-        name = (row.get("품목") or row.get("소모품명") or row.get("항목") or "").strip()
-        if not name:
-            continue
-        spec = (row.get("규격") or row.get("사양") or row.get("Spec") or "").strip()
-        io = (row.get("입출고") or "").strip()  # "입고" 또는 "출고"
-        qty = parse_float(row.get("수량"))
-        when = parse_datetime(row.get("거래일시")) or datetime.now()
-        reason = (row.get("사유") or "").strip() if io == "출고" else None
-        related_id = parse_int(row.get("관련 수리ID"))
-
-        c = upsert_consumable(name=name, spec=spec)  # 없으면 생성
-        if not qty or qty == 0:
-            continue
+def _txn_import_key(base: tuple, nth: int) -> str:
+    # base = (거래일시, 품목, 규격, 증감, 사유, 관련 수리ID), nth = 파일 안에서 같은 행의 n번째
+    raw = "\x1f".join("" if v is None else str(v) for v in (*base, nth))
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
 
-        if io == "입고":
-            adjust_stock(consumable_id=c.id, qty=+abs(qty), reason=None,
-                         related_repair_id=related_id, when=when)
-        else:
-            adjust_stock(consumable_id=c.id, qty=-abs(qty), reason=reason or None,
-                         related_repair_id=related_id, when=when)
-        n += 1
-    return n
+def _consumable_ids(s, items) -> dict[tuple[str, str], int]:
+    """(품목, 규격) → 소모품 ID. 없는 품목은 한 번에 생성(기존 품목의 속성은 건드리지 않음)."""
+    def lookup(names):
+        found = {}
+        for i in range(0, len(names), _KEY_CHUNK):
+            stmt = select(Consumable.id, Consumable.name, Consumable.spec).where(
+                Consumable.name.in_(names[i:i + _KEY_CHUNK])
+            ).order_by(Consumable.id)
+            for cid, name, spec in s.execute(stmt):
+                found.setdefault((name, spec or ""), int(cid))
+        return found
+
+    ids = lookup(sorted({name for name, _spec in items}))
+    missing = [k for k in items if k not in ids]
+    if missing:
+        s.execute(insert(Consumable.__table__),
+                  [{"name": name, "spec": spec or None, "stock_qty": 0.0} for name, spec in missing])
+        ids.update(lookup(sorted({name for name, _spec in missing})))
+    return ids
+
+def import_consumable_txn_xlsx(path: str, progress: Optional[ProgressFn] = None,
+                               chunk_size: int = IMPORT_CHUNK_ROWS) -> int:
+    """
+    입출고 이력 엑셀 → 원장 일괄 추가 + 재고 반영(한 트랜잭션).
+    - 행마다 (거래일시, 품목/규격, 수량, 사유, 관련 수리ID) 해시를 import_key 로 저장,
+      이미 원장에 있는 키는 건너뜀. 파일 안의 똑같은 행은 n번째 여부까지 키에 넣어 따로 반영
+    - 엑셀은 DB 잠금 없이 먼저 읽고, 원장 INSERT 한 번(executemany) + 재고 집계 UPDATE 한 번
+    - 반영 후 재고가 음수가 되는 품목이 있으면 ValueError → 전체 롤백
+    반환: 새로 반영한 행 수
+    """
+    from services.consumable_service import EPS
+
+    items: dict[tuple[str, str], None] = {}   # 순서 유지 집합
+    rows: list[tuple] = []
+    seen: Counter = Counter()
+    for df in iter_excel_chunks(path, chunk_size, progress):
+        for row in df.to_dict("records"):
+            name = (row.get("품목") or row.get("소모품명") or row.get("항목") or "").strip()
+            if not name:
+                continue
+            spec = (row.get("규격") or row.get("사양") or row.get("Spec") or "").strip()
+            items.setdefault((name, spec), None)   # 수량이 없어도 품목은 생성
+
+            qty = parse_float(row.get("수량"))
+            if not qty:
+                continue
+            io = (row.get("입출고") or "").strip()  # "입고" 또는 "출고"
+            delta = +abs(qty) if io == "입고" else -abs(qty)
+            when = parse_datetime(row.get("거래일시"))
+            reason = ((row.get("사유") or "").strip() if io == "출고" else "") or None
+            related_id = parse_int(row.get("관련 수리ID"))
+
+            # 거래일시가 비어 있으면 키에는 빈 값(가져온 시각은 매번 달라지므로)
+            base = (when.isoformat(sep=" ") if when else "", name, spec, delta, reason, related_id)
+            seen[base] += 1
+            rows.append((name, spec, delta, reason, related_id, when, _txn_import_key(base, seen[base])))
+    if not items:
+        return 0
+
+    now = datetime.now()   # 이번 가져오기 묶음 표식(created_at)
+    t = ConsumableTxn.__table__
+    c = Consumable.__table__
+    with session_scope() as s:
+        ids = _consumable_ids(s, list(items))
+
+        keys = [r[-1] for r in rows]
+        existing = set()
+        for i in range(0, len(keys), _KEY_CHUNK):
+            existing.update(s.execute(
+                select(t.c.import_key).where(t.c.import_key.in_(keys[i:i + _KEY_CHUNK]))
+            ).scalars())
+        todo = [r for r in rows if r[-1] not in existing]
+        if not todo:
+            return 0
+
+        # OR IGNORE: 동시에 같은 파일을 가져온 다른 사용자가 먼저 넣은 키는 조용히 건너뜀
+        s.execute(insert(t).prefix_with("OR IGNORE"), [
+            {"consumable_id": ids[(name, spec)], "qty": delta, "reason": reason,
+             "related_repair_id": related_id, "txn_time": when or now,
+             "created_at": now, "import_key": key}
+            for name, spec, delta, reason, related_id, when, key in todo
+        ])
+
+        # 재고: 이번 묶음으로 실제 들어간 원장 합계만큼 한 번에 반영(근사 0 스냅)
+        affected = sorted({ids[(r[0], r[1])] for r in todo})
+        added = (
+            select(func.coalesce(func.sum(t.c.qty), 0.0))
+            .where(t.c.consumable_id == c.c.id, t.c.created_at == now, t.c.import_key.isnot(None))
+            .scalar_subquery()
+        )
+        new_qty = func.coalesce(c.c.stock_qty, 0.0) + added
+        s.execute(
+            update(c).where(c.c.id.in_(affected))
+            .values(stock_qty=case((func.abs(new_qty) <= EPS, 0.0), else_=new_qty))
+        )
+
+        short = s.execute(
+            select(c.c.name, c.c.spec, c.c.stock_qty)
+            .where(c.c.id.in_(affected), c.c.stock_qty < -EPS)
+        ).first()
+        if short:
+            name, spec, qty = short
+            label = f"{name} ({spec})" if spec else name
+            raise ValueError(f"재고 부족: {label} 반영 후 재고 {float(qty)}")
+
+        return s.execute(
+            select(func.count()).select_from(t).where(t.c.created_at == now, t.c.import_key.isnot(None))
+        ).scalar() or 0
 
 # ─────────────────────────────────────────────────────────────
 def import_repairs_xlsx(path:str):
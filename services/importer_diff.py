@@ -1,20 +1,50 @@
 from __future__ import annotations
 from typing import List, Dict, Any, Optional, Tuple
-from datetime import datetime, date
+from collections import defaultdict
 
 import pandas as pd
 from PySide6.QtWidgets import QDialog
-from sqlalchemy import select
+from sqlalchemy import select, insert, update, bindparam
 
 from db import session_scope
 from models import Equipment
 
-# 기존 importer 유틸 재사용
-from services.importer import pick, parse_int, parse_float, parse_date
+# 기존 importer 유틸 재사용(별칭 해석/열 단위 형 변환)
+from services.importer import equipment_frame, read_excel_frame
 
 # 비어 있으면 변경을 허용하지 않는 필수 필드(Non-NULL 제약과 매칭)
 REQUIRED_NONEMPTY_FIELDS = {"name"}
 
+# 왕복 머지 대상 필드: (속성, 엑셀 머리글 후보, 형식)
+DIFF_FIELDS: List[Tuple[str, List[str], str]] = [
+    ("code",             ["설비번호","관리번호","설비코드","코드"], "str"),
+    ("asset_name",       ["자산명"], "str"),
+    ("name",             ["설비명","장비명"], "str"),          # ← 필수(비어 있으면 적용 안 함)
+    ("alt_name",         ["설비명 변경안","설비명변경안","변경안"], "str"),
+    ("model",            ["모델명","모델","Model","형식"], "str"),
+    ("size_mm",          ["크기(가로x세로x높이)mm","크기","규격(mm)"], "str"),
+    ("voltage",          ["전압"], "str"),
+    ("power_kwh",        ["전력용량(Kwh)","전력용량(kWh)","전력용량"], "float"),
+    ("util_air",         ["유틸리티 AIR","유틸리티AIR","AIR"], "str"),
+    ("util_coolant",     ["유틸리티 냉각수","냉각수"], "str"),
+    ("util_vac",         ["유틸리티 진공","진공"], "str"),
+    ("util_other",       ["유틸리티 기타","기타유틸리티","유틸리티"], "str"),   # 유틸리티 기타
+    ("purpose",          ["용도"], "str"),                                       # 용도
+    ("maker",            ["제조회사","제조사","Maker"], "str"),
+    ("maker_phone",      ["제조회사 대표 전화번호","대표 전화","제조사 전화"], "str"),
+    ("manufacture_date", ["제조일자","제작일자"], "date"),
+    ("in_year",          ["입고일(년)","입고년"], "int"),
+    ("in_month",         ["입고일(월)","입고월"], "int"),
+    ("in_day",           ["입고일(일)","입고일"], "int"),
+    ("qty",              ["수량"], "float"),
+    ("purchase_price",   ["구입가격","구매가격","가격"], "float"),
+    ("location",         ["설비위치","위치"], "str"),
+    ("note",             ["비고","메모","특이사항"], "str"),
+    ("part",             ["파트","부서","라인"], "str"),
+]
+_VALUE_FIELDS = [f for f, _a, _k in DIFF_FIELDS if f != "code"]
+_IN_CHUNK = 500  # SQLite 바인드 변수 한도 여유
+
 def _normalize_none(s: Optional[str]) -> Optional[str]:
     """빈 문자열을 None으로 정규화"""
     if s is None:
@@ -23,97 +53,90 @@ def _normalize_none(s: Optional[str]) -> Optional[str]:
         return None
     return s
 
-def _row_to_values(rowdict: dict) -> Tuple[str, Dict[str, Any]]:
-    """
-    엑셀 1행 → (코드, 필드 딕셔너리)
-    - 비어 있는 문자열은 None으로 정규화
-    """
-    code = (pick(rowdict, ["설비번호","관리번호","설비코드","코드"]) or "").strip()
-
-    d: Dict[str, Any] = {}
-    d["asset_name"] = _normalize_none(pick(rowdict, ["자산명"]))
-    d["name"] = _normalize_none(pick(rowdict, ["설비명","장비명"]))  # ← 필수(비어 있으면 적용 안 함)
-    d["alt_name"] = _normalize_none(pick(rowdict, ["설비명 변경안","설비명변경안","변경안"]))
-    d["model"] = _normalize_none(pick(rowdict, ["모델명","모델","Model","형식"]))
-
-    d["size_mm"] = _normalize_none(pick(rowdict, ["크기(가로x세로x높이)mm","크기","규격(mm)"]))
-    d["voltage"] = _normalize_none(pick(rowdict, ["전압"]))
-    d["power_kwh"] = parse_float(pick(rowdict, ["전력용량(Kwh)","전력용량(kWh)","전력용량"]))
-
-    d["util_air"] = _normalize_none(pick(rowdict, ["유틸리티 AIR","유틸리티AIR","AIR"]))
-    d["util_coolant"] = _normalize_none(pick(rowdict, ["유틸리티 냉각수","냉각수"]))
-    d["util_vac"] = _normalize_none(pick(rowdict, ["유틸리티 진공","진공"]))
-    d["util_other"] = _normalize_none(pick(rowdict, ["유틸리티 기타","기타유틸리티","유틸리티"]))  # 유틸리티 기타
-    d["purpose"] = _normalize_none(pick(rowdict, ["용도"]))                                        # 용도
-
-    d["maker"] = _normalize_none(pick(rowdict, ["제조회사","제조사","Maker"]))
-    d["maker_phone"] = _normalize_none(pick(rowdict, ["제조회사 대표 전화번호","대표 전화","제조사 전화"]))
-    d["manufacture_date"] = parse_date(pick(rowdict, ["제조일자","제작일자"]))
-
-    d["in_year"] = parse_int(pick(rowdict, ["입고일(년)","입고년"]))
-    d["in_month"] = parse_int(pick(rowdict, ["입고일(월)","입고월"]))  # ← 버그 수정(예전엔 월 파싱에 실수)
-    d["in_day"] = parse_int(pick(rowdict, ["입고일(일)","입고일"]))
-
-    d["qty"] = parse_float(pick(rowdict, ["수량"]))
-    d["purchase_price"] = parse_float(pick(rowdict, ["구입가격","구매가격","가격"]))
-    d["location"] = _normalize_none(pick(rowdict, ["설비위치","위치"]))
-    d["note"] = _normalize_none(pick(rowdict, ["비고","메모","특이사항"]))
-    d["part"] = _normalize_none(pick(rowdict, ["파트","부서","라인"]))
-
-    return code, d
-
-def _read_excel(path: str) -> List[Dict[str, Any]]:
-    df = pd.read_excel(path, dtype=object).fillna("")
-    return [dict(r) for _, r in df.iterrows()]
-
-def import_equipment_xlsx_diff(path: str, parent=None) -> tuple[int,int,int]:
+def _plain(series: pd.Series) -> pd.Series:
+    """결측(NaN/NA/NaT) → None, 값은 파이썬 기본형(object)"""
+    obj = series.astype(object)
+    return obj.where(series.notna(), None)
+
+def _falsy_to_none(series: pd.Series) -> pd.Series:
+    # 예전 비교식 (x or None) 과 같은 의미: None/""/0 은 모두 '값 없음'
+    obj = _plain(series)
+    empty = obj.isna() | (obj == "") | (obj == 0)
+    return obj.where(~empty, None)
+
+def _fetch_existing(s, codes: List[str]) -> pd.DataFrame:
+    cols = [Equipment.id, Equipment.code] + [getattr(Equipment, f) for f in _VALUE_FIELDS]
+    rows = []
+    for i in range(0, len(codes), _IN_CHUNK):
+        rows.extend(s.execute(select(*cols).where(Equipment.code.in_(codes[i:i + _IN_CHUNK]))).all())
+    # object 형으로 유지(NULL 섞인 정수 열이 float로 바뀌지 않게)
+    return pd.DataFrame(rows, columns=["id", "code"] + _VALUE_FIELDS, dtype=object)
+
+def _diff_frame(frame: pd.DataFrame, existing: pd.DataFrame) -> List[Dict[str, Any]]:
+    """엑셀 값과 DB 값을 필드 단위로 한꺼번에 비교해 변경 목록 생성(행 순서 → 필드 순서)."""
+    merged = frame.reset_index(drop=True).reset_index().merge(
+        existing, on="code", how="inner", suffixes=("", "__old")
+    )
+    if merged.empty:
+        return []
+    pieces = []
+    for order, f in enumerate(_VALUE_FIELDS):
+        new = _plain(merged[f])
+        if f == "name":
+            new = new.where(new != "", None)
+        old = _plain(merged[f + "__old"])
+        new_n, old_n = _falsy_to_none(new), _falsy_to_none(old)
+        same = (new_n.isna() & old_n.isna()) | (new_n == old_n)
+        changed = ~same
+        if f in REQUIRED_NONEMPTY_FIELDS:
+            changed &= new.notna()        # ★ 필수 필드는 비어 있으면 '변경하지 않음'
+        if not changed.any():
+            continue
+        pieces.append(pd.DataFrame({
+            "_row": merged.loc[changed, "index"],
+            "_order": order,
+            "equipment_id": merged.loc[changed, "id"].astype(int),
+            "code": merged.loc[changed, "code"],
+            "field": f,
+            "old": old[changed],
+            "new": new[changed],
+        }))
+    if not pieces:
+        return []
+    out = pd.concat(pieces).sort_values(["_row", "_order"], kind="stable")
+    out = out.drop(columns=["_row", "_order"]).astype(object)
+    out = out.where(out.notna(), None)
+    recs = out.to_dict("records")
+    for d in recs:
+        d["equipment_id"] = int(d["equipment_id"])
+    return recs
+
+def import_equipment_xlsx_diff(path: str, parent=None, progress=None) -> tuple[int,int,int]:
     """
     엑셀 왕복 머지(미리보기)
+    - 참조된 설비번호를 한 번에 조회 → 필드 단위 일괄 비교로 변경 목록 작성
+    - 신규는 한 번의 일괄 INSERT, 선택된 변경은 필드별 executemany UPDATE
+    - progress(done, total): 엑셀 읽기 진행(청크 스트리밍)
     Returns: (created_count, diff_count, applied_count)
     """
-    rows = _read_excel(path)
-    created = 0
-    diffs: List[Dict[str, Any]] = []
+    df = read_excel_frame(path, progress)
+    frame = equipment_frame(df, DIFF_FIELDS)
+    if frame.empty:
+        return (0, 0, 0)
 
     with session_scope() as s:
-        for row in rows:
-            code, vals = _row_to_values(row)
-            if not code:
-                continue
-
-            eq = s.execute(select(Equipment).where(Equipment.code==code)).scalars().first()
-            if not eq:
-                # 신규는 name이 비어 있으면 코드로 대체
-                new_name = (vals.get("name") or code)
-                eq = Equipment(code=code, name=new_name)
-                s.add(eq); s.flush()
-                # 선택적으로 나머지 필드 바로 저장(신규는 충돌 없음)
-                for k, v in vals.items():
-                    if k == "name":
-                        setattr(eq, "name", new_name)
-                    elif k != "code":
-                        setattr(eq, k, v)
-                created += 1
-                continue
-
-            # 기존 설비는 변경점만 수집
-            for field, newval in vals.items():
-                if field == "code":
-                    continue
-                # ★ 필수 필드는 비어 있으면 '변경하지 않음'
-                if field in REQUIRED_NONEMPTY_FIELDS and _normalize_none(newval) is None:
-                    continue
-                oldval = getattr(eq, field, None)
-                if (oldval or None) == (newval or None):
-                    continue
-                diffs.append({
-                    "equipment_id": eq.id,
-                    "code": code,
-                    "field": field,
-                    "old": oldval,
-                    "new": newval,
-                })
-        s.commit()  # 신규 생성 커밋
+        existing = _fetch_existing(s, frame["code"].tolist())
+
+        # 신규: name이 비어 있으면 코드로 대체, 나머지 필드 바로 저장(충돌 없음)
+        new_rows = frame[~frame["code"].isin(existing["code"])].copy()
+        created = len(new_rows)
+        if created:
+            new_rows["name"] = new_rows["name"].where(new_rows["name"] != "", new_rows["code"])
+            recs = new_rows.astype(object).where(new_rows.notna(), None).to_dict("records")
+            s.execute(insert(Equipment.__table__), recs)
+
+        # 기존 설비는 변경점만 수집
+        diffs = _diff_frame(frame, existing)
 
     diff_count = len(diffs)
     if diff_count == 0:
@@ -130,32 +153,26 @@ def import_equipment_xlsx_diff(path: str, parent=None) -> tuple[int,int,int]:
         selected = diffs
 
     # ★ 적용 전: 필수필드 비우는 변경 제거
-    filtered: List[Dict[str, Any]] = []
-    for d in selected:
-        if d["field"] in REQUIRED_NONEMPTY_FIELDS and _normalize_none(d["new"]) is None:
-            # 설비명 같은 필수 필드를 비우려는 변경은 무시
-            continue
-        filtered.append(d)
+    filtered: List[Dict[str, Any]] = [
+        d for d in selected
+        if not (d["field"] in REQUIRED_NONEMPTY_FIELDS and _normalize_none(d["new"]) is None)
+    ]
 
     # 선택 사항이 모두 필터링되면 종료
     if not filtered:
         return (created, diff_count, 0)
 
-    # 적용
-    from collections import defaultdict
-    by_id: Dict[int, List[Dict[str, Any]]] = defaultdict(list)
+    # 적용: 필드별로 묶어 UPDATE ... WHERE id=? 를 executemany
+    by_field: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
     for d in filtered:
-        by_id[int(d["equipment_id"])].append(d)
+        by_field[d["field"]].append({"_id": int(d["equipment_id"]), "_v": d["new"]})
 
+    t = Equipment.__table__
     applied = 0
     with session_scope() as s:
-        for eid, changes in by_id.items():
-            eq = s.get(Equipment, int(eid))
-            if not eq:
-                continue
-            for d in changes:
-                setattr(eq, d["field"], d["new"])
-                applied += 1
-        s.commit()
+        for field, params in by_field.items():
+            stmt = update(t).where(t.c.id == bindparam("_id")).values({field: bindparam("_v")})
+            s.connection().execute(stmt, params)
+            applied += len(params)
 
     return (created, diff_count, applied)
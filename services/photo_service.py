@@ -5,6 +5,7 @@ from typing import List, Optional
 
 import settings
 from db import session_scope
+from services.remote import remote_op
 from models import Photo
 
 # ─────────────────────────────────────────────────────────
@@ -171,6 +172,14 @@ def replace_main_photo(equipment_id: int, equipment_code: str, source_path: str)
     rel_path = os.path.join(code, os.path.basename(dst_abs))  # DB에는 상대경로 저장
 
     # 3) DB 반영
+    set_main_photo_record(equipment_id, code, rel_path)
+
+    st = os.stat(dst_abs)
+    return PhotoInfo(os.path.basename(dst_abs), dst_abs, st.st_size, st.st_mtime, False)
+
+@remote_op("write")
+def set_main_photo_record(equipment_id: int, code: str, rel_path: str) -> None:
+    """설비의 photo 레코드를 모두 지우고 대표 사진 1건(상대경로)만 저장."""
     with session_scope() as s:
         # 기존 레코드 삭제
         try:
@@ -186,6 +195,3 @@ def replace_main_photo(equipment_id: int, equipment_code: str, source_path: str)
             file_path=rel_path,
         )
         s.add(rec)
-
-    st = os.stat(dst_abs)
-    return PhotoInfo(os.path.basename(dst_abs), dst_abs, st.st_size, st.st_mtime, False)
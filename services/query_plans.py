@@ -0,0 +1,109 @@
+from __future__ import annotations
+import sys
+from typing import List, Optional, Tuple
+
+from sqlalchemy import text
+
+import db
+
+# ─────────────────────────────────────────────────────────
+# 자주 쓰는 조회의 실행 계획(EXPLAIN QUERY PLAN) 점검
+# - 인덱스 없이 표 전체를 훑거나(SCAN 표) 정렬용 임시 B-tree를 만들면 문제로 보고
+#   (SCAN ... USING INDEX 는 색인 순서대로 읽는 것이라 허용 — 설비대장 전체 목록 등)
+# - 실행: python -m services.query_plans   → 문제가 있으면 종료 코드 1
+#   스키마/인덱스(db.MIGRATIONS)나 아래 쿼리의 원본을 바꿀 때 함께 확인
+
+# (이름, SQL, 파라미터) — 원본 쿼리와 같은 WHERE/ORDER BY 모양으로 유지
+HOT_QUERIES: List[Tuple[str, str, dict]] = [
+    (
+        "repair_service.list_repairs",
+        "SELECT * FROM repair WHERE equipment_id = :eid ORDER BY work_date DESC, id DESC",
+        {"eid": 1},
+    ),
+    (
+        "export_history_card.prefetch_cards(연도 필터)",
+        "SELECT equipment_id, work_date, kind, title, detail, vendor, work_hours FROM repair "
+        "WHERE equipment_id IN (:e1, :e2) AND work_date >= :d0 AND work_date <= :d1 "
+        "ORDER BY equipment_id, work_date ASC, id ASC",
+        {"e1": 1, "e2": 2, "d0": "2025-01-01", "d1": "2025-12-31"},
+    ),
+    (
+        "export_history_card.prefetch_cards(대표 사진)",
+        "SELECT equipment_id, min(id) FROM photo WHERE equipment_id IN (:e1, :e2) GROUP BY equipment_id",
+        {"e1": 1, "e2": 2},
+    ),
+    (
+        "ChangeLogDialog._fetch_rows",
+        "SELECT * FROM change_log WHERE module = :m AND record_id = :rid ORDER BY changed_at DESC",
+        {"m": "equipment", "rid": 1},
+    ),
+    (
+        "equipment_service.list_equipment",
+        f"SELECT * FROM equipment WHERE {db.EQUIPMENT_ACTIVE_WHERE} ORDER BY code",
+        {},
+    ),
+    (
+        "accessory_service.list_accessories",
+        "SELECT * FROM equipment_accessory WHERE equipment_id = :eid",
+        {"eid": 1},
+    ),
+    (
+        "change_feed.fetch_changes",
+        "SELECT seq, tbl, row_id, parent_id, op FROM change_feed WHERE seq > :s ORDER BY seq LIMIT 500",
+        {"s": 0},
+    ),
+]
+
+
+def _plan_problems(details: List[str]) -> List[str]:
+    out = []
+    for d in details:
+        if "TEMP B-TREE" in d:
+            out.append(d)
+        elif d.startswith("SCAN ") and " USING " not in d and "VIRTUAL TABLE" not in d:
+            out.append(d)   # 인덱스 없는 전체 스캔
+    return out
+
+
+def explain(conn, sql: str, params: Optional[dict] = None) -> List[str]:
+    """EXPLAIN QUERY PLAN의 detail 문자열 목록."""
+    return [str(r[3]) for r in conn.execute(text("EXPLAIN QUERY PLAN " + sql), params or {}).all()]
+
+
+def check_query_plans(conn=None) -> List[Tuple[str, List[str]]]:
+    """문제 있는 쿼리만 (이름, 문제 계획 줄들) 목록으로. 빈 목록이면 정상."""
+    if conn is None:
+        with db.engine.connect() as c:
+            return check_query_plans(c)
+    bad = []
+    for name, sql, params in HOT_QUERIES:
+        try:
+            problems = _plan_problems(explain(conn, sql, params))
+        except Exception as e:
+            problems = [f"실행 계획 조회 실패: {e}"]   # 테이블/컬럼 없음 등
+        if problems:
+            bad.append((name, problems))
+    return bad
+
+
+def main() -> int:
+    db.ensure_db()
+    bad = check_query_plans()
+    with db.engine.connect() as conn:
+        for name, sql, params in HOT_QUERIES:
+            status = "문제" if any(n == name for n, _ in bad) else "정상"
+            print(f"[{status}] {name}")
+            try:
+                for d in explain(conn, sql, params):
+                    print(f"    {d}")
+            except Exception as e:
+                print(f"    {e}")
+    if bad:
+        print(f"\n실행 계획 문제 {len(bad)}건")
+        return 1
+    print("\n모든 쿼리가 인덱스를 사용합니다.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,12 +2,15 @@ from __future__ import annotations
 from typing import List, Optional
 from sqlalchemy import text
 from db import session_scope
+from services.remote import remote_op
 
+@remote_op("read")
 def list_reason_codes() -> List[dict]:
     with session_scope() as s:
         rows = s.execute(text("SELECT id, name, favorite FROM reason_code ORDER BY favorite DESC, name ASC")).mappings().all()
         return [dict(r) for r in rows]
 
+@remote_op("write")
 def add_reason_code(name: str, favorite: bool = False) -> int:
     name = (name or "").strip()
     if not name:
@@ -17,6 +20,7 @@ def add_reason_code(name: str, favorite: bool = False) -> int:
         rid = s.execute(text("SELECT last_insert_rowid()")).scalar()
         return int(rid or 0)
 
+@remote_op("write")
 def toggle_favorite(reason_id: int) -> None:
     with session_scope() as s:
         s.execute(text("""
@@ -25,6 +29,7 @@ def toggle_favorite(reason_id: int) -> None:
             WHERE id = :i
         """), {"i": int(reason_id)})
 
+@remote_op("write")
 def delete_reason_code(reason_id: int) -> None:
     with session_scope() as s:
         s.execute(text("DELETE FROM reason_code WHERE id=:i"), {"i": int(reason_id)})
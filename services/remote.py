@@ -0,0 +1,234 @@
+from __future__ import annotations
+import functools
+import itertools
+import json
+import logging
+import socket
+import threading
+from dataclasses import is_dataclass, fields
+from datetime import date, datetime
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, Optional, Tuple
+
+log = logging.getLogger(__name__)
+
+# ─────────────────────────────────────────────────────────
+# 원격 DB 백엔드(선택: settings "db_backend" = "server")
+# - 서비스 함수에 @remote_op 를 붙이면 등록부(OPERATIONS)에 올라감
+# - 원격 모드면 호출을 DB 서비스 프로세스(services/db_server.py)로 보내고 결과를 받아 옴
+#   (호출부·UI는 그대로 — 같은 함수를 부르면 됨)
+# - 서버 프로세스 안에서는 SERVER_MODE=True → 같은 함수가 로컬 DB에서 실행
+# - 프로토콜: 요청/응답 모두 UTF-8 JSON 한 줄(JSON lines)
+#     → {"id": 1, "op": "services.equipment_service.list_equipment", "args": [...], "kwargs": {...},
+#        "user": [이름, 권한], "token": "..."}
+#   token: settings "db_server_token"(공유 비밀값) — 서버에 설정돼 있으면 맞아야 실행
+#     ← {"id": 1, "ok": true, "result": ...} / {"id": 1, "ok": false, "error": "ValueError", "message": "..."}
+#   날짜·DTO 등은 {"__t": ...} 표식으로 감싸서 전달(encode_value/decode_value)
+
+SERVER_MODE = False
+DEFAULT_ADDRESS = "127.0.0.1:8765"
+_CONNECT_TIMEOUT = 5.0
+_CALL_TIMEOUT = 120.0
+
+OPERATIONS: Dict[str, Tuple[Callable[..., Any], str]] = {}   # op 이름 → (원본 함수, "read"/"write")
+
+
+class RemoteError(RuntimeError):
+    """서버에서 난 예외 중 같은 타입으로 되살릴 수 없는 것."""
+
+
+# 서버 예외를 클라이언트에서 같은 타입으로 다시 올림(메시지박스 문구 유지)
+_ERROR_TYPES = {
+    e.__name__: e for e in (
+        ValueError, KeyError, LookupError, TypeError, PermissionError,
+        FileNotFoundError, RuntimeError,
+    )
+}
+
+
+# ─────────────────────────────────────────────────────────
+# 값 변환(JSON에 없는 타입)
+def encode_value(o: Any) -> Any:
+    if o is None or isinstance(o, (bool, int, float, str)):
+        return o
+    if isinstance(o, datetime):
+        return {"__t": "dt", "v": o.isoformat()}
+    if isinstance(o, date):
+        return {"__t": "d", "v": o.isoformat()}
+    if isinstance(o, (list, tuple, set, frozenset)):
+        return [encode_value(x) for x in o]
+    if isinstance(o, dict):
+        if all(isinstance(k, str) for k in o):
+            return {k: encode_value(v) for k, v in o.items()}
+        return {"__t": "map", "v": [[encode_value(k), encode_value(v)] for k, v in o.items()]}
+    if isinstance(o, SimpleNamespace):
+        return {"__t": "ns", "v": {k: encode_value(v) for k, v in vars(o).items()}}
+    if is_dataclass(o) and not isinstance(o, type):
+        return {"__t": "ns", "v": {f.name: encode_value(getattr(o, f.name)) for f in fields(o)}}
+    if hasattr(o, "__table__"):
+        # ORM 객체 → 이미 로드된 컬럼 값만(분리된 객체에서 지연 로드하지 않음)
+        from sqlalchemy import inspect as sa_inspect
+        st = sa_inspect(o)
+        cols = {a.key for a in st.mapper.column_attrs}
+        return {"__t": "ns", "v": {k: encode_value(v) for k, v in st.dict.items() if k in cols}}
+    return repr(o)
+
+
+def decode_value(o: Any) -> Any:
+    if isinstance(o, list):
+        return [decode_value(x) for x in o]
+    if isinstance(o, dict):
+        t = o.get("__t")
+        if t == "dt":
+            return datetime.fromisoformat(o["v"])
+        if t == "d":
+            return date.fromisoformat(o["v"])
+        if t == "ns":
+            return SimpleNamespace(**{k: decode_value(v) for k, v in o["v"].items()})
+        if t == "map":
+            return {decode_value(k): decode_value(v) for k, v in o["v"]}
+        return {k: decode_value(v) for k, v in o.items()}
+    return o
+
+
+def dumps_line(obj: Dict[str, Any]) -> bytes:
+    return (json.dumps(obj, ensure_ascii=False, separators=(",", ":")) + "\n").encode("utf-8")
+
+
+def error_from_response(resp: Dict[str, Any]) -> BaseException:
+    cls = _ERROR_TYPES.get(resp.get("error") or "")
+    msg = resp.get("message") or ""
+    if cls is None:
+        return RemoteError(f"{resp.get('error')}: {msg}")
+    return cls(msg)
+
+
+# ─────────────────────────────────────────────────────────
+# 클라이언트(스레드마다 연결 1개 — 읽기 풀/쓰기 스레드가 서로 기다리지 않게)
+def parse_address(address: str):
+    address = (address or DEFAULT_ADDRESS).strip()
+    if address.startswith("unix:"):
+        return socket.AF_UNIX, address[5:]
+    host, _, port = address.rpartition(":")
+    return socket.AF_INET, (host or "127.0.0.1", int(port))
+
+
+class RemoteClient:
+    def __init__(self, address: str, token: str = ""):
+        self.address = address
+        self.token = token or ""
+        self._local = threading.local()
+        self._ids = itertools.count(1)
+
+    def _stream(self):
+        f = getattr(self._local, "f", None)
+        if f is None:
+            family, addr = parse_address(self.address)
+            sock = socket.socket(family, socket.SOCK_STREAM)
+            sock.settimeout(_CONNECT_TIMEOUT)
+            sock.connect(addr)
+            sock.settimeout(_CALL_TIMEOUT)
+            f = sock.makefile("rwb")
+            self._local.sock, self._local.f = sock, f
+        return f
+
+    def _drop(self) -> None:
+        for name in ("f", "sock"):
+            obj = getattr(self._local, name, None)
+            if obj is not None:
+                try:
+                    obj.close()
+                except Exception:
+                    pass
+            setattr(self._local, name, None)
+
+    def call(self, op: str, args=(), kwargs=None, *, retry: bool = False) -> Any:
+        """op 실행 → 결과. retry=True(조회)면 끊긴 연결을 한 번 다시 맺어 재시도."""
+        req = {"id": next(self._ids), "op": op, "args": encode_value(list(args)),
+               "kwargs": encode_value(kwargs or {}), "user": _current_user()}
+        if self.token:
+            req["token"] = self.token
+        for attempt in (0, 1):
+            try:
+                f = self._stream()
+                f.write(dumps_line(req))
+                f.flush()
+                line = f.readline()
+                if not line:
+                    raise ConnectionError("DB 서버 연결이 끊겼습니다.")
+                break
+            except OSError:
+                self._drop()
+                if attempt or not retry:
+                    raise
+        resp = json.loads(line)
+        if resp.get("ok"):
+            return decode_value(resp.get("result"))
+        raise error_from_response(resp)
+
+
+def _current_user():
+    try:
+        import user_session
+        u = user_session.get_current_user()
+        return [u.name, u.role] if u else None
+    except Exception:
+        return None
+
+
+_client: Optional[RemoteClient] = None
+_client_lock = threading.Lock()
+
+
+def backend_address() -> Optional[str]:
+    """원격 모드면 서버 주소, 아니면 None(서버 프로세스 자신은 항상 None)."""
+    if SERVER_MODE:
+        return None
+    try:
+        import settings
+        if settings.get_db_backend() != "server":
+            return None
+        return settings.get_db_server_address()
+    except Exception:
+        return None
+
+
+def is_remote() -> bool:
+    return backend_address() is not None
+
+
+def get_client() -> Optional[RemoteClient]:
+    global _client
+    address = backend_address()
+    if address is None:
+        return None
+    try:
+        import settings
+        token = settings.get_db_server_token()
+    except Exception:
+        token = ""
+    with _client_lock:
+        if _client is None or _client.address != address or _client.token != token:
+            _client = RemoteClient(address, token)
+        return _client
+
+
+# ─────────────────────────────────────────────────────────
+# 서비스 함수 등록
+def remote_op(kind: str = "read"):
+    """
+    서비스 함수를 원격 호출 가능하게 등록.
+    kind="write"면 서버에서 단일 쓰기 스레드로 실행. session= 을 넘긴 호출(트랜잭션 합류)은 항상 로컬.
+    """
+    def deco(fn):
+        name = f"{fn.__module__}.{fn.__name__}"
+        OPERATIONS[name] = (fn, kind)
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            client = get_client() if kwargs.get("session") is None else None
+            if client is None:
+                return fn(*args, **kwargs)
+            return client.call(name, args, kwargs, retry=(kind == "read"))
+        return wrapper
+    return deco
@@ -5,9 +5,10 @@ from types import SimpleNamespace
 from sqlalchemy import select, delete
 from sqlalchemy.orm import selectinload
 
-from db import session_scope
+from db import session_scope, read_session_scope
+from services.remote import remote_op
 from models import Repair, RepairItem, Equipment, ChangeLog
-from services.consumable_service import adjust_stock
+from services.consumable_service import apply_stock_deltas
 
 def _current_user() -> str | None:
     try:
@@ -19,8 +20,9 @@ def _current_user() -> str | None:
 
 # ─────────────────────────────────────────────────────────────
 # 조회(세션 안전: DTO 반환)
+@remote_op("read")
 def list_repairs(equipment_id: int) -> list[SimpleNamespace]:
-    with session_scope() as s:
+    with read_session_scope() as s:
         rows = (
             s.execute(
                 select(Repair)
@@ -54,6 +56,7 @@ def list_repairs(equipment_id: int) -> list[SimpleNamespace]:
             ))
         return out
 
+@remote_op("read")
 def get_repair(rid: int) -> Optional[SimpleNamespace]:
     with session_scope() as s:
         r = (
@@ -90,6 +93,7 @@ def get_repair(rid: int) -> Optional[SimpleNamespace]:
 
 # ─────────────────────────────────────────────────────────────
 # 입력/수정 (반드시 ID(int) 반환)
+@remote_op("write")
 def add_repair(
     equipment_id: int,
     work_date,
@@ -132,7 +136,7 @@ def add_repair(
 
         for cid, qty in new_map.items():
             s.add(RepairItem(repair_id=r.id, consumable_id=cid, qty=qty))
-            adjust_stock(cid, qty=-qty, reason="수리 사용", related_repair_id=r.id)
+        apply_stock_deltas(s, [(cid, -qty, "수리 사용", r.id) for cid, qty in new_map.items()])
 
         # ChangeLog (create)
         user = _current_user()
@@ -149,6 +153,7 @@ def add_repair(
 
         return int(r.id)
 
+@remote_op("write")
 def update_repair(
     rid: int,
     *,
@@ -197,18 +202,17 @@ def update_repair(
                 if qty <= 0: continue
                 new_map[cid] = new_map.get(cid, 0.0) + qty
 
-            # 차이만큼 재고 가감
-            all_keys = set(old_map) | set(new_map)
-            for cid in all_keys:
-                before_qty = old_map.get(cid, 0.0)
-                after_qty  = new_map.get(cid, 0.0)
-                diff   = after_qty - before_qty
+            # 차이만큼 재고 가감(같은 세션에서 일괄)
+            deltas = []
+            for cid in sorted(set(old_map) | set(new_map)):
+                diff = new_map.get(cid, 0.0) - old_map.get(cid, 0.0)
                 if abs(diff) <= 1e-9:
                     continue
                 if diff > 0:
-                    adjust_stock(cid, qty=-abs(diff), reason="수리 사용", related_repair_id=r.id)
+                    deltas.append((cid, -abs(diff), "수리 사용", r.id))
                 else:
-                    adjust_stock(cid, qty=+abs(diff), reason=None, related_repair_id=r.id)
+                    deltas.append((cid, +abs(diff), None, r.id))
+            apply_stock_deltas(s, deltas)
 
             # 항목 재기록
             s.execute(delete(RepairItem).where(RepairItem.repair_id == r.id))
@@ -237,6 +241,7 @@ def update_repair(
 
 # ─────────────────────────────────────────────────────────────
 # 삭제 (하드 삭제 + 사용 소모품 재고 복원)
+@remote_op("write")
 def delete_repair(rid: int, *, reverse_stock: bool = True) -> int:
     """
     - Repair / RepairItem / RepairPhoto 를 **하드 삭제**합니다.
@@ -257,18 +262,17 @@ def delete_repair(rid: int, *, reverse_stock: bool = True) -> int:
             raise ValueError(f"repair_id {rid} not found")
 
         if reverse_stock:
-            for it in (r.items or []):
-                try:
-                    adjust_stock(int(it.consumable_id), qty=+float(it.qty or 0.0),
-                                 reason="수리 내역 삭제 복원", related_repair_id=rid)
-                except Exception:
-                    pass
+            apply_stock_deltas(s, [
+                (int(it.consumable_id), +float(it.qty or 0.0), "수리 내역 삭제 복원", rid)
+                for it in (r.items or [])
+            ])
 
         s.delete(r)
         user = _current_user()
         s.add(ChangeLog(module="repair", record_id=int(rid), field="delete", before=None, after="deleted", user=user))
         return int(rid)
 
+@remote_op("write")
 def delete_repairs_bulk(rids: Iterable[int], *, reverse_stock: bool = True) -> int:
     """
     여러 건 삭제. 개수 반환.
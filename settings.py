@@ -1,8 +1,11 @@
 from __future__ import annotations
-import os, json
+import os, json, logging, tempfile, threading, time
+from contextlib import contextmanager
 from pathlib import Path
 from typing import Dict, Any, List
 
+log = logging.getLogger(__name__)
+
 # 설정 파일 경로
 _SETTINGS_PATH = os.path.abspath("./app_settings.json")
 
@@ -31,17 +34,49 @@ _DEFAULTS: Dict[str, Any] = {
     "db_dir": r"\\192.168.2.4\new생산팀\생산기술파트\db",
     "db_file": "app.db",
     "db_url": "",  # 예) r"sqlite://///192.168.2.4/new생산팀/생산기술파트/db/app.db"
+    # "local": DB 파일 직접 열기 / "server": DB 서비스 프로세스(services/db_server.py)에 접속
+    "db_backend": "local",
+    "db_server": "127.0.0.1:8765",   # host:port 또는 unix:/경로
+    "db_server_token": "",           # DB 서비스 공유 비밀값(서버·클라이언트 같게). 다른 PC에서 접속하면 필수
 
     # ── 사진 저장 루트(신규) ──
     # 서버 공유 폴더 아래 photos 디렉터리에 보관
     "photo_root_dir": r"\\192.168.2.4\new생산팀\생산기술파트\photos",
     # (선택) 휴지통 루트(비우면 photo_root_dir\_trash 사용)
     "photo_trash_dir": "",
+
+    # ── 사진 축소본 캐시(로컬 PC) ──
+    "image_cache_dir": "",        # 비우면 ./cache/images
+    "image_cache_max_mb": 256,    # 넘으면 오래 안 쓴 것부터 삭제
+
+    # ── 다른 PC 변경 감지(change feed) 폴링 간격 ──
+    "change_poll_ms": 3000,       # 0이면 끔(검색 버튼으로만 새로고침)
+
+    # ── 로컬 읽기 복제본(목록 조회를 로컬 복사본에서) ──
+    "read_replica": False,
+    "replica_dir": "",            # 비우면 ./cache/replica
 }
 
 # ─────────────────────────────────────────────
-# 로드/세이브 공용 함수
-def _load() -> Dict[str, Any]:
+# 로드/세이브 공용 함수 (프로세스 내 캐시)
+# - 파일 (mtime, size)가 바뀔 때만 다시 읽음, 확인도 _RECHECK_SEC 간격으로만
+# - 저장은 임시파일 → os.replace 로 원자적 교체
+# - batch() 안의 변경은 블록 종료 시 한 번만 기록
+_RECHECK_SEC = 1.0
+
+_cache: Dict[str, Any] = {"sig": None, "data": None, "checked": 0.0}
+_lock = threading.RLock()
+_batch_depth = 0
+_dirty = False
+
+def _file_sig():
+    try:
+        st = os.stat(_SETTINGS_PATH)
+        return (st.st_mtime_ns, st.st_size)
+    except OSError:
+        return None
+
+def _read_file() -> Dict[str, Any]:
     if not os.path.isfile(_SETTINGS_PATH):
         return dict(_DEFAULTS)
     try:
@@ -52,12 +87,76 @@ def _load() -> Dict[str, Any]:
     out = dict(_DEFAULTS); out.update(data if isinstance(data, dict) else {})
     return out
 
-def _save(data: Dict[str, Any]) -> None:
+def _load() -> Dict[str, Any]:
+    with _lock:
+        now = time.monotonic()
+        if _cache["data"] is None or (_batch_depth == 0 and now - _cache["checked"] >= _RECHECK_SEC):
+            sig = _file_sig()
+            if _cache["data"] is None or sig != _cache["sig"]:
+                _cache["data"] = _read_file()
+                _cache["sig"] = sig
+            _cache["checked"] = now
+        return dict(_cache["data"])  # 호출자가 고쳐도 캐시는 안전(얕은 복사)
+
+def _write_atomic(data: Dict[str, Any]) -> None:
+    d = os.path.dirname(_SETTINGS_PATH) or "."
+    fd, tmp = tempfile.mkstemp(prefix=".app_settings.", suffix=".tmp", dir=d)
     try:
-        with open(_SETTINGS_PATH, "w", encoding="utf-8") as f:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
             json.dump(data, f, ensure_ascii=False, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, _SETTINGS_PATH)
     except Exception:
-        pass
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+
+def _save(data: Dict[str, Any]) -> None:
+    global _dirty
+    with _lock:
+        _cache["data"] = dict(data)
+        if _batch_depth > 0:
+            _dirty = True
+            return
+        try:
+            _write_atomic(_cache["data"])
+        except Exception as e:
+            # 저장 실패 → 캐시를 버려 다음 조회 때 파일(실제 저장된 값)을 다시 읽음
+            log.warning("설정 저장 실패(%s): %s", _SETTINGS_PATH, e)
+            _cache["data"] = None
+            return
+        _cache["sig"] = _file_sig()
+        _cache["checked"] = time.monotonic()
+
+@contextmanager
+def batch():
+    """
+    여러 설정 변경을 한 번의 파일 쓰기로 묶음.
+        with settings.batch():
+            settings.set_db_dir(...); settings.set_db_file(...)
+    잠금은 깊이 증감과 마지막 저장 때만 잡음(블록 안의 대화상자 등이 다른 스레드의 조회를 막지 않도록).
+    """
+    global _batch_depth, _dirty
+    with _lock:
+        _load()
+        _batch_depth += 1
+    try:
+        yield
+    finally:
+        with _lock:
+            _batch_depth -= 1
+            if _batch_depth == 0 and _dirty:
+                _dirty = False
+                if _cache["data"] is not None:
+                    _save(_cache["data"])
+
+def reload() -> None:
+    """다음 조회 시 파일을 강제로 다시 읽게 함."""
+    with _lock:
+        _cache["data"] = None
 
 # ─────────────────────────────────────────────
 # 저장 경로(내보내기 관련)
@@ -125,6 +224,24 @@ def get_db_url() -> str:
 def set_db_url(url: str) -> None:
     d = _load(); d["db_url"] = (url or "").strip(); _save(d)
 
+def get_db_backend() -> str:
+    return (_load().get("db_backend") or "local").strip().lower()
+
+def set_db_backend(backend: str) -> None:
+    d = _load(); d["db_backend"] = (backend or "local").strip().lower(); _save(d)
+
+def get_db_server_address() -> str:
+    return (_load().get("db_server") or "127.0.0.1:8765").strip()
+
+def set_db_server_address(address: str) -> None:
+    d = _load(); d["db_server"] = (address or "").strip(); _save(d)
+
+def get_db_server_token() -> str:
+    return (_load().get("db_server_token") or "").strip()
+
+def set_db_server_token(token: str) -> None:
+    d = _load(); d["db_server_token"] = (token or "").strip(); _save(d)
+
 def get_db_path() -> str:
     d = _load()
     dirp = d.get("db_dir") or r"\\192.168.2.4\new생산팀\생산기술파트\db"
@@ -148,3 +265,38 @@ def get_photo_trash_dir() -> str:
 
 def set_photo_trash_dir(path: str) -> None:
     d = _load(); d["photo_trash_dir"] = path or ""; _save(d)
+
+# ─────────────────────────────────────────────
+# 사진 축소본 캐시(로컬)
+def get_image_cache_dir() -> str:
+    return _load().get("image_cache_dir") or os.path.abspath("./cache/images")
+
+def set_image_cache_dir(path: str) -> None:
+    d = _load(); d["image_cache_dir"] = path or ""; _save(d)
+
+def get_image_cache_max_bytes() -> int:
+    try:
+        mb = int(_load().get("image_cache_max_mb") or 256)
+    except Exception:
+        mb = 256
+    return max(16, mb) * 1024 * 1024
+
+# ─────────────────────────────────────────────
+# 다른 PC 변경 감지 폴링
+def get_change_poll_ms() -> int:
+    try:
+        ms = int(_load().get("change_poll_ms", 3000))
+    except Exception:
+        ms = 3000
+    return 0 if ms <= 0 else max(500, ms)
+
+# ─────────────────────────────────────────────
+# 로컬 읽기 복제본
+def get_read_replica_enabled() -> bool:
+    return bool(_load().get("read_replica", False))
+
+def set_read_replica_enabled(on: bool) -> None:
+    d = _load(); d["read_replica"] = bool(on); _save(d)
+
+def get_replica_dir() -> str:
+    return _load().get("replica_dir") or os.path.abspath("./cache/replica")
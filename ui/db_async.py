@@ -0,0 +1,225 @@
+from __future__ import annotations
+import logging
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable, Optional
+
+from PySide6.QtCore import QObject, Signal, QCoreApplication, QRunnable, QThreadPool, QTimer
+
+import db
+from services.db_writer import get_writer
+from services.change_feed import ChangeFeedPoller, prune_change_feed
+
+
+# ─────────────────────────────────────────────────────────
+# 쓰기 스레드(services.db_writer) ↔ GUI 스레드 연결
+# - run_write(): 작업 등록 후 완료/실패 콜백을 GUI 스레드에서 호출(Qt 큐 연결)
+# - writer_signals().pending_changed(n): 대기 중 쓰기 수(상태줄 표시용)
+# - run_read(): 목록 조회 등 읽기를 QThreadPool 작업자에서 실행, 결과는 GUI 스레드 콜백으로
+#   같은 key로 새 요청이 오면 이전 요청은 취소(아직 시작 전) 또는 결과 폐기(실행 중)
+# - change_watcher().changed(ChangeBatch): 다른 PC의 변경(services.change_feed) 알림 → 탭이 해당 행만 갱신
+
+class _WriterSignals(QObject):
+    pending_changed = Signal(int)
+
+
+class _FutureRelay(QObject):
+    done = Signal(object)   # Future
+
+
+log = logging.getLogger(__name__)
+
+_signals: Optional[_WriterSignals] = None
+_relays: set = set()   # 완료 전까지 릴레이 객체 참조 유지
+_READ_THREADS = 4
+_read_pool: Optional[QThreadPool] = None
+_latest_reads: Dict[Hashable, Future] = {}   # key → 가장 최근 읽기 요청
+_watcher: Optional["_ChangeWatcher"] = None
+
+
+def writer_signals() -> _WriterSignals:
+    global _signals
+    if _signals is None:
+        _signals = _WriterSignals()
+        _move_to_gui_thread(_signals)
+        get_writer().add_pending_listener(_signals.pending_changed.emit)
+    return _signals
+
+
+def _move_to_gui_thread(obj: QObject) -> None:
+    app = QCoreApplication.instance()
+    if app is not None and obj.thread() is not app.thread():
+        obj.moveToThread(app.thread())
+
+
+def _emit(relay: _FutureRelay, fut: Future) -> None:
+    try:
+        relay.done.emit(fut)
+    except RuntimeError:
+        pass   # 앱 종료 중(릴레이 객체가 이미 삭제됨)
+
+
+def run_write(
+    fn: Callable[..., Any],
+    *args,
+    on_done: Optional[Callable[[Any], None]] = None,
+    on_error: Optional[Callable[[BaseException], None]] = None,
+    **kwargs,
+) -> Future:
+    """
+    fn(*args, **kwargs)를 쓰기 스레드에서 실행 → 즉시 Future 반환(GUI는 멈추지 않음).
+    끝나면 GUI 스레드에서 on_done(결과) 또는 on_error(예외) 호출.
+    """
+    writer_signals()
+    relay = _FutureRelay()
+    _move_to_gui_thread(relay)
+    _relays.add(relay)
+
+    def _deliver(fut: Future):
+        _relays.discard(relay)
+        relay.deleteLater()
+        err = fut.exception()
+        if err is not None:
+            if on_error:
+                on_error(err)
+            else:
+                log.error("DB 쓰기 실패: %s", err, exc_info=err)
+        elif on_done:
+            on_done(fut.result())
+
+    relay.done.connect(_deliver)
+    fut = get_writer().submit(fn, *args, **kwargs)
+    fut.add_done_callback(lambda f: _emit(relay, f))
+    return fut
+
+
+# ─────────────────────────────────────────────────────────
+# 읽기(비차단 조회)
+class _ReadTask(QRunnable):
+    def __init__(self, fut: Future, fn, args, kwargs):
+        super().__init__()
+        self._fut, self._fn, self._args, self._kwargs = fut, fn, args, kwargs
+
+    def run(self):
+        if not self._fut.set_running_or_notify_cancel():
+            return   # 시작 전에 취소됨(새 요청으로 대체)
+        try:
+            self._fut.set_result(self._fn(*self._args, **self._kwargs))
+        except BaseException as e:
+            self._fut.set_exception(e)
+
+
+def read_pool() -> QThreadPool:
+    """읽기 전용 스레드 풀(내보내기 등 전역 풀 작업과 분리)."""
+    global _read_pool
+    if _read_pool is None:
+        _read_pool = QThreadPool()
+        _read_pool.setMaxThreadCount(_READ_THREADS)
+    return _read_pool
+
+
+def run_read(
+    fn: Callable[..., Any],
+    *args,
+    key: Optional[Hashable] = None,
+    on_done: Optional[Callable[[Any], None]] = None,
+    on_error: Optional[Callable[[BaseException], None]] = None,
+    **kwargs,
+) -> Future:
+    """
+    fn(*args, **kwargs)를 읽기 스레드 풀에서 실행 → 즉시 Future 반환.
+    - key: 같은 key의 이전 요청을 대체(예: (id(탭), "search")) → 새 검색이 진행 중 검색을 취소
+      실행 중인 쿼리는 중단할 수 없으므로 끝나도 콜백을 부르지 않고 버림
+    - on_done(결과)/on_error(예외)는 GUI 스레드에서, 가장 최근 요청에 대해서만 호출
+    """
+    if key is not None:
+        prev = _latest_reads.get(key)
+        if prev is not None:
+            prev.cancel()
+
+    fut: Future = Future()
+    if key is not None:
+        _latest_reads[key] = fut
+
+    relay = _FutureRelay()
+    _move_to_gui_thread(relay)
+    _relays.add(relay)
+
+    def _deliver(f: Future):
+        _relays.discard(relay)
+        relay.deleteLater()
+        if key is not None:
+            if _latest_reads.get(key) is not f:
+                return   # 더 새 요청으로 대체됨
+            del _latest_reads[key]
+        if f.cancelled():
+            return
+        err = f.exception()
+        if err is not None:
+            if on_error:
+                on_error(err)
+            else:
+                log.error("DB 조회 실패: %s", err, exc_info=err)
+        elif on_done:
+            on_done(f.result())
+
+    relay.done.connect(_deliver)
+    fut.add_done_callback(lambda f: _emit(relay, f))
+    read_pool().start(_ReadTask(fut, fn, args, kwargs))
+    return fut
+
+
+def cancel_reads(key: Hashable) -> None:
+    """key로 등록된 진행 중 읽기 요청 취소(결과 콜백 없음)."""
+    fut = _latest_reads.pop(key, None)
+    if fut is not None:
+        fut.cancel()
+
+
+# ─────────────────────────────────────────────────────────
+# 다른 PC 변경 감지(폴링은 읽기 스레드에서, 알림은 GUI 스레드에서)
+class _ChangeWatcher(QObject):
+    changed = Signal(object)   # services.change_feed.ChangeBatch
+
+    def __init__(self, interval_ms: int):
+        super().__init__()
+        self._poller = ChangeFeedPoller()
+        self._busy = False
+        self._timer = QTimer(self)
+        self._timer.timeout.connect(self._tick)
+        if interval_ms > 0:
+            self._timer.start(interval_ms)
+            self._tick()   # 현재 위치(seq) 기억
+
+    def _tick(self):
+        if self._busy:
+            return   # 네트워크가 느려 이전 폴링이 아직 안 끝남
+        self._busy = True
+        run_read(self._poller.poll, on_done=self._on_polled, on_error=self._on_failed)
+
+    def _on_polled(self, batch):
+        self._busy = False
+        if batch is not None:
+            rep = db.get_read_replica()
+            if rep is not None:
+                rep.mark_stale()   # 탭이 바로 다시 읽는 변경 행은 다음 복사 전까지 원본에서
+            self.changed.emit(batch)
+
+    def _on_failed(self, e: BaseException):
+        self._busy = False
+        log.debug("변경 피드 폴링 실패: %s", e)
+
+
+def change_watcher() -> _ChangeWatcher:
+    """앱 전역 변경 감지기(첫 사용 시 시작). 탭은 changed 신호만 연결하면 됨."""
+    global _watcher
+    if _watcher is None:
+        try:
+            import settings
+            interval = settings.get_change_poll_ms()
+        except Exception:
+            interval = 3000
+        _watcher = _ChangeWatcher(interval)
+        _move_to_gui_thread(_watcher)
+        if interval > 0:
+            run_write(prune_change_feed, on_error=lambda _e: None)
+    return _watcher
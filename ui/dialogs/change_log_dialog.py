@@ -5,19 +5,8 @@ from PySide6.QtWidgets import (
     QLabel, QHeaderView, QAbstractItemView, QMessageBox
 )
 from PySide6.QtCore import Qt
-from sqlalchemy import select, desc, and_
 
-from db import session_scope
-from models import ChangeLog  # 프로젝트의 실제 모델
-
-
-# ─────────────────────────────────────────────────────────────
-# 유틸: ChangeLog 모델에 '있는' 첫 번째 컬럼 속성 반환
-def _col(*names):
-    for n in names:
-        if hasattr(ChangeLog, n):
-            return getattr(ChangeLog, n)
-    return None
+from services.change_log_service import change_log_columns, list_change_log
 
 
 class ChangeLogDialog(QDialog):
@@ -62,26 +51,10 @@ class ChangeLogDialog(QDialog):
         top.addWidget(btn_close)
         v.addLayout(top)
 
-        # 사용할 컬럼 자동 감지
-        self.col_time  = _col("changed_at", "created_at", "ts", "timestamp")
-        self.col_user  = _col("changed_by", "user", "username", "author")
-        self.col_field = _col("field", "column", "attr")
-        self.col_old   = _col("old_value", "before", "old", "prev_value")
-        self.col_new   = _col("new_value", "after", "new", "cur_value")
-
-        # 머리글/SELECT 컬럼 동적 구성(존재하는 것만)
-        self.headers, self.select_cols = [], []
-        if self.col_time:  self.headers.append("시간");   self.select_cols.append(self.col_time)
-        if self.col_user:  self.headers.append("사용자"); self.select_cols.append(self.col_user)
-        if self.col_field: self.headers.append("필드");   self.select_cols.append(self.col_field)
-        if self.col_old:   self.headers.append("이전");   self.select_cols.append(self.col_old)
-        if self.col_new:   self.headers.append("이후");   self.select_cols.append(self.col_new)
-
-        # 최소 1개는 있어야 함(시간 우선)
-        if not self.select_cols:
-            fallback_col = self.col_time or list(ChangeLog.__table__.columns)[0]
-            self.headers = ["시간"]
-            self.select_cols = [fallback_col]
+        # 머리글/SELECT 컬럼 동적 구성(존재하는 것만, 최소 1개)
+        cols = change_log_columns()
+        self.headers = [h for h, _ in cols]
+        self.select_cols = [n for _, n in cols]
 
         # 테이블
         self.table = QTableWidget(0, len(self.headers), self)
@@ -102,38 +75,8 @@ class ChangeLogDialog(QDialog):
 
     # ─────────────────────────────────────────────────────────
     def _fetch_rows(self) -> List[Tuple]:
-        # where 조건 컬럼 자동 감지
-        name_col = _col("table_name", "module", "table", "entity")
-        id_col   = _col("record_id", "target_id", "entity_id", "equipment_id")
-        code_col = _col("record_code", "code", "target_code", "equipment_code", "key", "record_key")
-
-        # 조합별로 차례대로 시도(첫 번째로 결과 나오는 쿼리를 사용)
-        combos = []
-        if name_col is not None and id_col is not None:
-            combos.append(and_(name_col == self.table_name, id_col == self.record_id))
-        if name_col is not None and code_col is not None and self.record_code:
-            combos.append(and_(name_col == self.table_name, code_col == self.record_code))
-        if id_col is not None:
-            combos.append(id_col == self.record_id)
-        if code_col is not None and self.record_code:
-            combos.append(code_col == self.record_code)
-        if name_col is not None:
-            combos.append(name_col == self.table_name)
-        if not combos:  # 아무 필터 컬럼도 없으면 전체(디버그용)
-            combos.append(None)
-
-        order_col = self.col_time or _col("id") or self.select_cols[0]
-
-        with session_scope() as s:
-            for cond in combos:
-                stmt = select(*self.select_cols)
-                if cond is not None:
-                    stmt = stmt.where(cond)
-                stmt = stmt.order_by(desc(order_col))
-                rows = s.execute(stmt).all()
-                if rows:
-                    return [tuple(r) for r in rows]
-            return []
+        # 조건 조합/정렬은 change_log_service 참고(서버 모드에선 DB 서비스에서 조회)
+        return list_change_log(self.table_name, self.record_id, self.record_code, self.select_cols)
 
     def refresh(self):
         self.table.setSortingEnabled(False)
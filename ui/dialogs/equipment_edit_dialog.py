@@ -9,13 +9,12 @@ from PySide6.QtWidgets import (
     QDoubleSpinBox, QPushButton, QMessageBox, QWidget, QGroupBox, QTableWidget,
     QTableWidgetItem, QHeaderView, QLabel, QComboBox
 )
-from sqlalchemy import select
 
-from db import session_scope
-from models import Equipment, ChangeLog
-from services.equipment_service import ensure_equipment_folder, get_equipment_by_code
-from services.accessory_service import list_accessories, replace_accessories
+from models import Equipment
+from services.equipment_service import ensure_equipment_folder, get_equipment_by_code, apply_equipment_edit
+from services.accessory_service import list_accessories
 from ui.dialogs.change_log_dialog import ChangeLogDialog  # 변경이력 보기
+from ui.db_async import run_write
 
 
 def _to_float(s: str | None) -> Optional[float]:
@@ -75,6 +74,7 @@ class EquipmentEditDialog(QDialog):
         self._original_code = code
         self.data: dict = {}
         self._acc_snapshot: list[tuple[str, str, str]] = []
+        self._saving = False   # 저장 작업이 쓰기 큐에 있는 동안 True(닫기 막음)
         self._build_ui()
         self._load(code)
 
@@ -148,17 +148,28 @@ class EquipmentEditDialog(QDialog):
         row = QHBoxLayout()
         row.addStretch(1)
         self.btn_log = QPushButton("변경이력…")  # 변경이력 팝업
-        btn_ok = QPushButton("저장")
-        btn_cancel = QPushButton("취소")
+        self.btn_ok = QPushButton("저장")
+        self.btn_cancel = QPushButton("취소")
         row.addWidget(self.btn_log)
-        row.addWidget(btn_ok)
-        row.addWidget(btn_cancel)
+        row.addWidget(self.btn_ok)
+        row.addWidget(self.btn_cancel)
         v.addLayout(row)
 
-        btn_ok.clicked.connect(self._save)
-        btn_cancel.clicked.connect(self.reject)
+        self.btn_ok.clicked.connect(self._save)
+        self.btn_cancel.clicked.connect(self.reject)
         self.btn_log.clicked.connect(self._open_log)
 
+    def reject(self):
+        # 저장이 이미 큐에 들어가면 취소해도 커밋됨 → 끝날 때까지 닫지 않음(Esc/창 닫기 포함)
+        if self._saving:
+            return
+        super().reject()
+
+    def _set_saving(self, on: bool):
+        self._saving = on
+        self.btn_ok.setEnabled(not on)
+        self.btn_cancel.setEnabled(not on)
+
     def _open_log(self):
         if not self.data.get("id"):
             QMessageBox.information(self, "안내", "먼저 설비를 불러온 뒤 사용하세요.")
@@ -261,73 +272,25 @@ class EquipmentEditDialog(QDialog):
         # 액세서리 수집
         rows_now = self._collect_accessory_rows()
 
-        try:
-            with session_scope() as s:
-                e: Equipment | None = (
-                    s.execute(
-                        select(Equipment).where(
-                            Equipment.code == self._original_code, Equipment.is_deleted == 0
-                        )
-                    )
-                    .scalars()
-                    .first()
-                )
-                if not e:
-                    raise ValueError(f"설비({self._original_code})를 찾을 수 없습니다.")
-
-                # 코드 중복 체크
-                if new_vals["code"] != self._original_code:
-                    dup = (
-                        s.execute(select(Equipment).where(Equipment.code == new_vals["code"]))
-                        .scalars()
-                        .first()
-                    )
-                    if dup:
-                        raise ValueError(f"이미 존재하는 설비번호입니다: {new_vals['code']}")
-
-                # 변경 이력 계산
-                before = self.data
-                changes: dict[str, tuple[object, object]] = {}
-                for k, v_new in new_vals.items():
-                    v_old = before.get(k)
-                    if v_old != v_new:
-                        changes[k] = (v_old, v_new)
-
-                # 실제 업데이트
-                for k, v in new_vals.items():
-                    setattr(e, k, v)
-                s.flush()
-                eq_id = int(e.id)
-
-                # 액세서리 변경 기록
-                if self._acc_snapshot != rows_now:
-                    replace_accessories(eq_id, rows_now, session=s)
-                    def _fmt(lst): return ", ".join([f"{a or ''}/{b or ''}/{c or ''}" for a, b, c in lst])
-                    changes["accessories"] = (_fmt(self._acc_snapshot), _fmt(rows_now))
-
-                # ChangeLog 기록
-                user = _current_user()
-                for field, (b, a) in changes.items():
-                    s.add(
-                        ChangeLog(
-                            module="equipment",
-                            record_id=eq_id,
-                            field=field,
-                            before=None if b is None else str(b),
-                            after=None if a is None else str(a),
-                            user=user,
-                        )
-                    )
-
+        def on_done(_r):
+            self._set_saving(False)
             # 코드가 바뀌면 사진 폴더 이동
             if new_vals["code"] != self._original_code:
                 self._try_move_photo_folder(self._original_code, new_vals["code"])
-
             self.accept()
 
-        except Exception as e:
+        def on_error(e):
+            self._set_saving(False)
             QMessageBox.critical(self, "오류", str(e))
 
+        # 저장은 쓰기 스레드에서(잠금 대기 중에도 화면이 멈추지 않음)
+        self._set_saving(True)
+        run_write(
+            apply_equipment_edit, self._original_code, new_vals, dict(self.data),
+            list(self._acc_snapshot), rows_now, _current_user(),
+            on_done=on_done, on_error=on_error,
+        )
+
     def _try_move_photo_folder(self, old_code: str, new_code: str):
         try:
             new_dir = ensure_equipment_folder(new_code)
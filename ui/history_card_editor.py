@@ -3,9 +3,7 @@ from PySide6.QtWidgets import (
     QDialog, QVBoxLayout, QGridLayout, QLabel, QLineEdit, QSpinBox,
     QHBoxLayout, QPushButton, QCheckBox, QMessageBox
 )
-from sqlalchemy import select
-from db import session_scope
-from models import Equipment
+from services.equipment_service import get_equipment_by_code
 from services.exporter import export_history_card_xlsx
 
 class HistoryCardEditor(QDialog):
@@ -20,10 +18,7 @@ class HistoryCardEditor(QDialog):
         self.setWindowTitle(f"이력카드 수정/내보내기 - {equipment_code}")
         self.resize(520, 320)
 
-        with session_scope() as s:
-            self.e: Equipment = s.execute(
-                select(Equipment).where(Equipment.code == equipment_code)
-            ).scalars().first()
+        self.e = get_equipment_by_code(equipment_code)
 
         g = QGridLayout()
         row = 0
@@ -4,7 +4,7 @@ from pathlib import Path
 
 from PySide6.QtWidgets import (
     QMainWindow, QWidget, QTabWidget, QMessageBox, QApplication,
-    QVBoxLayout, QHBoxLayout, QMenuBar, QStatusBar, QToolButton
+    QVBoxLayout, QHBoxLayout, QMenuBar, QStatusBar, QToolButton, QLabel
 )
 from PySide6.QtGui import QAction, QKeySequence, QShortcut, QMouseEvent
 from PySide6.QtCore import Qt, QFile, QPoint, QRect, QEvent
@@ -295,6 +295,15 @@ class MainWindow(QMainWindow):
         self._status.setObjectName("status")
         self._card_lay.addWidget(self._status)
 
+        # 쓰기 스레드 대기 건수(공유 DB 잠금으로 저장이 밀릴 때 표시)
+        self._write_label = QLabel("")
+        self._status.addPermanentWidget(self._write_label)
+        try:
+            from ui.db_async import writer_signals
+            writer_signals().pending_changed.connect(self._on_write_pending)
+        except Exception:
+            pass
+
         self._root_lay.addWidget(self.card, 1)
         self.setCentralWidget(self._root)
 
@@ -584,6 +593,9 @@ class MainWindow(QMainWindow):
         # 단축키(중복 방지차원에서 한 번만 등록)
         QShortcut(QKeySequence("Ctrl+Alt+U"), self, activated=self.open_user_admin)
 
+    def _on_write_pending(self, n: int):
+        self._write_label.setText(f"저장 중… ({n}건 대기)" if n > 0 else "")
+
     def _do_backup(self):
         """백업 마법사 실행"""
         try:
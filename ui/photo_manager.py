@@ -1,12 +1,14 @@
 from __future__ import annotations
 import os
 from PySide6.QtCore import Qt, QSize
-from PySide6.QtGui import QIcon, QAction
+from PySide6.QtGui import QIcon, QAction, QPixmap
 from PySide6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QListWidget, QListWidgetItem,
     QPushButton, QFileDialog, QMessageBox, QLabel
 )
 from services.photo_service import list_photos, add_photo, delete_photo, restore_photo, open_folder
+from services.image_cache import get_resized
+from ui.db_async import run_read
 
 class PhotoManager(QWidget):
     """
@@ -56,11 +58,29 @@ class PhotoManager(QWidget):
         self.refresh()
 
     def refresh(self):
+        # 목록 → 항목 먼저 표시, 썸네일(로컬 축소본 캐시)은 읽기 스레드에서 하나씩 도착하는 대로
+        self._gen = getattr(self, "_gen", 0) + 1
+        run_read(list_photos, self.equipment_code, include_trash=True,
+                 key=(id(self), "list"), on_done=self._fill,
+                 on_error=lambda e: QMessageBox.warning(self, "오류", str(e)))
+
+    def _fill(self, infos):
         self.list.clear()
-        for info in list_photos(self.equipment_code, include_trash=True):
-            item = QListWidgetItem(QIcon(info.path), f"{'[휴지통] ' if info.in_trash else ''}{info.filename}")
+        gen = self._gen
+        size = self.list.iconSize()
+        for info in infos:
+            item = QListWidgetItem(f"{'[휴지통] ' if info.in_trash else ''}{info.filename}")
             item.setData(Qt.UserRole, info)
             self.list.addItem(item)
+            run_read(get_resized, info.path, size.width(), size.height(),
+                     on_done=lambda got, it=item, g=gen: self._set_thumb(it, got, g))
+
+    def _set_thumb(self, item: QListWidgetItem, got, gen: int):
+        if gen != self._gen or not got:
+            return   # 새로고침으로 바뀐 목록의 늦은 결과
+        pm = QPixmap()
+        if pm.loadFromData(got[0]):
+            item.setIcon(QIcon(pm))
 
     def on_add(self):
         files, _ = QFileDialog.getOpenFileNames(self, "사진 추가", "", "Images (*.png *.jpg *.jpeg *.bmp *.gif *.webp)")
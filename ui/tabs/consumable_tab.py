@@ -8,6 +8,8 @@ from PySide6.QtWidgets import (
 from PySide6.QtCore import Qt, QDate
 import os
 
+from ui.db_async import run_write, run_read, change_watcher
+
 try:
     from ui.widgets.input_double import QInputDialogWithDouble
 except Exception:
@@ -190,6 +192,7 @@ class ConsumableTab(QWidget):
         btn_exp.clicked.connect(self.export_excel)
         btn_txn_exp.clicked.connect(self.export_txn_excel)
         btn_txn_tmpl.clicked.connect(self.save_txn_template)
+        change_watcher().changed.connect(self._on_db_changed)
 
         self.refresh()
 
@@ -201,28 +204,63 @@ class ConsumableTab(QWidget):
         return int(it.text()) if it and it.text().isdigit() else None
 
     def refresh(self):
-        rows = list_consumables(self.search.text())
+        run_read(list_consumables, self.search.text(), key=(id(self), "list"),
+                 on_done=self._fill_rows, on_error=self._show_error)
+
+    def _fill_rows(self, rows):
         self.table.setRowCount(len(rows))
         for i, c in enumerate(rows):
-            def put(col, txt, align=Qt.AlignLeft | Qt.AlignVCenter):
-                it = QTableWidgetItem("" if txt is None else str(txt))
-                it.setTextAlignment(align); self.table.setItem(i, col, it)
-            put(self.COL_ID, c.id, Qt.AlignCenter)
-            put(self.COL_NAME, c.name)
-            put(self.COL_SPEC, c.spec)
-            put(self.COL_STOCK, c.stock_qty, Qt.AlignRight | Qt.AlignVCenter)
-            put(self.COL_MIN, c.min_qty, Qt.AlignRight | Qt.AlignVCenter)
-            put(self.COL_NOTE, c.note)
+            self._put_row(i, c)
+
+    def _put_row(self, i: int, c):
+        def put(col, txt, align=Qt.AlignLeft | Qt.AlignVCenter):
+            it = QTableWidgetItem("" if txt is None else str(txt))
+            it.setTextAlignment(align); self.table.setItem(i, col, it)
+        put(self.COL_ID, c.id, Qt.AlignCenter)
+        put(self.COL_NAME, c.name)
+        put(self.COL_SPEC, c.spec)
+        put(self.COL_STOCK, c.stock_qty, Qt.AlignRight | Qt.AlignVCenter)
+        put(self.COL_MIN, c.min_qty, Qt.AlignRight | Qt.AlignVCenter)
+        put(self.COL_NOTE, c.note)
+
+    # 다른 PC의 변경: 바뀐 품목만 다시 읽어 해당 행만 갱신/추가/제거
+    def _on_db_changed(self, batch):
+        if batch.overflow:
+            self.refresh(); return
+        ids = list(batch.ids("consumable"))
+        if ids:
+            run_read(list_consumables, self.search.text(), ids=ids,
+                     on_done=lambda rows: self._patch_rows(ids, rows), on_error=lambda _e: None)
+
+    def _row_by_id(self) -> dict:
+        out = {}
+        for r in range(self.table.rowCount()):
+            it = self.table.item(r, self.COL_ID)
+            if it and it.text().isdigit():
+                out[int(it.text())] = r
+        return out
+
+    def _patch_rows(self, ids, rows):
+        fresh = {c.id: c for c in rows}
+        row_of = self._row_by_id()
+        gone = sorted((row_of[i] for i in ids if i in row_of and i not in fresh), reverse=True)
+        for r in gone:
+            self.table.removeRow(r)
+        if gone:
+            row_of = self._row_by_id()
+        for cid, c in fresh.items():
+            r = row_of.get(cid)
+            if r is None:
+                r = self.table.rowCount(); self.table.insertRow(r)
+            self._put_row(r, c)
 
     def new_item(self):
         dlg = ConsumableEditDialog(self, None, "", "", 0.0, "", 0.0)
         if dlg.exec() == QDialog.Accepted:
             d = dlg.data()
-            try:
-                upsert_consumable(name=d["name"], spec=d["spec"], min_qty=d["min_qty"], note=d["note"], stock_qty=d["stock_qty"])
-                QMessageBox.information(self, "완료", "등록되었습니다."); self.refresh()
-            except Exception as e:
-                QMessageBox.critical(self, "에러", str(e))
+            run_write(upsert_consumable, name=d["name"], spec=d["spec"], min_qty=d["min_qty"], note=d["note"], stock_qty=d["stock_qty"],
+                      on_done=self._after_write("등록되었습니다."),
+                      on_error=self._show_error)
 
     def edit_item(self):
         cid = self.selected_id()
@@ -237,11 +275,9 @@ class ConsumableTab(QWidget):
         dlg = ConsumableEditDialog(self, cid, name, spec, minq, note, stock)
         if dlg.exec() == QDialog.Accepted:
             d = dlg.data()
-            try:
-                upsert_consumable(cid=cid, name=d["name"], spec=d["spec"], min_qty=d["min_qty"], note=d["note"], stock_qty=d["stock_qty"])
-                QMessageBox.information(self, "완료", "수정되었습니다."); self.refresh()
-            except Exception as e:
-                QMessageBox.critical(self, "에러", str(e))
+            run_write(upsert_consumable, cid=cid, name=d["name"], spec=d["spec"], min_qty=d["min_qty"], note=d["note"], stock_qty=d["stock_qty"],
+                      on_done=self._after_write("수정되었습니다."),
+                      on_error=self._show_error)
 
     def delete_item(self):
         cid = self.selected_id()
@@ -249,26 +285,23 @@ class ConsumableTab(QWidget):
             QMessageBox.information(self, "안내", "삭제할 항목을 선택하세요."); return
         if QMessageBox.question(self, "확인", "선택한 소모품을 삭제할까요?") != QMessageBox.Yes:
             return
-        try:
-            delete_consumable(cid, force=False)
-            QMessageBox.information(self, "완료", "삭제되었습니다."); self.refresh()
-        except Exception as e1:
+        def on_fail(e1):
             if QMessageBox.question(self, "강제 삭제", f"{e1}\n\n입출고 이력까지 함께 삭제하고 강제 삭제할까요?") == QMessageBox.Yes:
-                try:
-                    delete_consumable(cid, force=True)
-                    QMessageBox.information(self, "완료", "강제 삭제되었습니다."); self.refresh()
-                except Exception as e2:
-                    QMessageBox.critical(self, "에러", str(e2))
+                run_write(delete_consumable, cid, force=True,
+                          on_done=self._after_write("강제 삭제되었습니다."),
+                          on_error=self._show_error)
+
+        run_write(delete_consumable, cid, force=False,
+                  on_done=self._after_write("삭제되었습니다."),
+                  on_error=on_fail)
 
     def zero_item(self):
         cid = self.selected_id()
         if not cid:
             QMessageBox.information(self, "안내", "대상을 선택하세요."); return
-        try:
-            zero_out_stock(cid)
-            QMessageBox.information(self, "완료", "재고를 0으로 맞췄습니다."); self.refresh()
-        except Exception as e:
-            QMessageBox.critical(self, "에러", str(e))
+        run_write(zero_out_stock, cid,
+                  on_done=self._after_write("재고를 0으로 맞췄습니다."),
+                  on_error=self._show_error)
 
     def adjust_item(self, is_in: bool):
         cid = self.selected_id()
@@ -287,21 +320,33 @@ class ConsumableTab(QWidget):
                 return
             reason_text = dlg.value() or "출고"
 
-        try:
-            adjust_stock(cid, qty=qty, reason=reason_text)
+        run_write(adjust_stock, cid, qty=qty, reason=reason_text,
+                  on_done=self._after_write(), on_error=self._show_error)
+
+    # 쓰기 스레드 작업 완료/실패 콜백(GUI 스레드에서 호출)
+    def _after_write(self, message: str = ""):
+        def cb(_result):
+            if message:
+                QMessageBox.information(self, "완료", message)
             self.refresh()
-        except Exception as e:
-            QMessageBox.critical(self, "에러", str(e))
+        return cb
+
+    def _show_error(self, e: BaseException):
+        QMessageBox.critical(self, "에러", str(e))
 
     # 엑셀(목록/이력)
     def import_excel(self):
         from services.importer import import_consumables_xlsx, ensure_db
         path, _ = QFileDialog.getOpenFileName(self, "소모품 엑셀 선택", "", "Excel Files (*.xlsx)")
         if not path: return
+        from ui.widgets.import_progress import import_progress_dialog
+        dlg, on_progress = import_progress_dialog(self, "소모품 가져오기")
         try:
-            ensure_db(); import_consumables_xlsx(path)
+            ensure_db(); import_consumables_xlsx(path, progress=on_progress)
+            dlg.close()
             QMessageBox.information(self, "완료", "엑셀에서 가져왔습니다."); self.refresh()
         except Exception as e:
+            dlg.close()
             QMessageBox.critical(self, "에러", str(e))
 
     def export_excel(self):
@@ -1,33 +1,33 @@
 from __future__ import annotations
 import os
-import shutil
-import tempfile
-import zipfile
 from typing import List
 from datetime import date as _date
 
 from PySide6.QtWidgets import (
-    QWidget, QVBoxLayout, QHBoxLayout, QLineEdit, QPushButton, QTableWidget,
-    QTableWidgetItem, QLabel, QFileDialog, QMessageBox, QHeaderView, QAbstractItemView,
-    QMainWindow, QCheckBox, QComboBox, QDateEdit
+    QWidget, QVBoxLayout, QHBoxLayout, QLineEdit, QPushButton, QTableView,
+    QLabel, QFileDialog, QMessageBox, QHeaderView, QAbstractItemView,
+    QMainWindow, QComboBox, QDateEdit, QProgressDialog
 )
-from PySide6.QtCore import Qt, QDate
+from PySide6.QtCore import Qt, QDate, QModelIndex, QThread, Signal
 
 from services.equipment_service import (
     list_equipment, add_equipment, ensure_equipment_folder, get_equipment_by_code,
     get_delete_preview, delete_equipment_by_code, update_status
 )
 from services.exporter import export_equipment_xlsx
+from services.db_writer import retry_busy
 
 # 이력카드 내보내기(연도 필터 지원)
 try:
     from services.export_history_card import (
         export_history_cards_multi_xlsx,
         export_history_card_xlsx,
+        export_history_cards_zip,
     )
 except Exception:
     export_history_cards_multi_xlsx = None
     export_history_card_xlsx = None
+    export_history_cards_zip = None
 
 # 시작 디렉터리(있으면 사용)
 try:
@@ -43,6 +43,36 @@ except Exception:
 
 from ..dialogs.equipment_edit_dialog import EquipmentEditDialog
 from ..dialogs.change_log_dialog import ChangeLogDialog
+from ..widgets.equipment_table_model import EquipmentTableModel, EquipmentFilterProxy
+from ..widgets.import_progress import import_progress_dialog
+from ..db_async import run_write, run_read, change_watcher
+
+
+class _HistoryZipThread(QThread):
+    """개별 이력카드 ZIP 생성을 GUI 밖에서 실행(진행률/취소 지원)."""
+    progress = Signal(int, int)
+    finished_with = Signal(object)   # ZipExportResult 또는 Exception
+
+    def __init__(self, codes: List[str], zip_path: str, year_only: bool, base_date: _date, parent=None):
+        super().__init__(parent)
+        self._args = (codes, zip_path, year_only, base_date)
+        self._cancel = False
+
+    def cancel(self):
+        self._cancel = True
+
+    def run(self):
+        codes, zip_path, year_only, base_date = self._args
+        try:
+            res = export_history_cards_zip(
+                codes, zip_path,
+                year_only=year_only, base_date=base_date,
+                progress=lambda d, t: self.progress.emit(d, t),
+                is_cancelled=lambda: self._cancel,
+            )
+        except Exception as e:
+            res = e
+        self.finished_with.emit(res)
 
 
 class EquipmentTab(QWidget):
@@ -121,25 +151,23 @@ class EquipmentTab(QWidget):
         row3.addStretch(1)
         root.addLayout(row3)
 
-        # ── 테이블 (★ “용도”와 “유틸리티 기타” 분리)
-        headers = [
-            "설비번호","자산명","설비명","설비명 변경안","모델명",
-            "크기(가로x세로x높이)mm","전압","전력용량(Kwh)","유틸리티 AIR","유틸리티 냉각수","유틸리티 진공",
-            "용도","유틸리티 기타",
-            "제조회사","제조회사 대표 전화번호","제조일자","입고일(년)","입고일(월)","입고일(일)","수량","구입가격","설비위치","비고","파트",
-            "상태"
-        ]
-        self.headers = headers
-        headers_with_select = ["선택"] + headers
-
-        self.table = QTableWidget(0, len(headers_with_select))
-        self.table.setHorizontalHeaderLabels(headers_with_select)
+        # ── 테이블 (모델/뷰: 보이는 셀만 그림, 체크는 CheckStateRole)
+        self.model = EquipmentTableModel(self)
+        self.headers = self.model.headers[1:]
+        self.proxy = EquipmentFilterProxy(self)
+        self.proxy.setSourceModel(self.model)
+
+        self.table = QTableView()
+        self.table.setModel(self.proxy)
         self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
         self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
-        self.table.cellDoubleClicked.connect(self.open_history)
+        self.table.doubleClicked.connect(self.open_history)
         self.table.setSortingEnabled(True)
+        self.table.sortByColumn(1, Qt.AscendingOrder)  # 기본: 설비번호순
         self.table.setWordWrap(False)
-        self.table.verticalHeader().setDefaultSectionSize(24)
+        vh = self.table.verticalHeader()
+        vh.setDefaultSectionSize(24)
+        vh.setSectionResizeMode(QHeaderView.Fixed)  # 행 높이 계산을 위해 전체 행을 훑지 않도록
         self.table.setAlternatingRowColors(True)
 
         hh = self.table.horizontalHeader()
@@ -155,7 +183,7 @@ class EquipmentTab(QWidget):
         # ── 시그널
         btn_find.clicked.connect(self._on_click_search)
         self.search.returnPressed.connect(self._on_enter_search)
-        self.cmb_status_filter.currentIndexChanged.connect(self._on_click_search)
+        self.cmb_status_filter.currentIndexChanged.connect(self._on_status_filter_changed)
 
         btn_add.clicked.connect(self.add_dialog)
         btn_edit.clicked.connect(self.edit_dialog)
@@ -169,6 +197,8 @@ class EquipmentTab(QWidget):
         btn_log.clicked.connect(self.open_change_log)
         btn_bulk_change.clicked.connect(self.bulk_change_status)
 
+        change_watcher().changed.connect(self._on_db_changed)
+
         self.refresh()
         self._hide_quantity_column()
 
@@ -184,6 +214,13 @@ class EquipmentTab(QWidget):
         self._user_search_trigger = True
         self.refresh()
 
+    def _on_status_filter_changed(self):
+        # 상태 필터는 DB 재조회 없이 프록시에서만 거름
+        self._user_search_trigger = True
+        self.model.set_checked_rows(range(self.model.rowCount()), False)
+        self.proxy.set_status(self.cmb_status_filter.currentText())
+        self._report_search_done()
+
     def _hide_quantity_column(self):
         try:
             idx = self.headers.index("수량")
@@ -191,152 +228,82 @@ class EquipmentTab(QWidget):
         except ValueError:
             pass
 
-    def _put_checkbox(self, row: int):
-        cb = QCheckBox()
-        cb.setTristate(False)
-        cb.setChecked(False)
-        cb.setStyleSheet("margin-left:8px;")
-        self.table.setCellWidget(row, 0, cb)
+    def _visible_source_rows(self) -> List[int]:
+        p = self.proxy
+        return [p.mapToSource(p.index(r, 0)).row() for r in range(p.rowCount())]
 
     def select_all_checkboxes(self):
-        for r in range(self.table.rowCount()):
-            w = self.table.cellWidget(r, 0)
-            if isinstance(w, QCheckBox):
-                w.setChecked(True)
+        self.model.set_checked_rows(self._visible_source_rows(), True)
 
     def unselect_all_checkboxes(self):
-        for r in range(self.table.rowCount()):
-            w = self.table.cellWidget(r, 0)
-            if isinstance(w, QCheckBox):
-                w.setChecked(False)
+        self.model.set_checked_rows(range(self.model.rowCount()), False)
 
     # ────────────────────────────────
     def refresh(self):
-        from PySide6.QtWidgets import QApplication
-        QApplication.setOverrideCursor(Qt.WaitCursor)
-        self.table.setUpdatesEnabled(False)
-        rows = []
-        try:
-            hh = self.table.horizontalHeader()
-            sort_on = self.table.isSortingEnabled()
-            sort_col = hh.sortIndicatorSection()
-            sort_order = hh.sortIndicatorOrder()
-            self.table.setSortingEnabled(False)
-
-            status = self.cmb_status_filter.currentText()
-            rows = list_equipment(self.search.text(), status=status, include_deleted=False)
-
-            self.table.setRowCount(len(rows))
-            for i, e in enumerate(rows):
-                self._put_checkbox(i)
-
-                def S(x): return "" if x is None else str(x)
-                def set_cell(irow, icol, text, align=Qt.AlignLeft | Qt.AlignVCenter):
-                    it = QTableWidgetItem(text); it.setTextAlignment(align)
-                    self.table.setItem(irow, icol, it)
-
-                set_cell(i, 1, S(e.code))
-                set_cell(i, 2, S(e.asset_name))
-                set_cell(i, 3, S(e.name))
-                set_cell(i, 4, S(e.alt_name))
-                set_cell(i, 5, S(e.model))
-                set_cell(i, 6, S(e.size_mm))
-                set_cell(i, 7, S(e.voltage))
-                set_cell(i, 8, S(e.power_kwh))
-                set_cell(i, 9, S(e.util_air))
-                set_cell(i,10, S(e.util_coolant))
-                set_cell(i,11, S(e.util_vac))
-                set_cell(i,12, S(getattr(e, "purpose", None)))     # ★ 용도
-                set_cell(i,13, S(e.util_other))                    # ★ 유틸리티 기타
-                set_cell(i,14, S(e.maker))
-                set_cell(i,15, S(e.maker_phone))
-                set_cell(i,16, S(e.manufacture_date), Qt.AlignCenter)
-                set_cell(i,17, S(e.in_year), Qt.AlignCenter)
-                set_cell(i,18, S(e.in_month), Qt.AlignCenter)
-                set_cell(i,19, S(e.in_day), Qt.AlignCenter)
-                set_cell(i,20, S(e.qty))
-                set_cell(i,21, "" if e.purchase_price is None else f"{e.purchase_price:,.0f}", Qt.AlignRight | Qt.AlignVCenter)
-                set_cell(i,22, S(e.location))
-                note_item = QTableWidgetItem(S(e.note)); note_item.setTextAlignment(Qt.AlignLeft | Qt.AlignTop)
-                self.table.setItem(i, 23, note_item)
-                set_cell(i,24, S(e.part))
-                set_cell(i,25, S(getattr(e, "status", "")), Qt.AlignCenter)
-
-            self._hide_quantity_column()
-            self.table.setSortingEnabled(True)
-            if sort_on:
-                self.table.sortItems(sort_col, sort_order)
-
-            self.lbl_status.setText(f"검색완료 ({len(rows)}건)")
-            if isinstance(self.window(), QMainWindow):
-                self.window().statusBar().showMessage(f"검색완료 ({len(rows)}건)", 2000)
+        # 조회는 읽기 스레드에서(화면 멈춤 없음). 새 검색이 오면 진행 중 검색 결과는 버림
+        self.lbl_status.setText("검색 중…")
+        run_read(
+            list_equipment, self.search.text(), status="모두", include_deleted=False, with_stats=True,
+            key=(id(self), "list"), on_done=self._on_rows_loaded, on_error=self._on_rows_failed,
+        )
 
-        except Exception as e:
-            QMessageBox.critical(self, "검색 오류", str(e))
-        finally:
-            self.table.setUpdatesEnabled(True)
-            from PySide6.QtWidgets import QApplication
-            QApplication.restoreOverrideCursor()
+    def _on_rows_loaded(self, rows):
+        self.model.set_rows(rows)
+        self.proxy.set_status(self.cmb_status_filter.currentText())
+        self._hide_quantity_column()
+        self._report_search_done()
+
+    def _on_rows_failed(self, e: BaseException):
+        self.lbl_status.setText("")
+        self._user_search_trigger = False
+        QMessageBox.critical(self, "검색 오류", str(e))
+
+    def _on_db_changed(self, batch):
+        # 다른 PC의 변경: 바뀐 설비만 같은 검색조건으로 다시 읽어 해당 행만 갱신/추가/제거
+        # (수리 이력이 바뀐 설비도 수리 요약 열 때문에 다시 읽음)
+        if batch.overflow:
+            self.refresh()
+            return
+        ids = list(set(batch.ids("equipment")) | batch.parent_ids("repair"))
+        if not ids:
+            return
+        run_read(
+            list_equipment, self.search.text(), status="모두", include_deleted=False, with_stats=True, ids=ids,
+            on_done=lambda rows: self.model.patch_rows(ids, rows), on_error=lambda _e: None,
+        )
+
+    def _report_search_done(self):
+        n = self.proxy.rowCount()
+        self.lbl_status.setText(f"검색완료 ({n}건)")
+        if isinstance(self.window(), QMainWindow):
+            self.window().statusBar().showMessage(f"검색완료 ({n}건)", 2000)
 
         if self._user_search_trigger:
-            QMessageBox.information(self, "검색완료", f"{len(rows)}건 검색되었습니다.")
+            QMessageBox.information(self, "검색완료", f"{n}건 검색되었습니다.")
         self._user_search_trigger = False
 
         if self.on_search_done:
-            self.on_search_done(self.table.rowCount())
+            self.on_search_done(n)
 
     def update_row_by_code(self, code:str) -> bool:
-        row_idx = -1
-        for r in range(self.table.rowCount()):
-            it = self.table.item(r, 1)
-            if it and it.text() == code:
-                row_idx = r; break
+        row_idx = self.model.row_of(code)
         if row_idx < 0: return False
         e = get_equipment_by_code(code)
         if not e: return False
-
-        def S(x): return "" if x is None else str(x)
-        def set_cell(icol, text, align=Qt.AlignLeft|Qt.AlignVCenter):
-            exist = self.table.item(row_idx, icol)
-            if exist is None:
-                it = QTableWidgetItem(S(text)); it.setTextAlignment(align)
-                self.table.setItem(row_idx, icol, it)
-            else:
-                exist.setText(S(text))
-                exist.setTextAlignment(align)
-
-        set_cell(1, S(e.code)); set_cell(2, S(e.asset_name)); set_cell(3, S(e.name))
-        set_cell(4, S(e.alt_name)); set_cell(5, S(e.model)); set_cell(6, S(e.size_mm))
-        set_cell(7, S(e.voltage)); set_cell(8, S(e.power_kwh)); set_cell(9, S(e.util_air))
-        set_cell(10, S(e.util_coolant)); set_cell(11, S(e.util_vac))
-        set_cell(12, S(getattr(e, "purpose", None)))     # 용도
-        set_cell(13, S(e.util_other))                    # 유틸리티 기타
-        set_cell(14, S(e.maker)); set_cell(15, S(e.maker_phone))
-        set_cell(16, S(e.manufacture_date), Qt.AlignCenter)
-        set_cell(17, S(e.in_year), Qt.AlignCenter); set_cell(18, S(e.in_month), Qt.AlignCenter); set_cell(19, S(e.in_day), Qt.AlignCenter)
-        set_cell(20, S(e.qty)); set_cell(21, "" if e.purchase_price is None else f"{e.purchase_price:,.0f}", Qt.AlignRight|Qt.AlignVCenter)
-        set_cell(22, S(e.location))
-        note = self.table.item(row_idx, 23)
-        if note is None:
-            note_item = QTableWidgetItem(S(e.note)); note_item.setTextAlignment(Qt.AlignLeft|Qt.AlignTop)
-            self.table.setItem(row_idx, 23, note_item)
-        else:
-            note.setText(S(e.note)); note.setTextAlignment(Qt.AlignLeft|Qt.AlignTop)
-        set_cell(24, S(e.part))
-        set_cell(25, S(getattr(e, "status", "")), Qt.AlignCenter)
+        self.model.update_row(row_idx, e)
         return True
 
     def current_code(self, row:int|None=None) -> str|None:
-        if row is None: row = self.table.currentRow()
+        if row is None: row = self.table.currentIndex().row()
         if row < 0: return None
-        it = self.table.item(row, 1)
-        return it.text().strip() if it else None
+        src = self.proxy.mapToSource(self.proxy.index(row, 0))
+        return self.model.code_at(src.row())
 
-    def open_history(self, row:int, col:int):
-        code = self.current_code(row)
+    def open_history(self, index: QModelIndex):
+        code = self.current_code(index.row())
         if code: self.on_open_history(code)
 
-    # ── 상태 일괄 변경(항상 단건 호출로 루프)
+    # ── 상태 일괄 변경(쓰기 스레드에서 단건 호출로 루프)
     def bulk_change_status(self):
         status = self.cmb_status_bulk.currentText().strip()
         codes = self._gather_checked_codes()
@@ -347,29 +314,41 @@ class EquipmentTab(QWidget):
             QMessageBox.information(self, "안내", "먼저 설비를 선택하거나 체크하세요.")
             return
 
-        ok, fail, errs = 0, 0, []
-        for c in codes:
-            try:
-                update_status(c, status)
-                ok += 1
-            except Exception as e:
-                fail += 1
-                errs.append(f"{c}: {e}")
+        def job():
+            # 설비마다 따로 커밋 → 잠금 대기 재시도도 설비 단위(retry_busy)
+            ok, fail, errs = 0, 0, []
+            for c in codes:
+                try:
+                    retry_busy(update_status, c, status)
+                    ok += 1
+                except Exception as e:
+                    fail += 1
+                    errs.append(f"{c}: {e}")
+            return ok, fail, errs
 
-        self.refresh()
-        if fail == 0:
-            QMessageBox.information(self, "완료", f"{ok}건 상태를 '{status}'로 변경했습니다.")
-        else:
-            msg = f"완료: {ok}건, 실패: {fail}건\n\n" + "\n".join(errs[:10])
-            QMessageBox.warning(self, "일부 실패", msg)
+        def on_done(res):
+            ok, fail, errs = res
+            self.refresh()
+            if fail == 0:
+                QMessageBox.information(self, "완료", f"{ok}건 상태를 '{status}'로 변경했습니다.")
+            else:
+                msg = f"완료: {ok}건, 실패: {fail}건\n\n" + "\n".join(errs[:10])
+                QMessageBox.warning(self, "일부 실패", msg)
+
+        run_write(job, on_done=on_done,
+                  on_error=lambda e: QMessageBox.critical(self, "에러", str(e)))
 
     # ── 샘플 신규/편집/삭제/엑셀
     def add_dialog(self):
         QMessageBox.information(self, "안내", "샘플로 간단 입력만 진행합니다. 이후 전용 입력폼 추가 예정입니다.")
-        code = "EQ-"+str(self.table.rowCount()+1)
-        add_equipment(code=code, name="새 설비")
-        ensure_equipment_folder(code)
-        self.refresh()
+        code = "EQ-"+str(self.model.rowCount()+1)
+
+        def on_done(_e):
+            ensure_equipment_folder(code)
+            self.refresh()
+
+        run_write(add_equipment, code=code, name="새 설비", on_done=on_done,
+                  on_error=lambda e: QMessageBox.critical(self, "에러", str(e)))
 
     def edit_dialog(self):
         old_code = self.current_code()
@@ -382,9 +361,7 @@ class EquipmentTab(QWidget):
             QApplication.setOverrideCursor(Qt.WaitCursor)
             try:
                 if new_code == old_code:
-                    self.update_row_by_code(new_code)
-                    hh = self.table.horizontalHeader()
-                    self.table.model().sort(hh.sortIndicatorSection(), hh.sortIndicatorOrder())
+                    self.update_row_by_code(new_code)  # 정렬/필터는 프록시가 자동 반영
                 else:
                     self.refresh()
             finally:
@@ -408,7 +385,13 @@ class EquipmentTab(QWidget):
         # 1) 가능한 경우, diff 미리보기 버전 사용
         try:
             from services.importer_diff import import_equipment_xlsx_diff
-            created, diff_count, applied = import_equipment_xlsx_diff(path, parent=self)
+            dlg, on_progress = import_progress_dialog(self, "설비 가져오기", "엑셀 읽는 중...")
+            try:
+                created, diff_count, applied = import_equipment_xlsx_diff(
+                    path, parent=self, progress=on_progress
+                )
+            finally:
+                dlg.close()
             parts = [f"신규 추가: {created}건"]
             if diff_count:
                 parts.append(f"변경 셀: {diff_count}개 중 {applied}개 적용")
@@ -431,9 +414,13 @@ class EquipmentTab(QWidget):
             QMessageBox.critical(self, "가져오기 오류", f"importer 모듈을 찾을 수 없습니다.\n{e}")
             return
 
+        dlg, on_progress = import_progress_dialog(self, "설비 가져오기")
         try:
             importer_ensure_db()
-            import_equipment_xlsx(path)
+            try:
+                import_equipment_xlsx(path, progress=on_progress)
+            finally:
+                dlg.close()
             QMessageBox.information(
                 self, "완료",
                 "기존 방식으로 가져오기가 완료되었습니다.\n"
@@ -487,8 +474,10 @@ class EquipmentTab(QWidget):
         사용자가 지정한 경로에 'ZIP 한 파일'로 저장한다.
         (폴더 선택 → 개별 저장 방식 삭제, 저장 대화상자 하나로 고정)
         """
-        if export_history_card_xlsx is None:
+        if export_history_cards_zip is None:
             QMessageBox.information(self, "안내", "이 기능은 아직 구성되지 않았습니다."); return
+        if getattr(self, "_zip_thread", None) is not None:
+            QMessageBox.information(self, "안내", "이력카드 ZIP 저장이 이미 진행 중입니다."); return
 
         codes = self._gather_checked_codes()
         if not codes:
@@ -505,62 +494,52 @@ class EquipmentTab(QWidget):
         if not os.path.splitext(zip_path)[1]:
             zip_path += ".zip"
 
-        tmpdir = tempfile.mkdtemp(prefix="history_each_")
-        ok, fail, errors = 0, 0, []
-
-        base = self._base_date_value()
-        try:
-            # 1) 개별 파일 생성 (임시 폴더)
-            for code in codes:
-                try:
-                    out_path = os.path.join(tmpdir, f"{code}_이력카드.xlsx")
-                    export_history_card_xlsx(
-                        code, path=out_path,
-                        year_only=self.btn_toggle_year.isChecked(),
-                        base_date=base,
-                    )
-                    ok += 1
-                except Exception as e:
-                    fail += 1
-                    errors.append(f"{code}: {e}")
-
-            if ok == 0:
-                raise RuntimeError("생성된 이력카드 파일이 없습니다.")
-
-            # 2) ZIP 생성
-            with zipfile.ZipFile(zip_path, "w", compression=zipfile.ZIP_DEFLATED) as zf:
-                for fn in os.listdir(tmpdir):
-                    fp = os.path.join(tmpdir, fn)
-                    if os.path.isfile(fp):
-                        zf.write(fp, arcname=fn)
-
-            if fail == 0:
-                QMessageBox.information(self, "완료", f"{ok}건 ZIP 저장 완료\n파일: {zip_path}")
+        dlg = QProgressDialog("이력카드 생성 중...", "취소", 0, len(codes), self)
+        dlg.setWindowTitle("이력카드(개별) ZIP")
+        dlg.setWindowModality(Qt.WindowModal)
+        dlg.setMinimumDuration(0)
+        dlg.setAutoClose(False); dlg.setAutoReset(False)
+
+        th = _HistoryZipThread(codes, zip_path, self.btn_toggle_year.isChecked(),
+                               self._base_date_value(), self)
+        self._zip_thread = th
+
+        def on_progress(done: int, total: int):
+            dlg.setMaximum(total); dlg.setValue(done)
+            dlg.setLabelText(f"이력카드 생성 중... {done}/{total}")
+
+        def on_finished(res):
+            self._zip_thread = None
+            dlg.close()
+            if isinstance(res, Exception):
+                QMessageBox.critical(self, "에러", str(res)); return
+            if res.cancelled:
+                QMessageBox.information(self, "취소", "이력카드 ZIP 저장을 취소했습니다."); return
+            if res.ok == 0:
+                errors = [f"{c}: {e}" for c, e in res.failed]
+                QMessageBox.critical(self, "에러", "생성된 이력카드 파일이 없습니다.\n\n" + "\n".join(errors[:10]))
+                return
+            if not res.failed:
+                QMessageBox.information(self, "완료", f"{res.ok}건 ZIP 저장 완료\n파일: {res.path}")
             else:
-                msg = f"완료: {ok}건, 실패: {fail}건\nZIP: {zip_path}\n\n" + "\n".join(errors[:10])
+                errors = [f"{c}: {e}" for c, e in res.failed]
+                msg = f"완료: {res.ok}건, 실패: {len(res.failed)}건\nZIP: {res.path}\n\n" + "\n".join(errors[:10])
                 QMessageBox.warning(self, "일부 실패", msg)
-        except Exception as e:
-            QMessageBox.critical(self, "에러", str(e))
-        finally:
-            try:
-                shutil.rmtree(tmpdir, ignore_errors=True)
-            except Exception:
-                pass
+
+        th.progress.connect(on_progress)
+        th.finished_with.connect(on_finished)
+        th.finished.connect(th.deleteLater)
+        dlg.canceled.connect(th.cancel)
+        dlg.canceled.connect(lambda: dlg.setLabelText("취소하는 중..."))
+        dlg.show()
+        th.start()
 
     def _base_date_value(self) -> _date:
         qd = self.dt_base.date()
         return _date(qd.year(), qd.month(), qd.day())
 
     def _gather_checked_codes(self) -> List[str]:
-        codes: List[str] = []
-        for r in range(self.table.rowCount()):
-            w = self.table.cellWidget(r, 0)
-            if isinstance(w, QCheckBox) and w.isChecked():
-                it = self.table.item(r, 1)
-                code = it.text().strip() if it else ""
-                if code:
-                    codes.append(code)
-        return codes
+        return [c.strip() for c in self.model.checked_codes() if c.strip()]
 
     def delete_selected(self):
         codes = self._gather_checked_codes()
@@ -595,21 +574,29 @@ class EquipmentTab(QWidget):
             return
         mode = "soft" if box.clickedButton() is soft_btn else "hard"
 
-        ok, fail, errs = 0, 0, []
-        for code in codes:
-            try:
-                delete_equipment_by_code(code, mode=mode)
-                ok += 1
-            except Exception as e:
-                fail += 1
-                errs.append(f"{code}: {e}")
+        def job():
+            # 설비마다 따로 커밋 → 잠금 대기 재시도도 설비 단위(retry_busy)
+            ok, fail, errs = 0, 0, []
+            for code in codes:
+                try:
+                    retry_busy(delete_equipment_by_code, code, mode=mode)
+                    ok += 1
+                except Exception as e:
+                    fail += 1
+                    errs.append(f"{code}: {e}")
+            return ok, fail, errs
 
-        self.refresh()
-        if fail == 0:
-            QMessageBox.information(self, "완료", f"{ok}건 {('보관함 이동' if mode=='soft' else '완전 삭제')} 완료")
-        else:
-            msg = f"완료: {ok}건, 실패: {fail}건\n\n" + "\n".join(errs[:10])
-            QMessageBox.warning(self, "일부 실패", msg)
+        def on_done(res):
+            ok, fail, errs = res
+            self.refresh()
+            if fail == 0:
+                QMessageBox.information(self, "완료", f"{ok}건 {('보관함 이동' if mode=='soft' else '완전 삭제')} 완료")
+            else:
+                msg = f"완료: {ok}건, 실패: {fail}건\n\n" + "\n".join(errs[:10])
+                QMessageBox.warning(self, "일부 실패", msg)
+
+        run_write(job, on_done=on_done,
+                  on_error=lambda e: QMessageBox.critical(self, "에러", str(e)))
 
     def open_change_log(self):
         code = self.current_code()
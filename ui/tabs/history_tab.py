@@ -18,6 +18,8 @@ from services.repair_service import list_repairs
 from services.exporter import export_history_card_xlsx
 from services.accessory_service import list_accessories  # 부속기구
 from services.photo_service import list_photos, replace_main_photo, open_folder
+from services.image_cache import get_resized
+from ui.db_async import run_read, cancel_reads, change_watcher
 
 
 # ─────────────────────────────────────────────────────────────
@@ -35,6 +37,15 @@ def _fmt_kr_date(y:int|None, m:int|None, d:int|None) -> str:
         return f"{y}년 {m or 1}월 {d or 1}일"
     return ""
 
+def _photo_thumb(code: str, width: int, height: int):
+    """대표사진 (축소본 바이트 | None, 원본 경로) 또는 None — 읽기 스레드에서 실행."""
+    infos = list_photos(code, include_trash=False)
+    path = infos[0].path if infos else None
+    if not path or not os.path.exists(path):
+        return None
+    got = get_resized(path, width, height, mode="fit", fmt="PNG")
+    return (got[0] if got else None), path
+
 
 # ─────────────────────────────────────────────────────────────
 # ★ 여기만 추가: 다크 QSS에서 사라지는 QFileDialog 툴버튼 보정
@@ -254,13 +265,22 @@ class HistoryTab(QWidget):
         self.current_equipment_id = None
         self.current_equipment_code = ""
 
+        change_watcher().changed.connect(self._on_db_changed)
+
     # ─────────────────────────────────────────────────────────
     # 내부 유틸 (네 로직 유지)
     def _load_photo(self, code:str):
-        infos = list_photos(code, include_trash=False)
-        path = infos[0].path if infos else None
-        if path and os.path.exists(path):
-            pm = QPixmap(path)
+        # 사진 목록 조회 + 축소본(로컬 캐시) 디코딩은 읽기 스레드에서, QPixmap 생성만 여기서
+        run_read(_photo_thumb, code, self.photo.width(), self.photo.height(),
+                 key=(id(self), "photo"), on_done=self._show_photo,
+                 on_error=lambda _e: self._show_photo(None))
+
+    def _show_photo(self, got):
+        if got:
+            data, path = got
+            pm = QPixmap()
+            if not (data and pm.loadFromData(data)):
+                pm = QPixmap(path)
             if not pm.isNull():
                 self.photo.setPixmap(
                     pm.scaled(self.photo.size(), Qt.KeepAspectRatio, Qt.SmoothTransformation)
@@ -280,7 +300,14 @@ class HistoryTab(QWidget):
     # ─────────────────────────────────────────────────────────
     # 외부 API (네 로직 유지)
     def load_for_equipment(self, code:str):
-        eq = get_equipment_by_code(code)
+        # 설비 정보 → 사진/부속기구/이력을 각각 읽기 스레드에서 조회, 도착하는 대로 채움
+        for part in ("photo", "acc", "repairs"):
+            cancel_reads((id(self), part))   # 이전 설비의 늦은 결과가 섞이지 않게
+        run_read(get_equipment_by_code, code, key=(id(self), "equipment"),
+                 on_done=lambda eq: self._on_equipment_loaded(code, eq),
+                 on_error=lambda e: QMessageBox.critical(self, "오류", str(e)))
+
+    def _on_equipment_loaded(self, code:str, eq):
         if not eq:
             self.title.setText(f"이력카드: {code} (미등록)")
             self.table.setRowCount(0)
@@ -320,11 +347,18 @@ class HistoryTab(QWidget):
             self.acc_table.setItem(r, 1, QTableWidgetItem(""))
             self.acc_table.setItem(r, 2, QTableWidgetItem(""))
             self.acc_table.setItem(r, 3, QTableWidgetItem(""))
-        try:
-            accs = list_accessories(eq.id)  # 각 항목: .name, .spec, .note
-        except Exception:
-            accs = []
-        for idx, a in enumerate(accs[:7]):
+        run_read(list_accessories, eq.id, key=(id(self), "acc"),
+                 on_done=self._fill_accessories, on_error=lambda _e: None)
+
+        # 이력
+        run_read(list_repairs, equipment_id=eq.id, key=(id(self), "repairs"),
+                 on_done=self._fill_repairs,
+                 on_error=lambda e: QMessageBox.critical(self, "오류", str(e)))
+
+    def _fill_accessories(self, accs):
+        accs = list(accs[:7])
+        for idx in range(7):  # 각 항목: .name, .spec, .note (남는 칸은 비움)
+            a = accs[idx] if idx < len(accs) else None
             name = getattr(a, "name", "") or ""
             spec = getattr(a, "spec", "") or ""
             note = getattr(a, "note", "") or ""
@@ -332,8 +366,7 @@ class HistoryTab(QWidget):
             self.acc_table.setItem(idx, 2, QTableWidgetItem(spec))
             self.acc_table.setItem(idx, 3, QTableWidgetItem(note))
 
-        # 이력
-        reps = list_repairs(equipment_id=eq.id)
+    def _fill_repairs(self, reps):
         sort_on = self.table.isSortingEnabled()
         self.table.setSortingEnabled(False)
         self.table.setRowCount(len(reps))
@@ -355,6 +388,23 @@ class HistoryTab(QWidget):
 
         self.table.setSortingEnabled(sort_on)
 
+    # 다른 PC의 변경: 보고 있는 설비에 해당하는 부분만 다시 읽음
+    def _on_db_changed(self, batch):
+        eid, code = self.current_equipment_id, self.current_equipment_code
+        if not eid or not code:
+            return
+        if batch.overflow or eid in batch.ids("equipment"):
+            self.load_for_equipment(code)
+            return
+        if eid in batch.parent_ids("photo"):
+            self._load_photo(code)
+        if eid in batch.parent_ids("equipment_accessory"):
+            run_read(list_accessories, eid, key=(id(self), "acc"),
+                     on_done=self._fill_accessories, on_error=lambda _e: None)
+        if eid in batch.parent_ids("repair"):
+            run_read(list_repairs, equipment_id=eid, key=(id(self), "repairs"),
+                     on_done=self._fill_repairs, on_error=lambda _e: None)
+
     def open_by_code(self, code: str):
         if not code:
             QMessageBox.information(self, "안내", "설비 코드가 비었습니다.")
@@ -11,11 +11,12 @@ from PySide6.QtWidgets import (
 )
 
 from services.equipment_service import list_equipment
-from services.consumable_service import list_consumables, low_stock_items
+from services.consumable_service import list_consumables, low_stock_items, get_consumable
 from services.repair_service import add_repair, update_repair, get_repair, delete_repair  # ★ 추가
 
 # 드래그/붙여넣기용 커스텀 라벨
 from ui.widgets.droppable_image_label import DroppableImageLabel
+from ui.db_async import run_write, run_read, change_watcher
 
 
 # ─────────────────────────────────────────────────────────────────────
@@ -281,6 +282,15 @@ class RepairTab(QWidget):
         v.addWidget(self.btn_save, alignment=Qt.AlignRight)
         self.btn_save.clicked.connect(self.save)
 
+        change_watcher().changed.connect(self._on_db_changed)
+
+    # 다른 PC의 변경: 설비/소모품 콤보만 다시 채움(작성 중인 입력값은 그대로)
+    def _on_db_changed(self, batch):
+        if batch.touched("equipment"):
+            self.refresh_equipment_list()
+        if batch.touched("consumable"):
+            self._refresh_consumable_combo()
+
     # 폼 초기화(신규)
     def clear_form(self):
         self.editing_repair_id = None
@@ -303,20 +313,14 @@ class RepairTab(QWidget):
                 lab._orig_pix = None; lab._current_path = None
                 lab.setPixmap(QPixmap()); lab.setText("여기에\n드롭/붙여넣기")
 
-    # 외부에서 설비 자동 선택 (ID)
+    # 외부에서 설비 자동 선택 (ID) — 목록이 도착하면 선택
     def set_active_equipment(self, equipment_id: int):
-        self.refresh_equipment_list()
-        idx = self.cmb_equipment.findData(equipment_id)
-        if idx >= 0:
-            self.cmb_equipment.setCurrentIndex(idx)
+        self.refresh_equipment_list(select_id=equipment_id)
 
     # 외부에서 설비 자동 선택 (CODE)
     def set_active_equipment_by_code(self, code: str):
         if not code: return
-        self.refresh_equipment_list()
-        for i in range(self.cmb_equipment.count()):
-            if self.cmb_equipment.itemText(i).startswith(str(code)):
-                self.cmb_equipment.setCurrentIndex(i); break
+        self.refresh_equipment_list(select_code=str(code))
 
     # 이력카드 → 편집 모드로 열기
     def open_for_edit(self, repair_id:int, equipment_id:int):
@@ -361,19 +365,45 @@ class RepairTab(QWidget):
         except Exception:
             pass
 
-    def refresh_equipment_list(self):
-        cur = self.cmb_equipment.currentData()
+    def refresh_equipment_list(self, select_id: int | None = None, select_code: str = ""):
+        # 목록은 읽기 스레드에서 조회 → 도착하면 콤보 채움.
+        # 도착 전에 다시 불려도 마지막으로 지정한 선택을 유지
+        if select_id is not None or select_code:
+            self._eq_select = (select_id, select_code)
+        elif getattr(self, "_eq_select", None) is None:
+            self._eq_select = (self.cmb_equipment.currentData(), "")
+        run_read(list_equipment, "", key=(id(self), "equipment"),
+                 on_done=self._fill_equipment_combo,
+                 on_error=lambda e: QMessageBox.critical(self, "오류", str(e)))
+
+    def _fill_equipment_combo(self, rows):
+        cur, code = getattr(self, "_eq_select", None) or (None, "")
+        self._eq_select = None
         self.cmb_equipment.clear()
-        for e in list_equipment(""):
+        for e in rows:
             self.cmb_equipment.addItem(f"{e.code} - {e.name}", e.id)
-        if cur:
+        if code:
+            for i in range(self.cmb_equipment.count()):
+                if self.cmb_equipment.itemText(i).startswith(code):
+                    self.cmb_equipment.setCurrentIndex(i); break
+        elif cur:
             idx = self.cmb_equipment.findData(cur)
             if idx >= 0: self.cmb_equipment.setCurrentIndex(idx)
 
     def _refresh_consumable_combo(self):
+        run_read(list_consumables, "", key=(id(self), "consumables"),
+                 on_done=self._fill_consumable_combo,
+                 on_error=lambda e: QMessageBox.critical(self, "오류", str(e)))
+
+    def _fill_consumable_combo(self, rows):
+        cur = self.cmb_cons_add.currentData()
+        self._cons_by_id = {c.id: c for c in rows}
         self.cmb_cons_add.clear()
-        for c in list_consumables(""):
+        for c in rows:
             self.cmb_cons_add.addItem(f"{c.name} / {c.spec or ''} (재고:{c.stock_qty})", c.id)
+        idx = self.cmb_cons_add.findData(cur) if cur is not None else -1
+        if idx >= 0:
+            self.cmb_cons_add.setCurrentIndex(idx)
 
     def _find_row_by_cid(self, cid:int) -> int:
         for r in range(self.tbl_cons.rowCount()):
@@ -383,11 +413,8 @@ class RepairTab(QWidget):
         return -1
 
     def _add_consumable_row_direct(self, cid:int, qty:float):
-        name, spec = "", ""
-        for c in list_consumables(""):
-            if c.id == cid:
-                name, spec = c.name or "", c.spec or ""
-                break
+        c = getattr(self, "_cons_by_id", {}).get(cid) or get_consumable(cid)
+        name, spec = (c.name or "", c.spec or "") if c else ("", "")
 
         row = self.tbl_cons.rowCount()
         self.tbl_cons.insertRow(row)
@@ -462,16 +489,21 @@ class RepairTab(QWidget):
         yn = QMessageBox.question(self, "확인", f"수리 내역 #{rid} 를 삭제할까요?\n(사용된 소모품 재고는 자동 복원됩니다)")
         if yn != QMessageBox.Yes:
             return
-        try:
-            delete_repair(rid, reverse_stock=True)
+        def on_done(_r):
+            self.btn_delete.setEnabled(True)
             QMessageBox.information(self, "완료", "삭제되었습니다.")
             # 히스토리 탭 최신화
             if callable(self.on_saved_open_history) and code:
                 self.on_saved_open_history(code)
             self.clear_form()
-        except Exception as e:
+
+        def on_error(e):
+            self.btn_delete.setEnabled(True)
             QMessageBox.critical(self, "오류", str(e))
 
+        self.btn_delete.setEnabled(False)   # 쓰기 스레드 처리 중 중복 클릭 방지
+        run_write(delete_repair, rid, reverse_stock=True, on_done=on_done, on_error=on_error)
+
     def save(self):
         eid = self.cmb_equipment.currentData()
         if not eid: QMessageBox.warning(self, "경고", "설비를 선택하세요."); return
@@ -497,23 +529,30 @@ class RepairTab(QWidget):
             before_files=before_files, after_files=after_files,
         )
 
+        editing_id = self.editing_repair_id or None
+        func, msg = (update_repair, "수정되었습니다.") if editing_id else (add_repair, "저장되었습니다.")
+        code = self._current_code()
+
+        def on_error(e):
+            self.btn_save.setEnabled(True)
+            QMessageBox.critical(self, "에러", str(e))
+
+        self.btn_save.setEnabled(False)   # 쓰기 스레드 처리 중 중복 저장 방지
+        run_write(_call_update, func, editing_id, payload,
+                  on_done=lambda _r: self._after_save(msg, code), on_error=on_error)
+
+    def _after_save(self, msg: str, code: str):
+        self.btn_save.setEnabled(True)
         try:
-            if self.editing_repair_id:
-                _call_update(update_repair, self.editing_repair_id, payload)
-                QMessageBox.information(self, "완료", "수정되었습니다.")
-            else:
-                _call_update(add_repair, None, payload)
-                QMessageBox.information(self, "완료", "저장되었습니다.")
+            QMessageBox.information(self, "완료", msg)
 
             lows = low_stock_items()
             if lows:
                 names = "\n".join([f"- {x.name} / {x.spec or ''} (재고:{x.stock_qty}, 안전:{getattr(x,'min_qty',0)})" for x in lows])
                 QMessageBox.warning(self, "소모품 부족 알림", f"아래 품목이 안전수량 미만입니다:\n\n{names}")
 
-            if callable(self.on_saved_open_history):
-                code = self._current_code()
-                if code:
-                    self.on_saved_open_history(code)
+            if callable(self.on_saved_open_history) and code:
+                self.on_saved_open_history(code)
 
             self.clear_form()
 
@@ -0,0 +1,235 @@
+from __future__ import annotations
+from typing import Any, Dict, Iterable, List, Optional
+
+from PySide6.QtCore import Qt, QAbstractTableModel, QModelIndex, QSortFilterProxyModel
+
+
+# (속성명, 헤더, 정렬, 숫자정렬 여부) — 0번 "선택" 체크 열 뒤에 이어짐
+EQUIPMENT_COLUMNS = [
+    ("code",             "설비번호",               Qt.AlignLeft | Qt.AlignVCenter,  False),
+    ("asset_name",       "자산명",                 Qt.AlignLeft | Qt.AlignVCenter,  False),
+    ("name",             "설비명",                 Qt.AlignLeft | Qt.AlignVCenter,  False),
+    ("alt_name",         "설비명 변경안",          Qt.AlignLeft | Qt.AlignVCenter,  False),
+    ("model",            "모델명",                 Qt.AlignLeft | Qt.AlignVCenter,  False),
+    ("size_mm",          "크기(가로x세로x높이)mm", Qt.AlignLeft | Qt.AlignVCenter,  False),
+    ("voltage",          "전압",                   Qt.AlignLeft | Qt.AlignVCenter,  False),
+    ("power_kwh",        "전력용량(Kwh)",          Qt.AlignLeft | Qt.AlignVCenter,  True),
+    ("util_air",         "유틸리티 AIR",           Qt.AlignLeft | Qt.AlignVCenter,  False),
+    ("util_coolant",     "유틸리티 냉각수",        Qt.AlignLeft | Qt.AlignVCenter,  False),
+    ("util_vac",         "유틸리티 진공",          Qt.AlignLeft | Qt.AlignVCenter,  False),
+    ("purpose",          "용도",                   Qt.AlignLeft | Qt.AlignVCenter,  False),
+    ("util_other",       "유틸리티 기타",          Qt.AlignLeft | Qt.AlignVCenter,  False),
+    ("maker",            "제조회사",               Qt.AlignLeft | Qt.AlignVCenter,  False),
+    ("maker_phone",      "제조회사 대표 전화번호", Qt.AlignLeft | Qt.AlignVCenter,  False),
+    ("manufacture_date", "제조일자",               Qt.AlignCenter,                  False),
+    ("in_year",          "입고일(년)",             Qt.AlignCenter,                  True),
+    ("in_month",         "입고일(월)",             Qt.AlignCenter,                  True),
+    ("in_day",           "입고일(일)",             Qt.AlignCenter,                  True),
+    ("qty",              "수량",                   Qt.AlignLeft | Qt.AlignVCenter,  True),
+    ("purchase_price",   "구입가격",               Qt.AlignRight | Qt.AlignVCenter, True),
+    ("location",         "설비위치",               Qt.AlignLeft | Qt.AlignVCenter,  False),
+    ("note",             "비고",                   Qt.AlignLeft | Qt.AlignTop,      False),
+    ("part",             "파트",                   Qt.AlignLeft | Qt.AlignVCenter,  False),
+    ("status",           "상태",                   Qt.AlignCenter,                  False),
+    # 수리 요약(list_equipment(with_stats=True)) — 편집 후 단건 갱신처럼 값이 없으면 기존 값 유지
+    ("last_repair_date",  "최근 수리일",           Qt.AlignCenter,                  False),
+    ("repairs_this_year", "올해 수리 건수",        Qt.AlignCenter,                  True),
+    ("repair_hours",      "누적 수리 시간",        Qt.AlignRight | Qt.AlignVCenter, True),
+]
+_ATTRS = [c[0] for c in EQUIPMENT_COLUMNS]
+_STATS_ATTRS = ("last_repair_date", "repairs_this_year", "repair_hours")
+_CODE_IDX = _ATTRS.index("code")   # 행 튜플에서 관리번호 위치
+SORT_ROLE = Qt.UserRole + 1
+
+
+def _row_tuple(e, prev: Optional[tuple] = None) -> tuple:
+    """EquipmentRow / Equipment → 표시용 원시값 튜플(세션 분리, 가벼운 저장)."""
+    vals = []
+    for i, attr in enumerate(_ATTRS):
+        if prev is not None and attr in _STATS_ATTRS and getattr(e, attr, None) is None:
+            vals.append(prev[i])   # Equipment 객체 등 요약 값이 없는 갱신
+            continue
+        v = getattr(e, attr, None)
+        if attr == "manufacture_date" and v is not None:
+            v = str(v)
+        vals.append(v)
+    return tuple(vals)
+
+
+class EquipmentTableModel(QAbstractTableModel):
+    """
+    설비관리대장 표 모델.
+    - 행은 튜플 리스트로만 보관(셀 위젯/아이템 생성 없음 → 보이는 셀만 data() 호출)
+    - 0번 열은 CheckStateRole 체크박스
+    - code → 행 번호 사전으로 단건 갱신 O(1)
+    - id → 행 번호 사전으로 변경 피드 부분 갱신(patch_rows)
+    """
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._rows: List[tuple] = []
+        self._ids: List[Optional[int]] = []
+        self._checked = bytearray()
+        self._row_by_code: Dict[str, int] = {}
+        self._row_by_id: Dict[int, int] = {}
+        self.headers = ["선택"] + [c[1] for c in EQUIPMENT_COLUMNS]
+
+    # ── 기본 인터페이스
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.headers)
+
+    def headerData(self, section: int, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal and 0 <= section < len(self.headers):
+            return self.headers[section]
+        return super().headerData(section, orientation, role)
+
+    def flags(self, index: QModelIndex):
+        if not index.isValid():
+            return Qt.NoItemFlags
+        f = Qt.ItemIsEnabled | Qt.ItemIsSelectable
+        if index.column() == 0:
+            f |= Qt.ItemIsUserCheckable
+        return f
+
+    def data(self, index: QModelIndex, role=Qt.DisplayRole) -> Any:
+        if not index.isValid():
+            return None
+        r, c = index.row(), index.column()
+        if c == 0:
+            if role == Qt.CheckStateRole:
+                return Qt.Checked if self._checked[r] else Qt.Unchecked
+            if role == SORT_ROLE:
+                return int(self._checked[r])
+            return None
+
+        attr, _label, align, numeric = EQUIPMENT_COLUMNS[c - 1]
+        v = self._rows[r][c - 1]
+        if role == Qt.DisplayRole:
+            if v is None:
+                return ""
+            if attr == "purchase_price":
+                try:
+                    return f"{float(v):,.0f}"
+                except Exception:
+                    return str(v)
+            if attr == "repair_hours":
+                try:
+                    return f"{float(v):,.1f}"
+                except Exception:
+                    return str(v)
+            return str(v)
+        if role == Qt.TextAlignmentRole:
+            return int(align)
+        if role == SORT_ROLE:
+            if numeric:
+                try:
+                    return float(v) if v not in (None, "") else float("-inf")
+                except Exception:
+                    return float("-inf")
+            return "" if v is None else str(v)
+        return None
+
+    def setData(self, index: QModelIndex, value, role=Qt.EditRole) -> bool:
+        if not index.isValid() or index.column() != 0 or role != Qt.CheckStateRole:
+            return False
+        self._checked[index.row()] = 1 if Qt.CheckState(value) == Qt.Checked else 0
+        self.dataChanged.emit(index, index, [Qt.CheckStateRole])
+        return True
+
+    # ── 데이터 적재/갱신
+    def set_rows(self, rows: Iterable) -> None:
+        self.beginResetModel()
+        rows = list(rows)
+        self._rows = [_row_tuple(e) for e in rows]
+        self._ids = [getattr(e, "id", None) for e in rows]
+        self._checked = bytearray(len(self._rows))
+        self._reindex()
+        self.endResetModel()
+
+    def _reindex(self) -> None:
+        self._row_by_code = {t[_CODE_IDX]: i for i, t in enumerate(self._rows) if t[_CODE_IDX]}
+        self._row_by_id = {rid: i for i, rid in enumerate(self._ids) if rid is not None}
+
+    def patch_rows(self, ids: Iterable[int], rows: Iterable) -> None:
+        """
+        ids 설비를 다시 읽은 결과(rows)로 부분 갱신.
+        rows에 있으면 갱신/추가, 없으면(삭제·보관·검색조건 밖) 표에서 제거. 체크 상태는 유지.
+        """
+        fresh = {e.id: e for e in rows}
+        gone = sorted((self._row_by_id[i] for i in ids if i not in fresh and i in self._row_by_id), reverse=True)
+        for r in gone:
+            self.beginRemoveRows(QModelIndex(), r, r)
+            del self._rows[r], self._ids[r], self._checked[r]
+            self.endRemoveRows()
+        if gone:
+            self._reindex()
+        for rid, e in fresh.items():
+            r = self._row_by_id.get(rid)
+            if r is not None:
+                self.update_row(r, e)
+                continue
+            r = len(self._rows)
+            self.beginInsertRows(QModelIndex(), r, r)
+            self._rows.append(_row_tuple(e))
+            self._ids.append(rid)
+            self._checked.append(0)
+            self._row_by_id[rid] = r
+            if self._rows[r][_CODE_IDX]:
+                self._row_by_code[self._rows[r][_CODE_IDX]] = r
+            self.endInsertRows()
+
+    def row_of(self, code: str) -> int:
+        return self._row_by_code.get(code, -1)
+
+    def code_at(self, row: int) -> Optional[str]:
+        if 0 <= row < len(self._rows):
+            return (self._rows[row][_CODE_IDX] or "").strip() or None
+        return None
+
+    def update_row(self, row: int, e) -> None:
+        old_code = self._rows[row][_CODE_IDX]
+        self._rows[row] = _row_tuple(e, self._rows[row])
+        new_code = self._rows[row][_CODE_IDX]
+        if old_code != new_code:
+            self._row_by_code.pop(old_code, None)
+            if new_code:
+                self._row_by_code[new_code] = row
+        self.dataChanged.emit(self.index(row, 1), self.index(row, len(self.headers) - 1))
+
+    # ── 체크 상태
+    def set_checked_rows(self, rows: Iterable[int], checked: bool) -> None:
+        flag = 1 if checked else 0
+        for r in rows:
+            self._checked[r] = flag
+        if self._rows:
+            self.dataChanged.emit(self.index(0, 0), self.index(len(self._rows) - 1, 0), [Qt.CheckStateRole])
+
+    def checked_codes(self) -> List[str]:
+        return [self._rows[r][_CODE_IDX] for r, f in enumerate(self._checked) if f and self._rows[r][_CODE_IDX]]
+
+    def is_checked(self, row: int) -> bool:
+        return bool(self._checked[row])
+
+
+class EquipmentFilterProxy(QSortFilterProxyModel):
+    """상태(가동/유휴/…) 필터 + 숫자 인식 정렬 프록시."""
+    STATUS_COL = _ATTRS.index("status") + 1  # "상태" 열("선택" 열이 0번이라 +1)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._status = ""
+        self.setSortRole(SORT_ROLE)
+        self.setDynamicSortFilter(True)
+
+    def set_status(self, status: str) -> None:
+        st = (status or "").strip()
+        self._status = "" if st in ("", "모두") else st
+        self.invalidateFilter()
+
+    def filterAcceptsRow(self, source_row: int, source_parent: QModelIndex) -> bool:
+        if not self._status:
+            return True
+        idx = self.sourceModel().index(source_row, self.STATUS_COL, source_parent)
+        return (self.sourceModel().data(idx, Qt.DisplayRole) or "") == self._status
@@ -0,0 +1,25 @@
+from __future__ import annotations
+from typing import Callable, Tuple
+
+from PySide6.QtCore import Qt
+from PySide6.QtWidgets import QProgressDialog
+
+
+def import_progress_dialog(parent, title: str, label: str = "엑셀 가져오는 중...") -> Tuple[QProgressDialog, Callable[[int, int], None]]:
+    """
+    청크 단위 가져오기(services.importer.iter_excel_chunks)용 진행 표시.
+    반환: (다이얼로그, progress(done, total) 콜백). 전체 행 수를 모르면(total=0) 바쁨 표시,
+    마지막 청크(done == total)에서 자동으로 닫힘.
+    같은 스레드에서 동기 실행 — 모달 다이얼로그의 setValue 가 이벤트를 처리해 화면이 멈추지 않음.
+    """
+    dlg = QProgressDialog(label, None, 0, 0, parent)
+    dlg.setWindowTitle(title)
+    dlg.setWindowModality(Qt.WindowModal)
+    dlg.setMinimumDuration(300)
+
+    def on_progress(done: int, total: int):
+        dlg.setLabelText(f"{label} {done:,}/{total:,}행" if total else f"{label} {done:,}행")
+        dlg.setMaximum(max(0, total))
+        dlg.setValue(min(done, total) if total else 0)
+
+    return dlg, on_progress
@@ -15,3 +15,7 @@ def set_current_user(name: str, role: str = "user"):
 
 def get_current_user() -> Optional[CurrentUser]:
     return _current
+
+def clear_current_user():
+    global _current
+    _current = None